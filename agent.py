@@ -288,6 +288,58 @@ def run_once(config_path: str = None) -> int:
         return 1
 
 
+def _reschedule(scheduler, interval, store_open: bool) -> None:
+    """Apply the adaptive interval to the sync job if it changed."""
+    from apscheduler.triggers.interval import IntervalTrigger
+
+    previous = interval.current
+    minutes = interval.next_interval(store_open)
+    if minutes != previous:
+        logger.info(
+            f"Sync interval {previous} -> {minutes} min "
+            f"({'store open' if store_open else 'store closed'}, "
+            f"{interval.ops_per_minute():.2f} ops/min)"
+        )
+        scheduler.reschedule_job("pdv_sync", trigger=IntervalTrigger(minutes=minutes))
+
+
+def _adaptive_sync_job(scheduler, runner, interval, watch):
+    """Sync job that records cycle activity and adapts the next interval."""
+
+    def job() -> None:
+        # Refresh turno state first so a closure seen now is covered by this cycle
+        watch.check()
+        watch.sync_started()
+        while True:
+            runner.run()
+            interval.record(runner.last_cycle_ops, runner.last_window_minutes)
+            if not watch.sync_finished():
+                break
+            logger.info("Turno closed during the sync — running sync again")
+        _reschedule(scheduler, interval, watch.store_open)
+
+    return job
+
+
+def _closure_watch_job(scheduler, interval, watch):
+    """Polls the open turnos; a closure pulls the next sync forward to now."""
+    from datetime import datetime
+
+    def job() -> None:
+        closed = watch.check()
+        if closed and watch.syncing:
+            # The running sync job re-runs itself (a run requested now would be
+            # skipped by max_instances=1)
+            logger.info("Turno closure detected — sync in progress, running again after it")
+        elif closed:
+            logger.info("Turno closure detected — running sync now")
+            scheduler.modify_job("pdv_sync", next_run_time=datetime.now(scheduler.timezone))
+        else:
+            _reschedule(scheduler, interval, watch.store_open)
+
+    return job
+
+
 def run_loop(config_path: str = None) -> None:
     """Run continuously with APScheduler."""
     try:
@@ -316,17 +368,45 @@ def run_loop(config_path: str = None) -> None:
         # Create scheduler
         scheduler = BlockingScheduler()
 
+        if settings.adaptive_schedule:
+            from src.scheduler import AdaptiveInterval, ClosureWatch
+
+            interval = AdaptiveInterval(
+                base_minutes=settings.sync_window_minutes,
+                min_minutes=settings.sync_interval_min_minutes,
+                max_minutes=settings.sync_interval_max_minutes,
+                peak_ops_per_minute=settings.peak_ops_per_minute,
+            )
+            watch = ClosureWatch(
+                runner.queries,
+                settings.store_id_ponto_venda,
+                gestao_queries=runner.gestao_queries,
+                id_filial=settings.resolved_store_id_filial,
+            )
+            sync_job = _adaptive_sync_job(scheduler, runner, interval, watch)
+        else:
+            sync_job = runner.run
+
         # Add job
         scheduler.add_job(
-            runner.run,
+            sync_job,
             trigger=IntervalTrigger(minutes=settings.sync_window_minutes),
             id="pdv_sync",
             name="PDV Sync Job",
             replace_existing=True,
         )
 
+        if settings.adaptive_schedule:
+            scheduler.add_job(
+                _closure_watch_job(scheduler, interval, watch),
+                trigger=IntervalTrigger(seconds=settings.closure_watch_seconds),
+                id="pdv_closure_watch",
+                name="PDV Turno Closure Watch",
+                replace_existing=True,
+            )
+
         # Run immediately on start
-        runner.run()
+        sync_job()
 
         # Start scheduler
         logger.info("Scheduler started. Press Ctrl+C to exit.")
@@ -0,0 +1,85 @@
+"""
+Micro-benchmark: Decimal(str(value)) vs payload.to_decimal over the numeric
+fields of a synthetic window (default 100k items).
+
+Values are shaped like pyodbc results: money/decimal columns arrive as
+Decimal; a share of float and int values (FLOAT / INT columns) and NULLs is
+mixed in. Both conversions must give the same Decimals.
+
+Run:
+    python scripts/bench_decimal_coercion.py
+    python scripts/bench_decimal_coercion.py --items 250000 --repeat 5
+"""
+
+import argparse
+import sys
+import time
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Callable
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.payload import to_decimal
+
+# Numeric fields converted per item row (SaleDetailsBuilder.add_item)
+ITEM_FIELDS = ("qtd", "preco_unit", "total_item", "desconto_item")
+
+
+def synthetic_values(items: int) -> list[Any]:
+    """Numeric field values of `items` rows: ~90% Decimal, 5% float, 4% int, 1% NULL."""
+    values = []
+    for n in range(items * len(ITEM_FIELDS)):
+        bucket = n % 100
+        if bucket < 90:
+            values.append(Decimal(f"{n % 997}.{n % 100:02d}"))
+        elif bucket < 95:
+            values.append((n % 997) / 8)
+        elif bucket < 99:
+            values.append(n % 997)
+        else:
+            values.append(None)
+    return values
+
+
+def legacy(value: Any) -> Decimal:
+    return Decimal(str(value or 0))
+
+
+def coerce(value: Any) -> Decimal:
+    return to_decimal(value or 0)
+
+
+def measure(fn: Callable[[Any], Decimal], values: list[Any], repeat: int) -> tuple[list[Decimal], float]:
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        converted = [fn(v) for v in values]
+        elapsed = (time.perf_counter() - started) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return converted, best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--items", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    values = synthetic_values(args.items)
+    print(f"{args.items} items / {len(values)} numeric values")
+
+    expected, legacy_ms = measure(legacy, values, args.repeat)
+    converted, coerce_ms = measure(coerce, values, args.repeat)
+    same = converted == expected and all(
+        str(a) == str(b) for a, b in zip(converted, expected)
+    )
+
+    print(f"Decimal(str(v)): {legacy_ms:8.1f} ms")
+    print(f"to_decimal(v):   {coerce_ms:8.1f} ms ({legacy_ms / coerce_ms:.1f}x)")
+    print(f"Same values: {same}")
+    return 0 if same else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+"""
+Benchmark: sale details as validated pydantic models vs the fast path of
+plain records serialized directly (SaleDetailsBuilder.build / build_records,
+PAYLOAD_VALIDATION=true / false).
+
+Generates a synthetic catch-up window (N sales x items/payments), builds the
+vendas both ways, wraps them in a SyncPayload and serializes it, reporting
+the time of each step and whether both paths produce identical JSON.
+
+Run:
+    python scripts/bench_payload_build.py
+    python scripts/bench_payload_build.py --sales 10000 --items 4 --repeat 5
+"""
+
+import argparse
+import sys
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src import BRT
+from src.payload import SaleDetailsBuilder, build_payload
+
+
+def synthetic_rows(sales: int, items: int) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+    """Item and payment rows shaped like the window extract result sets."""
+    start = datetime(2026, 3, 2, 8, 0)
+    item_rows, payment_rows = [], []
+    for op in range(1, sales + 1):
+        vendedor = 90 + op % 7
+        for line in range(1, items + 1):
+            item_rows.append({
+                "id_operacao": op,
+                "id_turno": "656335C4-D6C4-455A-8E3D-FF6B3F570C64",
+                "data_hora_termino": start + timedelta(seconds=op * 30),
+                "line_id": op * 100 + line,
+                "line_no": line,
+                "id_produto": 1000 + (op * line) % 500,
+                "codigo_barras": f"789{op * line:010d}",
+                "nome_produto": f"Produto {(op * line) % 500}",
+                "qtd": Decimal("1.000"),
+                "preco_unit": Decimal("19.90"),
+                "total_item": Decimal("19.90"),
+                "desconto_item": Decimal("0.00"),
+                "id_usuario_vendedor": vendedor,
+                "nome_vendedor": f"Vendedor {vendedor}",
+                "login_vendedor": f"vend{vendedor}",
+            })
+        payment_rows.append({
+            "id_operacao": op,
+            "line_id": op,
+            "id_finalizador": 1 + op % 3,
+            "meio_pagamento": "Dinheiro",
+            "valor": Decimal("19.90") * items,
+            "valor_troco": Decimal("0.00"),
+            "parcela": None,
+        })
+    return item_rows, payment_rows
+
+
+def run_path(
+    validate: bool, item_rows: list[dict[str, Any]], payment_rows: list[dict[str, Any]]
+) -> tuple[bytes, float, float, float]:
+    """Build vendas, build the payload and serialize it. Returns (json, ms per step)."""
+    started = time.perf_counter()
+    builder = SaleDetailsBuilder("HIPER_CAIXA")
+    builder.add_items(item_rows)
+    builder.add_payments(payment_rows)
+    vendas = builder.build() if validate else builder.build_records()
+    built = time.perf_counter()
+
+    now = datetime(2026, 3, 2, 20, 0, tzinfo=BRT)
+    payload = build_payload(
+        store_id=10, store_name="Loja", store_alias="loja", dt_from=now, dt_to=now,
+        window_minutes=10, turnos=[], vendas=vendas,
+        ops_ids=list(range(1, len(vendas) + 1)), sales_by_vendor=[], payments_by_method=[],
+    )
+    wrapped = time.perf_counter()
+
+    raw = payload.to_json_bytes()
+    dumped = time.perf_counter()
+    return raw, (built - started) * 1000, (wrapped - built) * 1000, (dumped - wrapped) * 1000
+
+
+def strip_sent_at(raw: bytes) -> bytes:
+    """agent.sent_at is the build time; drop it before comparing the two paths."""
+    head, _, rest = raw.partition(b'"sent_at":"')
+    return head + rest.partition(b'"')[2]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sales", type=int, default=5000)
+    parser.add_argument("--items", type=int, default=4, help="Items per sale")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    item_rows, payment_rows = synthetic_rows(args.sales, args.items)
+    print(f"{args.sales} sales / {len(item_rows)} items / {len(payment_rows)} payments")
+    print(f"{'path':<12} {'build ms':>10} {'payload ms':>11} {'json ms':>9} {'total ms':>10}")
+
+    outputs = {}
+    for label, validate in (("validated", True), ("records", False)):
+        best = None
+        for _ in range(args.repeat):
+            raw, build_ms, wrap_ms, dump_ms = run_path(validate, item_rows, payment_rows)
+            if best is None or build_ms + wrap_ms + dump_ms < sum(best):
+                best = (build_ms, wrap_ms, dump_ms)
+        outputs[label] = raw
+        print(f"{label:<12} {best[0]:>10.0f} {best[1]:>11.0f} {best[2]:>9.0f} {sum(best):>10.0f}")
+
+    identical = strip_sent_at(outputs["validated"]) == strip_sent_at(outputs["records"])
+    print(f"JSON: {len(outputs['records']) / 1024:.0f} KB, identical: {identical}")
+    return 0 if identical else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
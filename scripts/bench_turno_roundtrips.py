@@ -0,0 +1,134 @@
+"""
+Benchmark: per-turno round trips (legacy loop) vs batch *_for_turnos queries.
+
+Offline mode (default) counts the statements each path sends for N turnos
+using a stub connection. With --live it runs both paths against the real
+PDV and Gestão databases (from .env) and also reports wall-clock time.
+
+Run:
+    python scripts/bench_turno_roundtrips.py
+    python scripts/bench_turno_roundtrips.py --live --config C:\\ProgramData\\PDVSyncAgent\\.env
+"""
+
+import argparse
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.queries import QueryExecutor
+from src.queries_gestao import GestaoQueryExecutor
+
+
+class RoundTripCounter:
+    """Wraps a DatabaseConnection (or nothing) and counts execute_query calls."""
+
+    def __init__(self, db: Any = None):
+        self.db = db
+        self.round_trips = 0
+
+    def execute_query(self, query: str, params: tuple = ()) -> list[dict[str, Any]]:
+        self.round_trips += 1
+        if self.db is None:
+            return []
+        return self.db.execute_query(query, params)
+
+    def table_has_column(self, table_name: str, column_name: str) -> bool:
+        if self.db is None:
+            return True
+        return self.db.table_has_column(table_name, column_name)
+
+
+def legacy_pdv(q: QueryExecutor, ids: list[str]) -> None:
+    for id_turno in ids:
+        q.get_payments_by_method_for_turno(id_turno)
+        q.get_turno_closure_values(id_turno)
+        q.get_turno_shortage_values(id_turno)
+        q.get_turno_responsavel(id_turno)
+
+
+def batch_pdv(q: QueryExecutor, ids: list[str]) -> None:
+    q.get_payments_by_method_for_turnos(ids)
+    q.get_turno_closure_values_for_turnos(ids)
+    q.get_turno_shortage_values_for_turnos(ids)
+    q.get_turno_responsavel_for_turnos(ids)
+
+
+def legacy_loja(q: GestaoQueryExecutor, ids: list[str]) -> None:
+    for id_turno in ids:
+        q.get_loja_payments_by_method_for_turno(id_turno)
+        q.get_loja_turno_closure_values(id_turno)
+        q.get_loja_turno_shortage_values(id_turno)
+        q.get_loja_turno_responsavel(id_turno)
+
+
+def batch_loja(q: GestaoQueryExecutor, ids: list[str]) -> None:
+    q.get_loja_payments_by_method_for_turnos(ids)
+    q.get_loja_turno_closure_values_for_turnos(ids)
+    q.get_loja_turno_shortage_values_for_turnos(ids)
+    q.get_loja_turno_responsavel_for_turnos(ids)
+
+
+def measure(fn, executor_cls, db: Any, ids: list[str]) -> tuple[int, float]:
+    counter = RoundTripCounter(db)
+    executor = executor_cls(counter)
+    started = time.perf_counter()
+    fn(executor, ids)
+    return counter.round_trips, (time.perf_counter() - started) * 1000
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--live", action="store_true", help="Run against the real databases")
+    parser.add_argument("--config", type=str, default=None, help="Path to .env")
+    args = parser.parse_args()
+
+    pdv_db = gestao_db = None
+    pdv_ids_live: list[str] = []
+    loja_ids_live: list[str] = []
+    if args.live:
+        from src.db import create_db_connection, create_gestao_db_connection
+        from src.settings import load_settings
+
+        settings = load_settings(config_path=args.config)
+        pdv_db = create_db_connection(settings)
+        gestao_db = create_gestao_db_connection(settings)
+        pdv_ids_live = [
+            str(r["id_turno"]) for r in pdv_db.execute_query(
+                "SELECT TOP 20 id_turno FROM dbo.turno WHERE id_ponto_venda = ? "
+                "ORDER BY data_hora_inicio DESC",
+                (settings.store_id_ponto_venda,),
+            )
+        ]
+        loja_ids_live = [
+            r["id_turno"] for r in gestao_db.execute_query(
+                "SELECT TOP 20 CONVERT(VARCHAR(36), id_turno) AS id_turno FROM dbo.turno "
+                "WHERE id_filial = ? ORDER BY data_hora_inicio DESC",
+                (settings.resolved_store_id_filial,),
+            )
+        ]
+
+    print("=" * 72)
+    print(f"  {'DB':<8}{'turnos':>8}{'legacy trips':>15}{'batch trips':>14}{'legacy ms':>13}{'batch ms':>11}")
+    print("=" * 72)
+    for n in (1, 6, 20):
+        for label, legacy, batch, cls, db, live_ids in (
+            ("PDV", legacy_pdv, batch_pdv, QueryExecutor, pdv_db, pdv_ids_live),
+            ("Gestão", legacy_loja, batch_loja, GestaoQueryExecutor, gestao_db, loja_ids_live),
+        ):
+            ids = live_ids[:n] if args.live else [str(uuid.uuid4()).upper() for _ in range(n)]
+            legacy_trips, legacy_ms = measure(legacy, cls, db, ids)
+            batch_trips, batch_ms = measure(batch, cls, db, ids)
+            print(
+                f"  {label:<8}{len(ids):>8}{legacy_trips:>15}{batch_trips:>14}"
+                f"{legacy_ms:>13.1f}{batch_ms:>11.1f}"
+            )
+    print("=" * 72)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -327,11 +327,11 @@ with open(payload_source_path) as f:
     payload_source = f.read()
 
 check("Builder maps line_id for items",
-      'line_id=item.get("line_id")' in payload_source)
+      '"line_id": item.get("line_id")' in payload_source)
 check("Builder maps line_no for items",
-      'line_no=item.get("line_no")' in payload_source)
+      '"line_no": item.get("line_no")' in payload_source)
 check("Builder maps line_id for payments",
-      'line_id=pay.get("line_id")' in payload_source)
+      '"line_id": pay.get("line_id")' in payload_source)
 
 # Test JSON serialization includes line fields
 pi_json = json.loads(pi.model_dump_json())
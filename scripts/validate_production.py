@@ -76,6 +76,18 @@ try:
 except Exception as e:
     check("src.payload imports OK", False, str(e))
 
+try:
+    from src.directory import create_user_directory
+    check("src.directory imports OK", True)
+except Exception as e:
+    check("src.directory imports OK", False, str(e))
+
+try:
+    from src.catalog import create_product_catalog
+    check("src.catalog imports OK", True)
+except Exception as e:
+    check("src.catalog imports OK", False, str(e))
+
 try:
     from src.state import StateManager, WindowCalculator
     check("src.state imports OK", True)
@@ -311,7 +323,11 @@ try:
     check("Turno details built", True, f"{len(turno_details)} turnos")
 
     # Build sale details
-    vendas = build_sale_details(wide_items, wide_payments, canal="HIPER_CAIXA")
+    users = create_user_directory(queries.get_users, label="PDV")
+    products = create_product_catalog(queries.get_product_names, label="PDV")
+    vendas = build_sale_details(
+        wide_items, wide_payments, canal="HIPER_CAIXA", users=users, products=products
+    )
     check("Sale details built", True, f"{len(vendas)} vendas")
 
     # Build full payload
@@ -0,0 +1,146 @@
+"""
+Product catalogue cache (dbo.produto names for the sale items).
+
+The sale item queries return only id_produto; names are resolved here once
+per window for all of its ids. Names live in memory and, unless
+PRODUCT_CACHE_PERSIST=false, in products.sqlite3 next to STATE_FILE so a
+restart does not refetch the catalogue. Only ids never seen before and
+entries older than PRODUCT_CACHE_TTL_MINUTES go to the database (one
+IN (...) query per chunk of ids); the rest cost no round trip, however
+many SKUs the store has.
+"""
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Iterable, Optional
+
+from loguru import logger
+
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS produto (
+        source TEXT NOT NULL,
+        id_produto INTEGER NOT NULL,
+        nome TEXT,
+        fetched_at REAL NOT NULL,
+        PRIMARY KEY (source, id_produto)
+    );
+"""
+
+
+class ProductCatalog:
+    """
+    id_produto -> nome for one database (PDV or Gestão).
+
+    loader(ids) returns rows with id_produto and nome (get_product_names /
+    get_loja_product_names); ids it does not return are cached as None.
+    If a fetch fails, stale names are still served, but ids with no name
+    at all make the error propagate (the window would lose its names).
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[list[int]], list[dict[str, Any]]],
+        ttl_minutes: int = 1440,
+        cache_file: Optional[Path] = None,
+        label: str = "PDV",
+    ):
+        self._loader = loader
+        self.ttl_seconds = ttl_minutes * 60
+        self.cache_file = Path(cache_file) if cache_file else None
+        self.label = label
+        self._lock = threading.Lock()
+        self._names: dict[int, Optional[str]] = {}
+        self._fetched_at: dict[int, float] = {}
+        self._conn: Optional[sqlite3.Connection] = None
+        self._loaded = False
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def names(self, ids: Iterable[int]) -> dict[int, Optional[str]]:
+        """Names for the given product ids, fetching unknown / expired ones first."""
+        with self._lock:
+            if not self._loaded:
+                self._load()
+
+            cutoff = time.time() - self.ttl_seconds
+            ids = set(ids)
+            stale = [i for i in ids if self._fetched_at.get(i, 0) < cutoff]
+            if stale:
+                self._fetch(stale)
+            return {i: self._names.get(i) for i in ids}
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _load(self) -> None:
+        """Open the SQLite cache (if persistent) and load this source's entries."""
+        self._loaded = True
+        if self.cache_file is None:
+            return
+
+        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            self._conn = sqlite3.connect(
+                self.cache_file, check_same_thread=False, isolation_level=None
+            )
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(SCHEMA)
+            for id_produto, nome, fetched_at in self._conn.execute(
+                "SELECT id_produto, nome, fetched_at FROM produto WHERE source = ?", (self.label,)
+            ):
+                self._names[id_produto] = nome
+                self._fetched_at[id_produto] = fetched_at
+        except sqlite3.DatabaseError as e:
+            logger.warning(f"[{self.label}] Invalid product cache, keeping it in memory only: {e}")
+            self.close()
+            return
+        logger.debug(f"[{self.label}] Product cache loaded: {len(self._names)} products")
+
+    def _fetch(self, ids: list[int]) -> None:
+        """Fetch names for ids from the database into memory and the SQLite cache."""
+        try:
+            rows = self._loader(ids)
+        except Exception as e:
+            if any(i not in self._fetched_at for i in ids):
+                raise
+            logger.warning(
+                f"[{self.label}] Product refresh failed, keeping {len(ids)} cached names: {e}"
+            )
+            return
+
+        now = time.time()
+        fetched = {i: None for i in ids}
+        fetched.update((row["id_produto"], row.get("nome")) for row in rows)
+        self._names.update(fetched)
+        self._fetched_at.update((i, now) for i in fetched)
+
+        if self._conn is not None:
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO produto (source, id_produto, nome, fetched_at) "
+                "VALUES (?, ?, ?, ?)",
+                [(self.label, i, nome, now) for i, nome in fetched.items()],
+            )
+            self._conn.execute("COMMIT")
+        logger.debug(f"[{self.label}] Product cache: fetched {len(ids)} products")
+
+
+def create_product_catalog(
+    loader: Callable[[list[int]], list[dict[str, Any]]],
+    ttl_minutes: int = 1440,
+    state_file: Optional[Path] = None,
+    label: str = "PDV",
+) -> ProductCatalog:
+    """
+    Factory function to create a product catalogue cache (opened on first
+    lookup), persisted in products.sqlite3 next to the state file if given.
+    """
+    cache_file = Path(state_file).parent / "products.sqlite3" if state_file else None
+    return ProductCatalog(loader, ttl_minutes, cache_file, label)
@@ -1,13 +1,24 @@
 """
 Database connection utilities for SQL Server via ODBC.
-Includes human-friendly error messages for common connection failures.
+Includes a small connection pool with lazy health checks and
+human-friendly error messages for common connection failures.
 """
 
+import threading
+import time
 from contextlib import contextmanager
-from typing import Any, Generator, Optional
+from typing import Any, Callable, Generator, Iterator, Optional
 
 import pyodbc
 from loguru import logger
+from pydantic import BaseModel
+from tenacity import (
+    retry,
+    retry_if_exception_type,
+    stop_after_attempt,
+    wait_exponential,
+    before_sleep_log,
+)
 
 from .settings import Settings
 
@@ -65,26 +76,65 @@ def _friendly_error(e: pyodbc.Error, settings: Settings) -> str:
     return f"❌ Erro de conexão: {e}"
 
 
+def _row_factory(description: Any) -> Callable[[Any], dict[str, Any]]:
+    """Build a row -> dict converter for a cursor description."""
+    columns = [column[0] for column in description]
+    return lambda row: dict(zip(columns, row))
+
+
+def _fetch_dicts(cursor: pyodbc.Cursor) -> list[dict[str, Any]]:
+    """All rows of the current result set as dicts."""
+    make_row = _row_factory(cursor.description)
+    return [make_row(row) for row in cursor.fetchall()]
+
+
+def _fetch_scalar(cursor: pyodbc.Cursor) -> Optional[Any]:
+    """First column of the first row, or None."""
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+
+class PoolStats(BaseModel):
+    """Connection pool counters (per DatabaseConnection, cumulative)."""
+
+    checkouts: int = 0  # cursors handed out
+    connects: int = 0  # physical connections opened
+    reconnects: int = 0  # connections opened to replace a discarded one
+    pings: int = 0  # validation round trips (idle TTL expired or after an error)
+    discarded: int = 0  # connections dropped after failing validation
+
+
 class DatabaseConnection:
-    """Manages SQL Server database connections."""
+    """
+    Manages SQL Server database connections.
+
+    Keeps a small pool of idle pyodbc connections. A connection is only
+    validated (SELECT 1) when it has been idle longer than
+    DB_POOL_IDLE_TTL_SECONDS or after a query on it raised a pyodbc error,
+    instead of on every cursor; execute_query / execute_scalar run their
+    statement once more when that validation finds the connection dead.
+    Connection attempts are retried with exponential backoff on transient
+    (operational) errors.
+    """
+
+    MAX_IDLE = 2  # one per concurrent extraction branch is enough
 
     def __init__(self, settings: Settings):
         self.settings = settings
-        self._connection: Optional[pyodbc.Connection] = None
         self._connection_string_override: Optional[str] = None
         self._column_cache: dict[str, list[str]] = {}
+        self._idle: list[tuple[pyodbc.Connection, float]] = []
+        self._lock = threading.Lock()
+        self._idle_ttl = settings.db_pool_idle_ttl_seconds
+        self.stats = PoolStats()
 
-    def connect(self) -> pyodbc.Connection:
-        """Establish database connection."""
-        if self._connection is not None:
-            try:
-                # Test if connection is still alive
-                self._connection.execute("SELECT 1")
-                return self._connection
-            except pyodbc.Error:
-                self._connection = None
+    @property
+    def _conn_string(self) -> str:
+        return self._connection_string_override or self.settings.odbc_connection_string
 
-        conn_string = self._connection_string_override or self.settings.odbc_connection_string
+    def connect(self) -> pyodbc.Connection:
+        """Open a new database connection (retried with backoff on transient errors)."""
+        conn_string = self._conn_string
         # Extract database name for logging
         db_name = "unknown"
         for part in conn_string.split(";"):
@@ -96,56 +146,210 @@ class DatabaseConnection:
         logger.info(f"Database: {db_name}")
 
         try:
-            self._connection = pyodbc.connect(
-                conn_string,
-                timeout=30,
-            )
-            logger.success(f"Database connection established ({db_name})")
-            return self._connection
+            connection = self._connect_with_retry(conn_string)
         except pyodbc.Error as e:
             friendly = _friendly_error(e, self.settings)
             logger.error(friendly)
             raise
 
+        with self._lock:
+            if self.stats.connects > 0:
+                self.stats.reconnects += 1
+            self.stats.connects += 1
+        logger.success(f"Database connection established ({db_name})")
+        return connection
+
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=1, max=10),
+        retry=retry_if_exception_type(pyodbc.OperationalError),
+        before_sleep=before_sleep_log(logger, "WARNING"),
+        reraise=True,
+    )
+    def _connect_with_retry(self, conn_string: str) -> pyodbc.Connection:
+        return pyodbc.connect(conn_string, timeout=30)
+
+    def _ping(self, conn: pyodbc.Connection) -> bool:
+        """Validate a connection with a cheap round trip."""
+        with self._lock:
+            self.stats.pings += 1
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except pyodbc.Error:
+            return False
+
+    def _discard(self, conn: pyodbc.Connection) -> None:
+        with self._lock:
+            self.stats.discarded += 1
+        try:
+            conn.close()
+        except pyodbc.Error:
+            pass
+
+    def _acquire(self) -> pyodbc.Connection:
+        """Check out an idle connection (validated if stale) or open a new one."""
+        with self._lock:
+            self.stats.checkouts += 1
+
+        while True:
+            with self._lock:
+                if not self._idle:
+                    break
+                conn, last_used = self._idle.pop()
+
+            if time.monotonic() - last_used < self._idle_ttl or self._ping(conn):
+                return conn
+            logger.info("Idle connection failed validation, reconnecting")
+            self._discard(conn)
+
+        return self.connect()
+
+    def _release(self, conn: pyodbc.Connection, failed: bool = False) -> bool:
+        """
+        Return a connection to the pool; after an error it is validated first.
+        Returns False if it failed validation and was discarded.
+        """
+        if failed and not self._ping(conn):
+            logger.warning("Connection lost after query error, discarding")
+            self._discard(conn)
+            return False
+
+        with self._lock:
+            if len(self._idle) < self.MAX_IDLE:
+                self._idle.append((conn, time.monotonic()))
+                return True
+        conn.close()
+        return True
+
     def close(self) -> None:
-        """Close database connection."""
-        if self._connection is not None:
+        """Close all idle database connections."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+
+        for conn, _ in idle:
             try:
-                self._connection.close()
-                logger.info("Database connection closed")
+                conn.close()
             except pyodbc.Error as e:
                 logger.warning(f"Error closing connection: {e}")
-            finally:
-                self._connection = None
+        if idle:
+            logger.info("Database connection closed")
 
     @contextmanager
     def cursor(self) -> Generator[pyodbc.Cursor, None, None]:
-        """Context manager for database cursor."""
-        conn = self.connect()
-        cursor = conn.cursor()
+        """Context manager for database cursor (pooled connection)."""
+        conn = self._acquire()
+        failed = False
+        cursor = None
         try:
+            cursor = conn.cursor()
             yield cursor
+        except pyodbc.Error:
+            failed = True
+            raise
         finally:
-            cursor.close()
+            if cursor is not None:
+                try:
+                    cursor.close()
+                except pyodbc.Error:
+                    failed = True
+            self._release(conn, failed)
+
+    def _run_statement(
+        self, query: str, params: tuple, fetch: Callable[[pyodbc.Cursor], Any]
+    ) -> Any:
+        """
+        Execute a read-only statement on a pooled connection and fetch its
+        result. Connections are not validated before every use, so one that
+        dropped while idle (within DB_POOL_IDLE_TTL_SECONDS) only shows up as
+        an error here: if the connection then fails validation, the statement
+        is run once more on a fresh connection instead of failing the cycle.
+        """
+        retried = False
+        while True:
+            conn = self._acquire()
+            try:
+                cursor = conn.cursor()
+                try:
+                    cursor.execute(query, params)
+                    result = fetch(cursor)
+                finally:
+                    cursor.close()
+            except pyodbc.Error as e:
+                if self._release(conn, failed=True) or retried:
+                    raise
+                logger.warning(f"Retrying statement on a new connection: {e}")
+                retried = True
+                continue
+
+            self._release(conn)
+            return result
 
     def execute_query(
         self, query: str, params: tuple = ()
     ) -> list[dict[str, Any]]:
         """Execute a query and return results as list of dicts."""
+        return self._run_statement(query, params, _fetch_dicts)
+
+    def iter_query(
+        self,
+        query: str,
+        params: tuple = (),
+        batch_size: Optional[int] = None,
+    ) -> Iterator[dict[str, Any]]:
+        """
+        Execute a query and stream its rows, fetching FETCH_BATCH_SIZE rows
+        at a time, so peak memory follows the batch size instead of the
+        result size.
+
+        The pooled connection stays checked out until the iterator is
+        exhausted or closed.
+        """
+        batch_size = batch_size or self.settings.fetch_batch_size
         with self.cursor() as cursor:
             cursor.execute(query, params)
-            columns = [column[0] for column in cursor.description]
-            rows = cursor.fetchall()
-            return [dict(zip(columns, row)) for row in rows]
+            make_row = _row_factory(cursor.description)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield make_row(row)
+
+    def iter_batch(
+        self,
+        query: str,
+        params: tuple = (),
+        batch_size: Optional[int] = None,
+    ) -> Iterator[tuple[int, dict[str, Any]]]:
+        """
+        Execute a multi-statement batch and stream every result set: yields
+        (result_set_index, row) for every row, in order, fetching batch_size
+        rows at a time. Statements that produce no rows (SET, SELECT INTO,
+        DROP) are skipped.
+        """
+        batch_size = batch_size or self.settings.fetch_batch_size
+        with self.cursor() as cursor:
+            cursor.execute(query, params)
+            index = 0
+            while True:
+                if cursor.description is not None:
+                    make_row = _row_factory(cursor.description)
+                    while True:
+                        rows = cursor.fetchmany(batch_size)
+                        if not rows:
+                            break
+                        for row in rows:
+                            yield index, make_row(row)
+                    index += 1
+                if not cursor.nextset():
+                    break
 
     def execute_scalar(
         self, query: str, params: tuple = ()
     ) -> Optional[Any]:
         """Execute a query and return a single value."""
-        with self.cursor() as cursor:
-            cursor.execute(query, params)
-            row = cursor.fetchone()
-            return row[0] if row else None
+        return self._run_statement(query, params, _fetch_scalar)
 
     def get_table_columns(self, table_name: str) -> list[str]:
         """Get list of column names for a table (cached per connection instance)."""
@@ -175,11 +379,9 @@ class DatabaseConnection:
         Used by --doctor mode.
         """
         try:
-            conn = self.connect()
-            cursor = conn.cursor()
-            cursor.execute("SELECT TOP 1 @@VERSION")
-            version = cursor.fetchone()[0]
-            cursor.close()
+            with self.cursor() as cursor:
+                cursor.execute("SELECT TOP 1 @@VERSION")
+                version = cursor.fetchone()[0]
             short_version = version.split("\n")[0][:80]
             return True, f"SQL Server: {short_version}"
         except Exception as e:
@@ -0,0 +1,124 @@
+"""
+In-process user directory (dbo.usuario).
+
+The hot sale item queries return only id_usuario_vendedor; names and logins
+are resolved here instead of through a LEFT JOIN dbo.usuario on every row.
+The table is loaded once with one small query and reloaded when it is older
+than USER_DIRECTORY_TTL_MINUTES or when an id it does not know shows up
+(a user created after the last load). Each user is handed out as one shared
+OperatorInfo / plain record, so a window with 100k items allocates one
+vendor object per user instead of one per item.
+"""
+
+import threading
+import time
+from typing import Any, Callable, Optional
+
+from loguru import logger
+
+from .payload import OperatorInfo
+
+# Reloads triggered by unknown ids are at most this often (ids of deleted
+# users stay unknown and must not cause a reload per row)
+UNKNOWN_ID_RELOAD_SECONDS = 60
+
+
+class UserDirectory:
+    """
+    id_usuario -> OperatorInfo for one database (PDV or Gestão).
+
+    loader() returns rows with id_usuario, nome and login (get_users /
+    get_loja_users). The first load is lazy and its errors propagate; a
+    failed reload keeps serving the previous table. Ids absent from the
+    table resolve to an entry with only id_usuario, like the LEFT JOIN did.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[], list[dict[str, Any]]],
+        ttl_minutes: int = 60,
+        label: str = "PDV",
+    ):
+        self._loader = loader
+        self.ttl_seconds = ttl_minutes * 60
+        self.label = label
+        self._lock = threading.Lock()
+        self._operators: dict[int, OperatorInfo] = {}
+        self._records: dict[int, dict[str, Any]] = {}
+        self._unknown: dict[int, OperatorInfo] = {}
+        self._loaded_at: Optional[float] = None
+
+    def __len__(self) -> int:
+        return len(self._operators)
+
+    def get(self, id_usuario: Optional[int]) -> Optional[OperatorInfo]:
+        """Shared OperatorInfo for a user id (None for a NULL id)."""
+        if not id_usuario:
+            return None
+        operator = self._operators.get(id_usuario)
+        if operator is None or self._expired():
+            operator = self._resolve(id_usuario)
+        return operator
+
+    def record(self, id_usuario: Optional[int]) -> Optional[dict[str, Any]]:
+        """Shared plain record (OperatorInfo fields) for the sale records fast path."""
+        if not id_usuario:
+            return None
+        record = self._records.get(id_usuario)
+        if record is None or self._expired():
+            self._resolve(id_usuario)
+            record = self._records[id_usuario]
+        return record
+
+    def _expired(self) -> bool:
+        return self._loaded_at is None or time.monotonic() - self._loaded_at >= self.ttl_seconds
+
+    def _resolve(self, id_usuario: int) -> OperatorInfo:
+        """Reload if stale (or the id is new and the cooldown passed), then look the id up."""
+        with self._lock:
+            if self._expired() or (
+                id_usuario not in self._operators
+                and time.monotonic() - self._loaded_at >= UNKNOWN_ID_RELOAD_SECONDS
+            ):
+                self._reload()
+
+            operator = self._operators.get(id_usuario)
+            if operator is None:
+                operator = self._unknown.get(id_usuario)
+            if operator is None:
+                operator = self._unknown[id_usuario] = OperatorInfo(id_usuario=id_usuario)
+                self._records[id_usuario] = {"id_usuario": id_usuario, "nome": None, "login": None}
+            return operator
+
+    def _reload(self) -> None:
+        """Replace the table with a fresh copy from the database."""
+        try:
+            rows = self._loader()
+        except Exception as e:
+            if self._loaded_at is None:
+                raise
+            self._loaded_at = time.monotonic()
+            logger.warning(f"[{self.label}] User directory reload failed, keeping previous table: {e}")
+            return
+
+        operators, records = {}, {}
+        for row in rows:
+            id_usuario = row["id_usuario"]
+            operators[id_usuario] = OperatorInfo(
+                id_usuario=id_usuario, nome=row.get("nome"), login=row.get("login")
+            )
+            records[id_usuario] = {
+                "id_usuario": id_usuario, "nome": row.get("nome"), "login": row.get("login")
+            }
+        self._operators, self._records, self._unknown = operators, records, {}
+        self._loaded_at = time.monotonic()
+        logger.debug(f"[{self.label}] User directory loaded: {len(operators)} users")
+
+
+def create_user_directory(
+    loader: Callable[[], list[dict[str, Any]]],
+    ttl_minutes: int = 60,
+    label: str = "PDV",
+) -> UserDirectory:
+    """Factory function to create a user directory (loaded on first lookup)."""
+    return UserDirectory(loader, ttl_minutes, label)
@@ -0,0 +1,278 @@
+"""
+File outbox (OUTBOX_STORE=files) and the byte codecs shared by the outbox
+stores and the HTTP sender.
+
+Each failed payload is one compact JSON envelope (orjson, optionally
+gzip/zstd compressed) in OUTBOX_DIR. Retry metadata lives in a small
+"<name>.retry" sidecar so a retry never rewrites the payload bytes.
+
+Payloads are kept as the exact bytes that were POSTed: the envelope is
+written as {"_retry_count":..,"_created_at":..,"payload":<bytes>} and
+load_raw() slices those bytes back out without parsing them.
+"""
+
+import gzip
+import json
+import shutil
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Optional, Union
+
+from loguru import logger
+
+try:
+    import orjson
+
+    def dumps_bytes(obj: Any) -> bytes:
+        """Compact JSON as UTF-8 bytes (orjson)."""
+        return orjson.dumps(obj, default=str)
+
+    loads_bytes = orjson.loads
+
+except ImportError:
+    def dumps_bytes(obj: Any) -> bytes:
+        """Compact JSON as UTF-8 bytes (stdlib)."""
+        return json.dumps(obj, default=str, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    loads_bytes = json.loads
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+# Days before outbox files expire
+OUTBOX_TTL_DAYS = 7
+
+# Envelope file suffix per compression; files with any of them are listed
+ENVELOPE_SUFFIXES = {"none": ".json", "gzip": ".json.gz", "zstd": ".json.zst"}
+RETRY_SIDECAR_SUFFIX = ".retry"
+# Files imported by the SQLite outbox, kept until it has sent or dead-lettered them
+MIGRATED_SUFFIX = ".migrated"
+
+_PAYLOAD_MARKER = b',"payload":'
+_GZIP_MAGIC = b"\x1f\x8b"
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+def compress(raw: bytes, kind: str) -> bytes:
+    """Compress with gzip or zstd ("none" returns raw). zstd falls back to gzip if unavailable."""
+    if kind == "none":
+        return raw
+    if kind == "zstd" and zstandard is not None:
+        return zstandard.ZstdCompressor(level=3).compress(raw)
+    return gzip.compress(raw, compresslevel=6)
+
+
+def decompress(data: bytes) -> bytes:
+    """Undo compress(), detecting the format from its magic bytes."""
+    if data.startswith(_GZIP_MAGIC):
+        return gzip.decompress(data)
+    if data.startswith(_ZSTD_MAGIC):
+        if zstandard is None:
+            raise ValueError("zstd-compressed data but zstandard is not installed")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return data
+
+
+def envelope_bytes(meta: dict[str, Any], raw: bytes) -> bytes:
+    """Envelope with the metadata keys first and the payload bytes embedded verbatim."""
+    return dumps_bytes(meta)[:-1] + _PAYLOAD_MARKER + raw + b"}"
+
+
+def split_envelope(data: bytes) -> tuple[dict[str, Any], bytes]:
+    """
+    Inverse of envelope_bytes: (metadata, payload bytes).
+    Envelopes written by older versions (indent=2, or a bare payload) are
+    parsed instead; only then is the payload re-serialized.
+    """
+    if data.startswith(b'{"_') and data.endswith(b"}") and _PAYLOAD_MARKER in data:
+        cut = data.index(_PAYLOAD_MARKER)
+        return loads_bytes(data[:cut] + b"}"), data[cut + len(_PAYLOAD_MARKER):-1]
+
+    parsed = loads_bytes(data)
+    # Handle both old format (raw payload) and envelope format
+    if "payload" in parsed and "_retry_count" in parsed:
+        raw = dumps_bytes(parsed.pop("payload"))
+        return parsed, raw
+    return {"_retry_count": 0}, data
+
+
+def _as_bytes(payload: Union[dict[str, Any], bytes]) -> bytes:
+    return payload if isinstance(payload, bytes) else dumps_bytes(payload)
+
+
+class OutboxManager:
+    """Manages the offline outbox queue and dead_letter archive."""
+
+    def __init__(self, outbox_dir: Path, compression: str = "none"):
+        self.outbox_dir = Path(outbox_dir)
+        self.dead_letter_dir = self.outbox_dir.parent / "dead_letter"
+        if compression == "zstd" and zstandard is None:
+            compression = "gzip"
+        self.compression = compression
+        self._ensure_directories()
+
+    def _ensure_directories(self) -> None:
+        """Ensure outbox and dead_letter directories exist."""
+        self.outbox_dir.mkdir(parents=True, exist_ok=True)
+        self.dead_letter_dir.mkdir(parents=True, exist_ok=True)
+
+    def describe(self, filepath: Path) -> str:
+        """Human-readable name of an entry (for logs)."""
+        return filepath.name
+
+    def _write_envelope(
+        self, directory: Path, stem: str, meta: dict[str, Any], raw: bytes
+    ) -> Path:
+        """Write a compact (optionally compressed) envelope file."""
+        filepath = directory / f"{stem}{ENVELOPE_SUFFIXES[self.compression]}"
+        filepath.write_bytes(compress(envelope_bytes(meta, raw), self.compression))
+        return filepath
+
+    @staticmethod
+    def _sidecar(filepath: Path) -> Path:
+        return filepath.with_name(filepath.name + RETRY_SIDECAR_SUFFIX)
+
+    def save(self, payload: Union[dict[str, Any], bytes], sync_id: str) -> Path:
+        """Save a failed payload (dict or already serialized bytes) to the outbox for retry."""
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+
+        # Wrap payload with retry metadata
+        meta = {
+            "_retry_count": 0,
+            "_created_at": datetime.now().isoformat(),
+            "_sync_id": sync_id,
+        }
+        filepath = self._write_envelope(
+            self.outbox_dir, f"{timestamp}_{sync_id[:12]}", meta, _as_bytes(payload)
+        )
+
+        logger.warning(f"Payload saved to outbox: {filepath}")
+        return filepath
+
+    def save_dead_letter(
+        self,
+        payload: Union[dict[str, Any], bytes],
+        sync_id: str,
+        reason: str,
+        status_code: Optional[int] = None,
+    ) -> Path:
+        """Save a permanently failed payload to dead_letter (no retry)."""
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        code_suffix = f"_{status_code}" if status_code else ""
+
+        meta = {
+            "_reason": reason,
+            "_status_code": status_code,
+            "_dead_at": datetime.now().isoformat(),
+        }
+        filepath = self._write_envelope(
+            self.dead_letter_dir, f"{timestamp}_{sync_id[:12]}{code_suffix}", meta, _as_bytes(payload)
+        )
+
+        logger.error(f"Payload moved to dead_letter: {filepath} (reason: {reason})")
+        return filepath
+
+    def envelope_files(self) -> list[Path]:
+        """All envelope files in the outbox (any compression), in name order."""
+        if not self.outbox_dir.exists():
+            return []
+        return sorted(
+            f for suffix in ENVELOPE_SUFFIXES.values()
+            for f in self.outbox_dir.glob(f"*{suffix}")
+        )
+
+    def list_pending(self) -> list[Path]:
+        """List valid pending payloads (not expired)."""
+        cutoff = datetime.now() - timedelta(days=OUTBOX_TTL_DAYS)
+        valid = []
+
+        for f in self.envelope_files():
+            # Check file age by modification time (retries only touch the sidecar)
+            mtime = datetime.fromtimestamp(f.stat().st_mtime)
+            if mtime < cutoff:
+                logger.warning(f"Outbox file expired ({OUTBOX_TTL_DAYS}d TTL): {f.name}")
+                self._move_to_dead_letter(f, reason=f"expired_ttl_{OUTBOX_TTL_DAYS}d")
+            else:
+                valid.append(f)
+
+        if valid:
+            logger.info(f"Found {len(valid)} pending payloads in outbox")
+        return valid
+
+    def load_raw(self, filepath: Path) -> Optional[tuple[dict[str, Any], bytes]]:
+        """Load (metadata, payload bytes) without parsing the payload (retry sidecar merged in)."""
+        try:
+            meta, raw = split_envelope(decompress(filepath.read_bytes()))
+
+            sidecar = self._sidecar(filepath)
+            if sidecar.exists():
+                meta.update(json.loads(sidecar.read_text(encoding="utf-8")))
+            return meta, raw
+
+        except (ValueError, IOError) as e:
+            logger.error(f"Failed to load outbox file {filepath}: {e}")
+            return None
+
+    def load(self, filepath: Path) -> Optional[dict[str, Any]]:
+        """Load and unwrap a payload from the outbox (envelope with parsed payload)."""
+        loaded = self.load_raw(filepath)
+        if loaded is None:
+            return None
+        meta, raw = loaded
+        return {**meta, "payload": loads_bytes(raw)}
+
+    def increment_retry(self, filepath: Path, envelope: dict) -> int:
+        """Increment retry count in the sidecar (payload untouched). Returns new count."""
+        envelope["_retry_count"] = envelope.get("_retry_count", 0) + 1
+        envelope["_last_retry"] = datetime.now().isoformat()
+
+        self._sidecar(filepath).write_text(
+            json.dumps({"_retry_count": envelope["_retry_count"], "_last_retry": envelope["_last_retry"]}),
+            encoding="utf-8",
+        )
+        return envelope["_retry_count"]
+
+    def remove(self, filepath: Path) -> None:
+        """Remove a successfully sent payload from the outbox."""
+        try:
+            filepath.unlink()
+            self._sidecar(filepath).unlink(missing_ok=True)
+            logger.info(f"Removed from outbox: {filepath}")
+        except IOError as e:
+            logger.warning(f"Failed to remove outbox file {filepath}: {e}")
+
+    def mark_migrated(self, filepath: Path) -> None:
+        """Set aside a file imported by the SQLite outbox (and its sidecar) as *.migrated."""
+        for path in (filepath, self._sidecar(filepath)):
+            if path.exists():
+                path.replace(path.with_name(path.name + MIGRATED_SUFFIX))
+
+    def restore_migrated(self) -> int:
+        """
+        Put files set aside by the SQLite outbox back in the queue, so going
+        back to OUTBOX_STORE=files loses none of the payloads it had not
+        drained yet. Returns the number of payload files restored.
+        """
+        restored = 0
+        for path in sorted(self.outbox_dir.glob(f"*{MIGRATED_SUFFIX}")):
+            path.replace(path.with_name(path.name[:-len(MIGRATED_SUFFIX)]))
+            if not path.name.endswith(RETRY_SIDECAR_SUFFIX + MIGRATED_SUFFIX):
+                restored += 1
+        if restored:
+            logger.warning(f"Restored {restored} outbox files previously imported into SQLite")
+        return restored
+
+    def _move_to_dead_letter(self, filepath: Path, reason: str) -> None:
+        """Move an outbox file (and its retry sidecar) to dead_letter."""
+        try:
+            dest = self.dead_letter_dir / filepath.name
+            shutil.move(str(filepath), str(dest))
+            sidecar = self._sidecar(filepath)
+            if sidecar.exists():
+                shutil.move(str(sidecar), str(self._sidecar(dest)))
+            logger.warning(f"Moved to dead_letter: {filepath.name} ({reason})")
+        except IOError as e:
+            logger.error(f"Failed to move to dead_letter: {e}")
@@ -0,0 +1,305 @@
+"""
+SQLite outbox store (OUTBOX_STORE=sqlite).
+
+Same interface as outbox.OutboxManager, but all payloads live in one
+WAL-mode database (outbox.sqlite3 next to OUTBOX_DIR) instead of one
+file each:
+  - enqueue is a single INSERT of compact (optionally compressed) JSON
+  - retry bookkeeping updates two columns, the payload bytes are untouched
+  - TTL expiry is one indexed UPDATE instead of stat()-ing every file
+  - dead letters stay in the same table (status = 'dead') with their reason
+    and are deleted DEAD_LETTER_RETENTION_DAYS after they died
+
+Entries are addressed by row id. Existing *.json files in OUTBOX_DIR are
+imported on first open and renamed to *.migrated; each one is deleted when
+its row is sent or dead-lettered, so going back to the file store
+(OutboxManager.restore_migrated) gets exactly the undrained queue back.
+"""
+
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Optional, Union
+
+from loguru import logger
+
+from .outbox import (
+    MIGRATED_SUFFIX,
+    RETRY_SIDECAR_SUFFIX,
+    OutboxManager,
+    compress,
+    decompress,
+    dumps_bytes,
+    loads_bytes,
+    zstandard,
+)
+
+
+# Days dead letters (rejected, over max retries or TTL-expired) are kept
+DEAD_LETTER_RETENTION_DAYS = 30
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS outbox (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        sync_id TEXT NOT NULL,
+        created_at REAL NOT NULL,
+        retry_count INTEGER NOT NULL DEFAULT 0,
+        last_retry REAL,
+        status TEXT NOT NULL DEFAULT 'pending',
+        reason TEXT,
+        status_code INTEGER,
+        payload BLOB NOT NULL,
+        dead_at REAL,
+        source_file TEXT
+    );
+    CREATE INDEX IF NOT EXISTS ix_outbox_status_created ON outbox (status, created_at);
+"""
+
+
+class SqliteOutboxStore:
+    """Outbox queue and dead_letter archive in a single SQLite database."""
+
+    def __init__(self, outbox_dir: Path, ttl_days: int, compression: str = "none"):
+        self.outbox_dir = Path(outbox_dir)
+        self.db_path = self.outbox_dir.parent / "outbox.sqlite3"
+        self.ttl_days = ttl_days
+        if compression == "zstd" and zstandard is None:
+            compression = "gzip"
+        self.compression = compression
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        # One connection shared by the drain workers, serialized by the lock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(outbox)")]
+        for column, kind in (("dead_at", "REAL"), ("source_file", "TEXT")):
+            if column not in columns:  # databases created by an earlier version
+                self._conn.execute(f"ALTER TABLE outbox ADD COLUMN {column} {kind}")
+
+        self._migrate_json_files()
+
+    def describe(self, key: int) -> str:
+        """Human-readable name of an entry (for logs)."""
+        return f"outbox#{key}"
+
+    def save(self, payload: Union[dict[str, Any], bytes], sync_id: str) -> str:
+        """Save a failed payload to the outbox for retry."""
+        key = self._insert(payload, sync_id, time.time())
+        logger.warning(f"Payload saved to outbox: {self.describe(key)} ({self.db_path.name})")
+        return self.describe(key)
+
+    def save_dead_letter(
+        self,
+        payload: Union[dict[str, Any], bytes],
+        sync_id: str,
+        reason: str,
+        status_code: Optional[int] = None,
+    ) -> str:
+        """Save a permanently failed payload to dead_letter (no retry)."""
+        now = time.time()
+        key = self._insert(
+            payload, sync_id, now, status="dead", reason=reason, status_code=status_code, dead_at=now
+        )
+        logger.error(f"Payload moved to dead_letter: {self.describe(key)} (reason: {reason})")
+        return self.describe(key)
+
+    def list_pending(self) -> list[int]:
+        """List valid pending entries (expired ones are dead-lettered first)."""
+        now = time.time()
+        with self._lock:
+            expired = self._conn.execute(
+                "UPDATE outbox SET status = 'dead', reason = ?, dead_at = ? "
+                "WHERE status = 'pending' AND created_at < ?",
+                (f"expired_ttl_{self.ttl_days}d", now, now - self.ttl_days * 86400),
+            ).rowcount
+            keys = [row[0] for row in self._conn.execute(
+                "SELECT id FROM outbox WHERE status = 'pending' ORDER BY id"
+            )]
+
+        if expired:
+            logger.warning(f"{expired} outbox payloads expired ({self.ttl_days}d TTL)")
+        if keys:
+            logger.info(f"Found {len(keys)} pending payloads in outbox")
+        self.prune()
+        return keys
+
+    def prune(self) -> int:
+        """
+        Delete dead letters older than DEAD_LETTER_RETENTION_DAYS, and the
+        *.migrated files of dead-lettered rows. Returns the number of rows deleted.
+        """
+        cutoff = time.time() - DEAD_LETTER_RETENTION_DAYS * 86400
+        with self._lock:
+            sources = [row[0] for row in self._conn.execute(
+                "SELECT source_file FROM outbox WHERE status = 'dead' AND source_file IS NOT NULL"
+            )]
+            self._conn.execute(
+                "UPDATE outbox SET source_file = NULL WHERE status = 'dead' AND source_file IS NOT NULL"
+            )
+            deleted = self._conn.execute(
+                "DELETE FROM outbox WHERE status = 'dead' AND COALESCE(dead_at, created_at) < ?",
+                (cutoff,),
+            ).rowcount
+        for name in sources:
+            self._discard_migrated(name)
+        if deleted:
+            logger.info(f"Pruned {deleted} dead letters older than {DEAD_LETTER_RETENTION_DAYS}d")
+        return deleted
+
+    def load_raw(self, key: int) -> Optional[tuple[dict[str, Any], bytes]]:
+        """Load (metadata, payload bytes) without parsing the payload."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT retry_count, created_at, sync_id, payload FROM outbox WHERE id = ?", (key,)
+            ).fetchone()
+        if row is None:
+            logger.error(f"Outbox entry not found: {self.describe(key)}")
+            return None
+
+        try:
+            raw = decompress(row[3])
+        except ValueError as e:
+            logger.error(f"Failed to load outbox entry {self.describe(key)}: {e}")
+            return None
+        meta = {
+            "_retry_count": row[0],
+            "_created_at": datetime.fromtimestamp(row[1]).isoformat(),
+            "_sync_id": row[2],
+        }
+        return meta, raw
+
+    def load(self, key: int) -> Optional[dict[str, Any]]:
+        """Load an entry as the envelope format used by the file outbox."""
+        loaded = self.load_raw(key)
+        if loaded is None:
+            return None
+        meta, raw = loaded
+        try:
+            return {**meta, "payload": loads_bytes(raw)}
+        except ValueError as e:
+            logger.error(f"Failed to load outbox entry {self.describe(key)}: {e}")
+            return None
+
+    def increment_retry(self, key: int, envelope: dict) -> int:
+        """Increment retry count (payload bytes untouched). Returns new count."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE outbox SET retry_count = retry_count + 1, last_retry = ? WHERE id = ?",
+                (now, key),
+            )
+            count = self._conn.execute(
+                "SELECT retry_count FROM outbox WHERE id = ?", (key,)
+            ).fetchone()[0]
+        envelope["_retry_count"] = count
+        envelope["_last_retry"] = datetime.fromtimestamp(now).isoformat()
+        return count
+
+    def remove(self, key: int) -> None:
+        """Remove a successfully sent payload from the outbox."""
+        with self._lock:
+            row = self._conn.execute("SELECT source_file FROM outbox WHERE id = ?", (key,)).fetchone()
+            self._conn.execute("DELETE FROM outbox WHERE id = ?", (key,))
+        if row and row[0]:
+            self._discard_migrated(row[0])
+        logger.info(f"Removed from outbox: {self.describe(key)}")
+
+    def _move_to_dead_letter(self, key: int, reason: str) -> None:
+        """Move an outbox entry to dead_letter."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE outbox SET status = 'dead', reason = ?, dead_at = ? WHERE id = ?",
+                (reason, time.time(), key),
+            )
+        logger.warning(f"Moved to dead_letter: {self.describe(key)} ({reason})")
+
+    def count(self, status: str = "pending") -> int:
+        """Number of entries with the given status."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM outbox WHERE status = ?", (status,)
+            ).fetchone()[0]
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def _discard_migrated(self, name: str) -> None:
+        """Delete the *.migrated file (and sidecar) an imported row came from."""
+        for suffix in ("", RETRY_SIDECAR_SUFFIX):
+            (self.outbox_dir / f"{name}{suffix}{MIGRATED_SUFFIX}").unlink(missing_ok=True)
+
+    def _is_pending(self, sync_id: str) -> bool:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT 1 FROM outbox WHERE sync_id = ? AND status = 'pending'", (sync_id,)
+            ).fetchone() is not None
+
+    def _insert(
+        self,
+        payload: Union[dict[str, Any], bytes],
+        sync_id: str,
+        created_at: float,
+        retry_count: int = 0,
+        status: str = "pending",
+        reason: Optional[str] = None,
+        status_code: Optional[int] = None,
+        dead_at: Optional[float] = None,
+        source_file: Optional[str] = None,
+    ) -> int:
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO outbox (sync_id, created_at, retry_count, status, reason, status_code, "
+                "dead_at, source_file, payload) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    sync_id, created_at, retry_count, status, reason, status_code, dead_at,
+                    source_file,
+                    compress(
+                        payload if isinstance(payload, bytes) else dumps_bytes(payload),
+                        self.compression,
+                    ),
+                ),
+            )
+            return cursor.lastrowid
+
+    def _migrate_json_files(self) -> None:
+        """
+        Import pending files left by the file outbox and set them aside as
+        *.migrated. Payloads already pending here (files restored by a
+        switch back to the file store) are not imported twice.
+        """
+        files_outbox = OutboxManager(self.outbox_dir)
+        files = files_outbox.envelope_files()
+        if not files:
+            return
+
+        logger.info(f"Migrating {len(files)} outbox files into {self.db_path.name}")
+        migrated = 0
+        for filepath in files:
+            loaded = files_outbox.load_raw(filepath)  # Old/new formats + retry sidecar
+            if loaded is None:
+                logger.error(f"Skipping unreadable outbox file {filepath.name}")
+                continue
+
+            meta, raw = loaded
+            try:
+                created_at = datetime.fromisoformat(meta["_created_at"]).timestamp()
+            except (KeyError, TypeError, ValueError):
+                created_at = filepath.stat().st_mtime
+            sync_id = meta.get("_sync_id") or (
+                loads_bytes(raw).get("integrity", {}).get("sync_id", "unknown")
+            )
+
+            if not self._is_pending(sync_id):
+                self._insert(
+                    raw, sync_id, created_at,
+                    retry_count=meta.get("_retry_count", 0), source_file=filepath.name,
+                )
+            files_outbox.mark_migrated(filepath)
+            migrated += 1
+
+        logger.info(f"Outbox migration done: {migrated}/{len(files)} files imported")
@@ -8,21 +8,46 @@ JSON structure:
   - window: from/to timestamps
   - turnos[]: per-turno data with sistema vs declarado totals
   - vendas[]: individual sale details with items and payments
-  - resumo: aggregated totals (by_vendor, by_payment)
+  - resumo: aggregated totals (by_vendor, by_payment), computed in-process
   - ops: operation IDs for deduplication
-  - integrity: sync_id + warnings
+  - integrity: sync_id + warnings (+ delta flag)
 """
 
 import hashlib
+import json
 import platform
 from datetime import datetime
 from decimal import Decimal
-from typing import Any, Optional
+from typing import TYPE_CHECKING, Any, Iterable, Optional, Union
 
-from pydantic import BaseModel, Field, computed_field
+from pydantic import BaseModel, Field, PrivateAttr, computed_field
+from pydantic_core import to_json, to_jsonable_python
 
 from . import __version__, SCHEMA_VERSION, BRT
 
+if TYPE_CHECKING:
+    from .catalog import ProductCatalog
+    from .directory import UserDirectory
+
+try:
+    import orjson
+
+    def dump_records(records: Any) -> bytes:
+        """Serialize plain records exactly like model_dump_json (orjson)."""
+        return orjson.dumps(records, default=str, option=orjson.OPT_UTC_Z)
+
+except ImportError:
+    def _record_default(obj: Any) -> str:
+        if isinstance(obj, datetime):
+            return obj.isoformat().replace("+00:00", "Z")
+        return str(obj)  # Decimal
+
+    def dump_records(records: Any) -> bytes:
+        """Serialize plain records exactly like model_dump_json (stdlib)."""
+        return json.dumps(
+            records, default=_record_default, ensure_ascii=False, separators=(",", ":")
+        ).encode("utf-8")
+
 
 def _aware(dt: Optional[datetime]) -> Optional[datetime]:
     """Attach BRT timezone to naive datetimes from SQL Server."""
@@ -33,6 +58,25 @@ def _aware(dt: Optional[datetime]) -> Optional[datetime]:
     return dt
 
 
+_ZERO = Decimal("0")
+
+
+def to_decimal(value: Any) -> Decimal:
+    """
+    Coerce a numeric DB value to Decimal with as little work as possible.
+    Decimals (pyodbc money/decimal columns) pass through untouched, ints
+    convert exactly, floats/strings are parsed once via str() (so 0.1 stays
+    Decimal("0.1")). None is 0.
+    """
+    if value.__class__ is Decimal:
+        return value
+    if value is None:
+        return _ZERO
+    if value.__class__ is int:
+        return Decimal(value)
+    return Decimal(str(value))
+
+
 # ──────────────────────────────────────────────
 # Core Info Models
 # ──────────────────────────────────────────────
@@ -78,6 +122,9 @@ class IntegrityInfo(BaseModel):
 
     sync_id: str
     warnings: list[str] = Field(default_factory=list)
+    # True when turnos/snapshots unchanged since the last acknowledged sync
+    # were omitted (DELTA_PAYLOADS)
+    delta: bool = False
 
 
 # ──────────────────────────────────────────────
@@ -279,6 +326,34 @@ class SyncPayload(BaseModel):
 
     model_config = {"populate_by_name": True}
 
+    # Fast path: plain sale records (SaleDetailsBuilder.build_records), kept
+    # out of validation; every dump below serializes them as `vendas`
+    _vendas_records: Optional[list[dict[str, Any]]] = PrivateAttr(default=None)
+
+    def model_dump(self, **kwargs: Any) -> dict[str, Any]:
+        """model_dump, with the fast-path records (if any) as vendas."""
+        data = super().model_dump(**kwargs)
+        if self._vendas_records is not None and "vendas" in data:
+            records = self._vendas_records
+            data["vendas"] = to_jsonable_python(records) if kwargs.get("mode") == "json" else records
+        return data
+
+    def model_dump_json(self, **kwargs: Any) -> str:
+        """model_dump_json, with the fast-path records (if any) as vendas."""
+        if self._vendas_records is None:
+            return super().model_dump_json(**kwargs)
+        indent = kwargs.pop("indent", None)
+        return to_json(self.model_dump(mode="json", **kwargs), indent=indent).decode("utf-8")
+
+    def to_json_bytes(self) -> bytes:
+        """The JSON body sent to the API (model_dump_json with aliases, as UTF-8)."""
+        if self._vendas_records is None:
+            return self.model_dump_json(by_alias=True).encode("utf-8")
+        # Records go straight to orjson; the rest is small and already JSON-ready
+        data = super().model_dump(mode="json", by_alias=True)
+        data["vendas"] = self._vendas_records
+        return dump_records(data)
+
 
 # ──────────────────────────────────────────────
 # Builder Functions
@@ -294,6 +369,11 @@ def generate_sync_id(store_id: int, dt_from: datetime, dt_to: datetime) -> str:
     return hashlib.sha256(data.encode()).hexdigest()
 
 
+def content_hash(entry: BaseModel) -> str:
+    """Short SHA256 of an entry's JSON, used to detect unchanged turnos/snapshots."""
+    return hashlib.sha256(entry.model_dump_json().encode()).hexdigest()[:16]
+
+
 def build_turno_detail(
     turno: dict[str, Any],
     system_payments: list[dict[str, Any]],
@@ -310,7 +390,7 @@ def build_turno_detail(
     total_vendas = 0
 
     for row in system_payments:
-        total = Decimal(str(row.get("total_pago", 0)))
+        total = to_decimal(row.get("total_pago"))
         qtd = row.get("qtd_vendas", 0)
         payment_totals.append(
             PaymentTotal(
@@ -340,7 +420,7 @@ def build_turno_detail(
         closure_payments = []
         total_declarado = Decimal("0")
         for row in closure_values:
-            total = Decimal(str(row.get("total_declarado", 0)))
+            total = to_decimal(row.get("total_declarado"))
             closure_payments.append(
                 PaymentTotal(
                     id_finalizador=row.get("id_finalizador"),
@@ -360,7 +440,7 @@ def build_turno_detail(
         shortage_payments = []
         total_falta = Decimal("0")
         for row in shortage_values:
-            total = Decimal(str(row.get("total_falta", 0)))
+            total = to_decimal(row.get("total_falta"))
             shortage_payments.append(
                 PaymentTotal(
                     id_finalizador=row.get("id_finalizador"),
@@ -440,10 +520,146 @@ def build_turno_detail(
     )
 
 
+class SaleDetailsBuilder:
+    """
+    Incremental build_sale_details for streamed rows.
+
+    Each item/payment row is converted to a plain record (dict with the
+    ProductItem/SalePayment fields, in model field order) as soon as it
+    arrives, so the raw rows can be discarded while the window is still
+    being fetched. Rows may arrive in any order; sales are emitted sorted by
+    id_operacao. An optional ResumoAggregator is fed the same rows so resumo
+    is built in the same pass.
+
+    build() validates the records into SaleDetail models; build_records()
+    returns them as-is for the fast path (serialized by dump_records, no
+    per-row pydantic work), which produces the same JSON.
+
+    With a UserDirectory, rows only need id_usuario_vendedor and every item
+    of a vendor shares one vendedor record; with a ProductCatalog, product
+    names are looked up for all ids at build time. Without them the names
+    come from the row's nome_vendedor / login_vendedor / nome_produto.
+    """
+
+    def __init__(
+        self,
+        canal: str = "HIPER_CAIXA",
+        aggregator: Optional["ResumoAggregator"] = None,
+        users: Optional["UserDirectory"] = None,
+        products: Optional["ProductCatalog"] = None,
+    ) -> None:
+        self.canal = canal
+        self.aggregator = aggregator
+        self.users = users
+        self.products = products
+        self._product_ids: set[int] = set()
+        self._items: dict[int, list[dict[str, Any]]] = {}
+        self._meta: dict[int, dict[str, Any]] = {}
+        self._totals: dict[int, Decimal] = {}
+        self._payments: dict[int, list[dict[str, Any]]] = {}
+
+    def add_item(self, item: dict[str, Any]) -> None:
+        """Add one sale item row."""
+        op_id = item["id_operacao"]
+        if op_id not in self._items:
+            self._items[op_id] = []
+            self._totals[op_id] = Decimal("0")
+            self._meta[op_id] = {
+                "data_hora": _aware(item.get("data_hora_termino")),
+                "id_turno": str(item["id_turno"]) if item.get("id_turno") else None,
+            }
+
+        total_item = to_decimal(item.get("total_item") or 0)
+        id_vendedor = item.get("id_usuario_vendedor")
+        if not id_vendedor:
+            vendedor = None
+        elif self.users is not None:
+            vendedor = self.users.record(id_vendedor)
+        else:
+            vendedor = {
+                "id_usuario": id_vendedor,
+                "nome": item.get("nome_vendedor"),
+                "login": item.get("login_vendedor"),
+            }
+        self._items[op_id].append({
+            "line_id": item.get("line_id"),
+            "line_no": item.get("line_no"),
+            "id_produto": item["id_produto"],
+            "codigo_barras": item.get("codigo_barras"),
+            "nome": item.get("nome_produto"),  # Filled from the catalog in build_records()
+            "qtd": to_decimal(item.get("qtd") or 1),
+            "preco_unit": to_decimal(item.get("preco_unit") or 0),
+            "total": total_item,
+            "desconto": to_decimal(item.get("desconto_item") or 0),
+            "vendedor": vendedor,
+        })
+        self._totals[op_id] += total_item
+        if self.products is not None:
+            self._product_ids.add(item["id_produto"])
+        if self.aggregator is not None:
+            self.aggregator.add_item(item)
+
+    def add_payment(self, pay: dict[str, Any]) -> None:
+        """Add one sale payment row."""
+        self._payments.setdefault(pay["id_operacao"], []).append({
+            "line_id": pay.get("line_id"),
+            "id_finalizador": pay.get("id_finalizador"),
+            "meio": pay.get("meio_pagamento"),
+            "valor": to_decimal(pay.get("valor") or 0),
+            "troco": to_decimal(pay.get("valor_troco") or 0),
+            "parcelas": pay.get("parcela"),
+        })
+        if self.aggregator is not None:
+            self.aggregator.add_payment(pay)
+
+    def add_items(self, rows: Iterable[dict[str, Any]]) -> None:
+        """Add sale item rows (any iterable, e.g. a streaming cursor)."""
+        for row in rows:
+            self.add_item(row)
+
+    def add_payments(self, rows: Iterable[dict[str, Any]]) -> None:
+        """Add sale payment rows (any iterable, e.g. a streaming cursor)."""
+        for row in rows:
+            self.add_payment(row)
+
+    def _resolve_product_names(self) -> None:
+        """Fill item names from the ProductCatalog (one lookup for every id of the window)."""
+        if not self._product_ids:
+            return
+        names = self.products.names(self._product_ids)
+        for items in self._items.values():
+            for item in items:
+                item["nome"] = names.get(item["id_produto"])
+        self._product_ids = set()
+
+    def build_records(self) -> list[dict[str, Any]]:
+        """Sale record (SaleDetail fields) per operation that has items, ordered by id_operacao."""
+        self._resolve_product_names()
+        sales = []
+        for op_id in sorted(self._items):
+            meta = self._meta[op_id]
+            sales.append({
+                "id_operacao": op_id,
+                "canal": self.canal,
+                "data_hora": meta["data_hora"],
+                "id_turno": meta["id_turno"],
+                "itens": self._items[op_id],
+                "pagamentos": self._payments.get(op_id, []),
+                "total": self._totals[op_id],
+            })
+        return sales
+
+    def build(self) -> list[SaleDetail]:
+        """SaleDetail per operation that has items, ordered by id_operacao."""
+        return [SaleDetail.model_validate(record) for record in self.build_records()]
+
+
 def build_sale_details(
-    sale_items: list[dict[str, Any]],
-    sale_payments: list[dict[str, Any]],
+    sale_items: Iterable[dict[str, Any]],
+    sale_payments: Iterable[dict[str, Any]],
     canal: str = "HIPER_CAIXA",
+    users: Optional["UserDirectory"] = None,
+    products: Optional["ProductCatalog"] = None,
 ) -> list[SaleDetail]:
     """
     Build individual SaleDetail objects from items and payments.
@@ -451,87 +667,141 @@ def build_sale_details(
 
     Args:
         canal: Channel identifier ("HIPER_CAIXA" or "HIPER_LOJA")
+        users: Directory resolving id_usuario_vendedor
+        products: Catalog resolving id_produto
+            (rows from get_sale_items carry no vendor or product names)
     """
-    # Group items by id_operacao
-    items_by_op: dict[int, list[dict]] = {}
-    op_meta: dict[int, dict] = {}
-
-    for row in sale_items:
-        op_id = row["id_operacao"]
-        if op_id not in items_by_op:
-            items_by_op[op_id] = []
-            op_meta[op_id] = {
-                "data_hora": _aware(row.get("data_hora_termino")),
-                "id_turno": str(row["id_turno"]) if row.get("id_turno") else None,
-            }
-        items_by_op[op_id].append(row)
-
-    # Group payments by id_operacao
-    payments_by_op: dict[int, list[dict]] = {}
-    for row in sale_payments:
-        op_id = row["id_operacao"]
-        if op_id not in payments_by_op:
-            payments_by_op[op_id] = []
-        payments_by_op[op_id].append(row)
-
-    # Build SaleDetail for each operation
-    sales = []
-    for op_id in sorted(items_by_op.keys()):
-        items = items_by_op[op_id]
-        meta = op_meta[op_id]
-
-        # Build product items
-        product_items = []
-        total_venda = Decimal("0")
-        for item in items:
-            total_item = Decimal(str(item.get("total_item") or 0))
-            product_items.append(
-                ProductItem(
-                    line_id=item.get("line_id"),
-                    line_no=item.get("line_no"),
-                    id_produto=item["id_produto"],
-                    codigo_barras=item.get("codigo_barras"),
-                    nome=item.get("nome_produto"),
-                    qtd=Decimal(str(item.get("qtd") or 1)),
-                    preco_unit=Decimal(str(item.get("preco_unit") or 0)),
-                    total=total_item,
-                    desconto=Decimal(str(item.get("desconto_item") or 0)),
-                    vendedor=OperatorInfo(
-                        id_usuario=item.get("id_usuario_vendedor"),
-                        nome=item.get("nome_vendedor"),
-                        login=item.get("login_vendedor"),
-                    ) if item.get("id_usuario_vendedor") else None,
-                )
-            )
-            total_venda += total_item
-
-        # Build payments
-        payment_list = []
-        for pay in payments_by_op.get(op_id, []):
-            payment_list.append(
-                SalePayment(
-                    line_id=pay.get("line_id"),
-                    id_finalizador=pay.get("id_finalizador"),
-                    meio=pay.get("meio_pagamento"),
-                    valor=Decimal(str(pay.get("valor") or 0)),
-                    troco=Decimal(str(pay.get("valor_troco") or 0)),
-                    parcelas=pay.get("parcela"),
-                )
-            )
+    builder = SaleDetailsBuilder(canal, users=users, products=products)
+    builder.add_payments(sale_payments)
+    builder.add_items(sale_items)
+    return builder.build()
 
-        sales.append(
-            SaleDetail(
-                id_operacao=op_id,
-                canal=canal,
-                data_hora=meta["data_hora"],
-                id_turno=meta["id_turno"],
-                itens=product_items,
-                pagamentos=payment_list,
-                total=total_venda,
-            )
+
+# ──────────────────────────────────────────────
+# Resumo Aggregation (in-process, from sale detail rows)
+# ──────────────────────────────────────────────
+
+
+class ResumoAggregator:
+    """
+    Builds the resumo aggregates in one pass over the sale detail rows
+    (get_sale_items / get_sale_payments), replacing the SQL aggregate
+    queries get_sales_by_vendor / get_payments_by_method.
+
+    Output rows have the same keys as the SQL rows, grouped per
+    (id_turno, vendedor) and (id_turno, finalizador), ordered by total DESC.
+    Vendor names come from the UserDirectory when given, else from the rows.
+    """
+
+    def __init__(self, users: Optional["UserDirectory"] = None) -> None:
+        self.users = users
+        self._vendors: dict[tuple, dict[str, Any]] = {}
+        self._vendor_ops: dict[tuple, set[int]] = {}
+        self._payments: dict[tuple, dict[str, Any]] = {}
+        self._payment_ops: dict[tuple, set[int]] = {}
+
+    def add_item(self, row: dict[str, Any]) -> None:
+        """Account one sale item row into by_vendor."""
+        id_turno = str(row["id_turno"]) if row.get("id_turno") else None
+        key = (id_turno, row.get("id_usuario_vendedor"))
+        agg = self._vendors.get(key)
+        if agg is None:
+            vendedor = self.users.get(key[1]) if self.users is not None else None
+            agg = self._vendors[key] = {
+                "id_turno": id_turno,
+                "id_usuario_vendedor": key[1],
+                "vendedor_nome": vendedor.nome if vendedor else row.get("nome_vendedor"),
+                "vendedor_login": vendedor.login if vendedor else row.get("login_vendedor"),
+                "qtd_cupons": 0,
+                "total_vendido": Decimal("0"),
+            }
+            self._vendor_ops[key] = set()
+        self._vendor_ops[key].add(row["id_operacao"])
+        agg["total_vendido"] += to_decimal(row.get("total_item") or 0)
+
+    def add_payment(self, row: dict[str, Any]) -> None:
+        """Account one sale payment row into by_payment."""
+        id_turno = str(row["id_turno"]) if row.get("id_turno") else None
+        key = (id_turno, row.get("id_finalizador"))
+        agg = self._payments.get(key)
+        if agg is None:
+            agg = self._payments[key] = {
+                "id_turno": id_turno,
+                "id_finalizador": row.get("id_finalizador"),
+                "meio_pagamento": row.get("meio_pagamento"),
+                "qtd_vendas": 0,
+                "total_pago": Decimal("0"),
+            }
+            self._payment_ops[key] = set()
+        self._payment_ops[key].add(row["id_operacao"])
+        agg["total_pago"] += to_decimal(row.get("valor") or 0)
+
+    def add_items(self, rows: Iterable[dict[str, Any]]) -> None:
+        """Account sale item rows."""
+        for row in rows:
+            self.add_item(row)
+
+    def add_payments(self, rows: Iterable[dict[str, Any]]) -> None:
+        """Account sale payment rows."""
+        for row in rows:
+            self.add_payment(row)
+
+    def vendor_rows(self) -> list[dict[str, Any]]:
+        """Rows shaped like get_sales_by_vendor."""
+        for key, agg in self._vendors.items():
+            agg["qtd_cupons"] = len(self._vendor_ops[key])
+        return sorted(self._vendors.values(), key=lambda r: r["total_vendido"], reverse=True)
+
+    def payment_rows(self) -> list[dict[str, Any]]:
+        """Rows shaped like get_payments_by_method."""
+        for key, agg in self._payments.items():
+            agg["qtd_vendas"] = len(self._payment_ops[key])
+        return sorted(self._payments.values(), key=lambda r: r["total_pago"], reverse=True)
+
+
+def _resumo_index(
+    rows: list[dict[str, Any]], id_key: str, qtd_key: str, total_key: str
+) -> dict[tuple, tuple[int, Decimal]]:
+    """Index aggregate rows by (id_turno, id) → (qtd, total) for comparison."""
+    index = {}
+    for row in rows:
+        id_turno = str(row["id_turno"]) if row.get("id_turno") else None
+        index[(id_turno, row.get(id_key))] = (
+            row.get(qtd_key, 0),
+            to_decimal(row.get(total_key) or 0),
         )
+    return index
 
-    return sales
+
+def check_resumo_consistency(
+    computed_vendors: list[dict[str, Any]],
+    computed_payments: list[dict[str, Any]],
+    sql_vendors: list[dict[str, Any]],
+    sql_payments: list[dict[str, Any]],
+    canal: str = "HIPER_CAIXA",
+) -> list[str]:
+    """
+    Compare in-process resumo aggregates with the SQL aggregate queries.
+    Returns integrity warnings for every section that diverges.
+    """
+    warnings = []
+    sections = (
+        ("by_vendor", computed_vendors, sql_vendors,
+         "id_usuario_vendedor", "qtd_cupons", "total_vendido"),
+        ("by_payment", computed_payments, sql_payments,
+         "id_finalizador", "qtd_vendas", "total_pago"),
+    )
+    for label, computed, sql, id_key, qtd_key, total_key in sections:
+        mine = _resumo_index(computed, id_key, qtd_key, total_key)
+        theirs = _resumo_index(sql, id_key, qtd_key, total_key)
+        diffs = [k for k in mine.keys() | theirs.keys() if mine.get(k) != theirs.get(k)]
+        if diffs:
+            first = sorted(str(k) for k in diffs)[0]
+            warnings.append(
+                f"RESUMO_MISMATCH: {canal} {label} differs from SQL "
+                f"in {len(diffs)} group(s), e.g. {first}"
+            )
+    return warnings
 
 
 def build_payload(
@@ -542,7 +812,7 @@ def build_payload(
     dt_to: datetime,
     window_minutes: int,
     turnos: list[TurnoDetail],
-    vendas: list[SaleDetail],
+    vendas: Union[list[SaleDetail], list[dict[str, Any]]],
     ops_ids: list[int],
     sales_by_vendor: list[dict[str, Any]],
     payments_by_method: list[dict[str, Any]],
@@ -556,8 +826,13 @@ def build_payload(
     """
     Build the complete sync payload v4.0 from query results.
     Includes both HiperCaixa (PDV) and HiperLoja (Gestão) sales and turnos.
+    vendas are SaleDetail models or, on the fast path, plain sale records
+    (SaleDetailsBuilder.build_records) kept out of validation.
     """
     loja_ids = loja_ids or []
+    vendas_records = None
+    if vendas and isinstance(vendas[0], dict):
+        vendas_records, vendas = vendas, []
 
     # Build vendor sales (resumo)
     vendors = []
@@ -568,7 +843,7 @@ def build_payload(
                 nome=row.get("vendedor_nome"),
                 login=row.get("vendedor_login"),
                 qtd_cupons=row.get("qtd_cupons", 0),
-                total_vendido=Decimal(str(row.get("total_vendido") or 0)),
+                total_vendido=to_decimal(row.get("total_vendido") or 0),
             )
         )
 
@@ -579,7 +854,7 @@ def build_payload(
             PaymentMethod(
                 id_finalizador=row.get("id_finalizador"),
                 meio=row.get("meio_pagamento"),
-                total=Decimal(str(row.get("total_pago", 0))),
+                total=to_decimal(row.get("total_pago")),
             )
         )
 
@@ -598,7 +873,7 @@ def build_payload(
     else:
         event_type = "sales"
 
-    return SyncPayload(
+    payload = SyncPayload(
         event_type=event_type,
         agent=AgentInfo(),
         store=StoreInfo(
@@ -632,4 +907,5 @@ def build_payload(
             warnings=warnings or [],
         ),
     )
-
+    payload._vendas_records = vendas_records
+    return payload
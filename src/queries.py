@@ -12,13 +12,33 @@ Operation Types (confirmed):
 """
 
 from datetime import datetime
-from typing import Any, Optional
+from typing import Any, Iterator, Optional
 
 from loguru import logger
 
 from .db import DatabaseConnection
 
 
+def _in_placeholders(count: int) -> str:
+    """Build a '?, ?, ...' placeholder list for an IN (...) clause."""
+    return ", ".join("?" for _ in range(count))
+
+
+def _group_by_turno(rows: list[dict[str, Any]]) -> dict[str, list[dict[str, Any]]]:
+    """Group result rows by str(id_turno), preserving query order within each turno."""
+    grouped: dict[str, list[dict[str, Any]]] = {}
+    for row in rows:
+        grouped.setdefault(str(row["id_turno"]), []).append(row)
+    return grouped
+
+
+# Result sets of the window extract batch, in order
+WINDOW_EXTRACT_SETS = ("ops_ids", "sale_items", "sale_payments")
+
+# Ids per IN (...) lookup query (SQL Server allows 2100 parameters)
+PRODUCT_LOOKUP_CHUNK = 1000
+
+
 class QueryExecutor:
     """Executes queries against the HiperPdv database."""
 
@@ -236,58 +256,86 @@ class QueryExecutor:
     def get_turno_closure_values(self, id_turno: str) -> list[dict[str, Any]]:
         """
         Get the values DECLARED by the operator at turno closing (operacao=9).
-        These are what the employee says they have in the register.
+        Single-turno call of get_turno_closure_values_for_turnos.
+        """
+        grouped = self.get_turno_closure_values_for_turnos([id_turno])
+        return next(iter(grouped.values()), [])
+
+    def get_turno_shortage_values(self, id_turno: str) -> list[dict[str, Any]]:
+        """
+        Get the cash shortage values (operacao=4) for a turno.
+        Single-turno call of get_turno_shortage_values_for_turnos.
         """
-        has_nome = self.db.table_has_column("finalizador_pdv", "nome")
-        name_column = "nome" if has_nome else "NULL"
+        grouped = self.get_turno_shortage_values_for_turnos([id_turno])
+        return next(iter(grouped.values()), [])
+
+    def get_turno_closure_values_for_turnos(
+        self,
+        ids_turno: list[str],
+    ) -> dict[str, list[dict[str, Any]]]:
+        """
+        Batch variant of get_turno_closure_values (operacao=9).
+        One query for all turnos, returned as {id_turno: rows}.
+        """
+        if not ids_turno:
+            return {}
+
+        name_column = self._payment_name_column()
 
         query = f"""
             SELECT
+                op.id_turno,
                 fo.id_finalizador,
                 fpv.{name_column} AS meio_pagamento,
                 SUM(ISNULL(fo.valor, 0)) AS total_declarado
             FROM dbo.operacao_pdv op
             JOIN dbo.finalizador_operacao_pdv fo ON fo.id_operacao = op.id_operacao
-            JOIN dbo.finalizador_pdv fpv ON fpv.id_finalizador = fo.id_finalizador
-            WHERE op.id_turno = ?
+            LEFT JOIN dbo.finalizador_pdv fpv ON fpv.id_finalizador = fo.id_finalizador
+            WHERE op.id_turno IN ({_in_placeholders(len(ids_turno))})
               AND op.operacao = 9
               AND op.cancelado = 0
-            GROUP BY fo.id_finalizador, fpv.{name_column}
-            ORDER BY total_declarado DESC
+            GROUP BY op.id_turno, fo.id_finalizador, fpv.{name_column}
+            ORDER BY op.id_turno, total_declarado DESC
         """
 
-        logger.debug(f"Fetching closure values for turno {str(id_turno)[:12]}...")
-        results = self.db.execute_query(query, (str(id_turno),))
-        logger.info(f"Found {len(results)} closure entries for turno")
-        return results
+        logger.debug(f"Fetching closure values for {len(ids_turno)} turno(s)")
+        results = self.db.execute_query(query, tuple(str(t) for t in ids_turno))
+        logger.info(f"Found {len(results)} closure entries for {len(ids_turno)} turno(s)")
+        return _group_by_turno(results)
 
-    def get_turno_shortage_values(self, id_turno: str) -> list[dict[str, Any]]:
+    def get_turno_shortage_values_for_turnos(
+        self,
+        ids_turno: list[str],
+    ) -> dict[str, list[dict[str, Any]]]:
         """
-        Get the cash shortage values (operacao=4) for a turno.
-        This is the difference between system total and declared total.
+        Batch variant of get_turno_shortage_values (operacao=4).
+        One query for all turnos, returned as {id_turno: rows}.
         """
-        has_nome = self.db.table_has_column("finalizador_pdv", "nome")
-        name_column = "nome" if has_nome else "NULL"
+        if not ids_turno:
+            return {}
+
+        name_column = self._payment_name_column()
 
         query = f"""
             SELECT
+                op.id_turno,
                 fo.id_finalizador,
                 fpv.{name_column} AS meio_pagamento,
                 SUM(ISNULL(fo.valor, 0)) AS total_falta
             FROM dbo.operacao_pdv op
             JOIN dbo.finalizador_operacao_pdv fo ON fo.id_operacao = op.id_operacao
-            JOIN dbo.finalizador_pdv fpv ON fpv.id_finalizador = fo.id_finalizador
-            WHERE op.id_turno = ?
+            LEFT JOIN dbo.finalizador_pdv fpv ON fpv.id_finalizador = fo.id_finalizador
+            WHERE op.id_turno IN ({_in_placeholders(len(ids_turno))})
               AND op.operacao = 4
               AND op.cancelado = 0
-            GROUP BY fo.id_finalizador, fpv.{name_column}
-            ORDER BY total_falta DESC
+            GROUP BY op.id_turno, fo.id_finalizador, fpv.{name_column}
+            ORDER BY op.id_turno, total_falta DESC
         """
 
-        logger.debug(f"Fetching shortage values for turno {str(id_turno)[:12]}...")
-        results = self.db.execute_query(query, (str(id_turno),))
-        logger.info(f"Found {len(results)} shortage entries for turno")
-        return results
+        logger.debug(f"Fetching shortage values for {len(ids_turno)} turno(s)")
+        results = self.db.execute_query(query, tuple(str(t) for t in ids_turno))
+        logger.info(f"Found {len(results)} shortage entries for {len(ids_turno)} turno(s)")
+        return _group_by_turno(results)
 
     # ──────────────────────────────────────────────
     # Operations (aggregated, for resumo/legacy)
@@ -372,6 +420,18 @@ class QueryExecutor:
         logger.info(f"Found {len(results)} vendor aggregations")
         return results
 
+    def _payment_name_column(self) -> str:
+        """
+        finalizador_pdv column used as meio_pagamento (nome, else descricao).
+        Payment queries LEFT JOIN finalizador_pdv so a payment whose
+        finalizador was deleted still counts, with meio_pagamento NULL.
+        """
+        if self.db.table_has_column("finalizador_pdv", "nome"):
+            return "nome"
+        if self.db.table_has_column("finalizador_pdv", "descricao"):
+            return "descricao"
+        return "NULL"
+
     def get_payments_by_method(
         self,
         dt_from: datetime,
@@ -381,9 +441,7 @@ class QueryExecutor:
         Get payments aggregated by payment method using CTE.
         Maps id_finalizador to nome from finalizador_pdv.
         """
-        has_nome = self.db.table_has_column("finalizador_pdv", "nome")
-        has_descricao = self.db.table_has_column("finalizador_pdv", "descricao")
-        name_column = "nome" if has_nome else ("descricao" if has_descricao else "NULL")
+        name_column = self._payment_name_column()
 
         query = f"""
             WITH ops AS (
@@ -443,18 +501,119 @@ class QueryExecutor:
         results = self.db.execute_query(query, (dt_from, dt_to))
         return [row["id_operacao"] for row in results]
 
+    def count_operations(
+        self,
+        dt_from: datetime,
+        dt_to: datetime,
+    ) -> int:
+        """
+        Count the sales in the window (same filter as get_operation_ids).
+        Used to size catch-up chunks.
+        """
+        query = """
+            SELECT COUNT(*)
+            FROM dbo.operacao_pdv op
+            WHERE op.operacao = 1
+              AND op.cancelado = 0
+              AND op.data_hora_termino IS NOT NULL
+              AND op.data_hora_termino >= ?
+              AND op.data_hora_termino < ?
+        """
+
+        return self.db.execute_scalar(query, (dt_from, dt_to)) or 0
+
+    def probe_window(
+        self,
+        dt_from: datetime,
+        dt_to: datetime,
+        id_ponto_venda: int,
+    ) -> dict[str, int]:
+        """
+        Change-detection probe: one cheap round trip telling whether the
+        window holds anything worth extracting.
+
+        - sales: sales in the window (same filter as get_operation_ids)
+        - turno_events: closure/shortage operations in the window plus
+          turnos closed within it (cases 1-2 of get_turnos_with_activity)
+        """
+        query = """
+            SELECT
+                (SELECT COUNT(*)
+                 FROM dbo.operacao_pdv op
+                 WHERE op.operacao = 1
+                   AND op.cancelado = 0
+                   AND op.data_hora_termino IS NOT NULL
+                   AND op.data_hora_termino >= ?
+                   AND op.data_hora_termino < ?) AS sales,
+                (SELECT COUNT(*)
+                 FROM dbo.operacao_pdv op
+                 WHERE op.operacao IN (4, 9)
+                   AND op.cancelado = 0
+                   AND op.data_hora_termino IS NOT NULL
+                   AND op.data_hora_termino >= ?
+                   AND op.data_hora_termino < ?)
+                + (SELECT COUNT(*)
+                   FROM dbo.turno t
+                   WHERE t.id_ponto_venda = ?
+                     AND t.fechado = 1
+                     AND t.data_hora_termino IS NOT NULL
+                     AND t.data_hora_termino >= ?
+                     AND t.data_hora_termino < ?) AS turno_events
+        """
+
+        results = self.db.execute_query(
+            query, (dt_from, dt_to, dt_from, dt_to, id_ponto_venda, dt_from, dt_to)
+        )
+        row = results[0] if results else {}
+        return {"sales": row.get("sales") or 0, "turno_events": row.get("turno_events") or 0}
+
+    # ──────────────────────────────────────────────
+    # Users and products (lookups for the sale item queries)
+    # ──────────────────────────────────────────────
+
+    def get_users(self) -> list[dict[str, Any]]:
+        """All users (id_usuario, nome, login), loaded by directory.UserDirectory."""
+        query = """
+            SELECT id_usuario, nome, login
+            FROM dbo.usuario
+        """
+
+        results = self.db.execute_query(query)
+        logger.debug(f"Loaded {len(results)} users")
+        return results
+
+    def get_product_names(self, ids_produto: list[int]) -> list[dict[str, Any]]:
+        """
+        Product names (id_produto, nome) for the given ids, loaded by
+        catalog.ProductCatalog. One query per PRODUCT_LOOKUP_CHUNK ids.
+        """
+        results = []
+        for start in range(0, len(ids_produto), PRODUCT_LOOKUP_CHUNK):
+            chunk = ids_produto[start:start + PRODUCT_LOOKUP_CHUNK]
+            query = f"""
+                SELECT id_produto, nome
+                FROM dbo.produto
+                WHERE id_produto IN ({_in_placeholders(len(chunk))})
+            """
+            results += self.db.execute_query(query, tuple(chunk))
+
+        logger.debug(f"Loaded {len(results)}/{len(ids_produto)} product names")
+        return results
+
     # ──────────────────────────────────────────────
     # Sale Details (individual, for extrato)
     # ──────────────────────────────────────────────
 
-    def get_sale_items(
+    def iter_sale_items(
         self,
         dt_from: datetime,
         dt_to: datetime,
-    ) -> list[dict[str, Any]]:
+    ) -> Iterator[dict[str, Any]]:
         """
-        Get individual sale items with product names and vendor info.
-        Each row = one item in one sale.
+        Get individual sale items.
+        Each row = one item in one sale, with only ids for product and vendor
+        (names come from get_product_names / get_users, cached).
+        Streams rows in fetch batches (see DatabaseConnection.iter_query).
         """
         query = """
             WITH ops AS (
@@ -474,42 +633,45 @@ class QueryExecutor:
                 it.item AS line_no,
                 it.id_produto,
                 it.codigo_barras,
-                p.nome AS nome_produto,
                 it.quantidade_primaria AS qtd,
                 it.valor_unitario_liquido AS preco_unit,
                 it.valor_total_liquido AS total_item,
                 ISNULL(it.valor_desconto, 0) AS desconto_item,
-                it.id_usuario_vendedor,
-                uv.nome AS nome_vendedor,
-                uv.login AS login_vendedor
+                it.id_usuario_vendedor
             FROM ops
             JOIN dbo.item_operacao_pdv it ON it.id_operacao = ops.id_operacao
-            JOIN dbo.produto p ON p.id_produto = it.id_produto
-            LEFT JOIN dbo.usuario uv ON uv.id_usuario = it.id_usuario_vendedor
             WHERE it.cancelado = 0
             ORDER BY ops.data_hora_termino, ops.id_operacao, it.item
         """
 
         logger.debug(f"Fetching sale items from {dt_from} to {dt_to}")
-        results = self.db.execute_query(query, (dt_from, dt_to))
+        yield from self.db.iter_query(query, (dt_from, dt_to))
+
+    def get_sale_items(
+        self,
+        dt_from: datetime,
+        dt_to: datetime,
+    ) -> list[dict[str, Any]]:
+        """Materialized iter_sale_items (all rows as a list)."""
+        results = list(self.iter_sale_items(dt_from, dt_to))
         logger.info(f"Found {len(results)} sale items in window")
         return results
 
-    def get_sale_payments(
+    def iter_sale_payments(
         self,
         dt_from: datetime,
         dt_to: datetime,
-    ) -> list[dict[str, Any]]:
+    ) -> Iterator[dict[str, Any]]:
         """
         Get payments per sale with parcelas and troco (change).
         Each row = one payment in one sale.
+        Streams rows in fetch batches (see DatabaseConnection.iter_query).
         """
-        has_nome = self.db.table_has_column("finalizador_pdv", "nome")
-        name_column = "nome" if has_nome else "NULL"
+        name_column = self._payment_name_column()
 
         query = f"""
             WITH ops AS (
-                SELECT id_operacao
+                SELECT id_operacao, id_turno
                 FROM dbo.operacao_pdv
                 WHERE operacao = 1 AND cancelado = 0
                   AND data_hora_termino IS NOT NULL
@@ -519,6 +681,7 @@ class QueryExecutor:
             SELECT
                 fo.id_finalizador_operacao_pdv AS line_id,
                 fo.id_operacao,
+                ops.id_turno,
                 fo.id_finalizador,
                 fpv.{name_column} AS meio_pagamento,
                 fo.valor,
@@ -526,15 +689,119 @@ class QueryExecutor:
                 fo.parcela
             FROM ops
             JOIN dbo.finalizador_operacao_pdv fo ON fo.id_operacao = ops.id_operacao
-            JOIN dbo.finalizador_pdv fpv ON fpv.id_finalizador = fo.id_finalizador
+            LEFT JOIN dbo.finalizador_pdv fpv ON fpv.id_finalizador = fo.id_finalizador
             ORDER BY fo.id_operacao, fo.id_finalizador
         """
 
         logger.debug(f"Fetching sale payments from {dt_from} to {dt_to}")
-        results = self.db.execute_query(query, (dt_from, dt_to))
+        yield from self.db.iter_query(query, (dt_from, dt_to))
+
+    def get_sale_payments(
+        self,
+        dt_from: datetime,
+        dt_to: datetime,
+    ) -> list[dict[str, Any]]:
+        """Materialized iter_sale_payments (all rows as a list)."""
+        results = list(self.iter_sale_payments(dt_from, dt_to))
         logger.info(f"Found {len(results)} sale payments in window")
         return results
 
+    # ──────────────────────────────────────────────
+    # Window Extract (single operacao_pdv scan per cycle)
+    # ──────────────────────────────────────────────
+
+    def iter_window_extract(
+        self,
+        dt_from: datetime,
+        dt_to: datetime,
+    ) -> Iterator[tuple[str, dict[str, Any]]]:
+        """
+        Scan operacao_pdv ONCE for the window into a #ops temp table and derive
+        everything the cycle needs from it in a single multi-result-set batch.
+
+        Yields (dataset, row) pairs, streamed in fetch batches, with the
+        same rows as the individual queries:
+            ops_ids       -> get_operation_ids
+            sale_items    -> get_sale_items
+            sale_payments -> get_sale_payments
+
+        The resumo aggregates are computed in-process from these rows
+        (see payload.ResumoAggregator).
+        """
+        payment_name = self._payment_name_column()
+
+        query = f"""
+            SET NOCOUNT ON;
+
+            IF OBJECT_ID('tempdb..#ops') IS NOT NULL DROP TABLE #ops;
+
+            SELECT id_operacao, id_turno, data_hora_termino
+            INTO #ops
+            FROM dbo.operacao_pdv
+            WHERE operacao = 1 AND cancelado = 0
+              AND data_hora_termino IS NOT NULL
+              AND data_hora_termino >= ?
+              AND data_hora_termino < ?;
+
+            -- 1. Operation IDs
+            SELECT id_operacao FROM #ops ORDER BY id_operacao;
+
+            -- 2. Sale items
+            SELECT
+                ops.id_operacao,
+                ops.id_turno,
+                ops.data_hora_termino,
+                it.id_item_operacao_pdv AS line_id,
+                it.item AS line_no,
+                it.id_produto,
+                it.codigo_barras,
+                it.quantidade_primaria AS qtd,
+                it.valor_unitario_liquido AS preco_unit,
+                it.valor_total_liquido AS total_item,
+                ISNULL(it.valor_desconto, 0) AS desconto_item,
+                it.id_usuario_vendedor
+            FROM #ops ops
+            JOIN dbo.item_operacao_pdv it ON it.id_operacao = ops.id_operacao
+            WHERE it.cancelado = 0
+            ORDER BY ops.data_hora_termino, ops.id_operacao, it.item;
+
+            -- 3. Sale payments
+            SELECT
+                fo.id_finalizador_operacao_pdv AS line_id,
+                fo.id_operacao,
+                ops.id_turno,
+                fo.id_finalizador,
+                fpv.{payment_name} AS meio_pagamento,
+                fo.valor,
+                ISNULL(fo.valor_troco, 0) AS valor_troco,
+                fo.parcela
+            FROM #ops ops
+            JOIN dbo.finalizador_operacao_pdv fo ON fo.id_operacao = ops.id_operacao
+            LEFT JOIN dbo.finalizador_pdv fpv ON fpv.id_finalizador = fo.id_finalizador
+            ORDER BY fo.id_operacao, fo.id_finalizador;
+
+            DROP TABLE #ops;
+        """
+
+        logger.debug(f"Fetching window extract from {dt_from} to {dt_to}")
+        for index, row in self.db.iter_batch(query, (dt_from, dt_to)):
+            yield WINDOW_EXTRACT_SETS[index], row
+
+    def get_window_extract(
+        self,
+        dt_from: datetime,
+        dt_to: datetime,
+    ) -> dict[str, Any]:
+        """Materialized iter_window_extract: {ops_ids, sale_items, sale_payments}."""
+        extract: dict[str, Any] = {name: [] for name in WINDOW_EXTRACT_SETS}
+        for name, row in self.iter_window_extract(dt_from, dt_to):
+            extract[name].append(row["id_operacao"] if name == "ops_ids" else row)
+        logger.info(
+            f"Window extract: {len(extract['ops_ids'])} operations, {len(extract['sale_items'])} items, "
+            f"{len(extract['sale_payments'])} payments"
+        )
+        return extract
+
     # ──────────────────────────────────────────────
     # Payments by Method per Turno (for turno-level totals)
     # ──────────────────────────────────────────────
@@ -545,30 +812,44 @@ class QueryExecutor:
     ) -> list[dict[str, Any]]:
         """
         Get payment totals by method for a specific turno (op=1 only).
-        Used to build totais_sistema per turno.
+        Single-turno call of get_payments_by_method_for_turnos.
+        """
+        grouped = self.get_payments_by_method_for_turnos([id_turno])
+        return next(iter(grouped.values()), [])
+
+    def get_payments_by_method_for_turnos(
+        self,
+        ids_turno: list[str],
+    ) -> dict[str, list[dict[str, Any]]]:
+        """
+        Batch variant of get_payments_by_method_for_turno (op=1 only).
+        One query for all turnos, returned as {id_turno: rows}.
         """
-        has_nome = self.db.table_has_column("finalizador_pdv", "nome")
-        name_column = "nome" if has_nome else "NULL"
+        if not ids_turno:
+            return {}
+
+        name_column = self._payment_name_column()
 
         query = f"""
             SELECT
+                op.id_turno,
                 fo.id_finalizador,
                 fpv.{name_column} AS meio_pagamento,
                 COUNT(DISTINCT op.id_operacao) AS qtd_vendas,
                 SUM(ISNULL(fo.valor, 0)) AS total_pago
             FROM dbo.operacao_pdv op
             JOIN dbo.finalizador_operacao_pdv fo ON fo.id_operacao = op.id_operacao
-            JOIN dbo.finalizador_pdv fpv ON fpv.id_finalizador = fo.id_finalizador
-            WHERE op.id_turno = ?
+            LEFT JOIN dbo.finalizador_pdv fpv ON fpv.id_finalizador = fo.id_finalizador
+            WHERE op.id_turno IN ({_in_placeholders(len(ids_turno))})
               AND op.operacao = 1
               AND op.cancelado = 0
-            GROUP BY fo.id_finalizador, fpv.{name_column}
-            ORDER BY total_pago DESC
+            GROUP BY op.id_turno, fo.id_finalizador, fpv.{name_column}
+            ORDER BY op.id_turno, total_pago DESC
         """
 
-        logger.debug(f"Fetching payments by method for turno {str(id_turno)[:12]}...")
-        results = self.db.execute_query(query, (str(id_turno),))
-        return results
+        logger.debug(f"Fetching payments by method for {len(ids_turno)} turno(s)")
+        results = self.db.execute_query(query, tuple(str(t) for t in ids_turno))
+        return _group_by_turno(results)
 
 
     # ──────────────────────────────────────────────
@@ -579,13 +860,75 @@ class QueryExecutor:
         self,
         id_ponto_venda: int,
         limit: int = 10,
+        since: Optional[datetime] = None,
     ) -> list[dict[str, Any]]:
         """
         Get the last N closed turnos with full details for verification.
         Includes responsible vendor (most items sold), sales count, and total.
+
+        Set-based: the last N turnos are picked first, then sales and items
+        are aggregated once per turno and the top vendor is ranked with
+        ROW_NUMBER in the same order as get_turno_responsavel_for_turnos
+        (items sold, then value, then lowest id_usuario).
+
+        Returns user ids only (id_operador, id_responsavel); names come from
+        the user directory.
+
+        since: only rows with data_hora_termino after this instant
+        (incremental refresh for the snapshot cache).
         """
+        since_filter = ""
+        params: tuple = (id_ponto_venda,)
+        if since is not None:
+            since_filter = "AND t.data_hora_termino > ?"
+            params += (since,)
+
         query = f"""
-            SELECT TOP {limit}
+            WITH turnos AS (
+                SELECT TOP {limit}
+                    t.id_turno, t.sequencial, t.fechado,
+                    t.data_hora_inicio, t.data_hora_termino, t.id_usuario
+                FROM dbo.turno t
+                WHERE t.id_ponto_venda = ? AND t.fechado = 1
+                  {since_filter}
+                ORDER BY t.data_hora_inicio DESC
+            ),
+            vendas AS (
+                SELECT op.id_turno, COUNT(*) AS qtd_vendas
+                FROM dbo.operacao_pdv op
+                JOIN turnos tt ON tt.id_turno = op.id_turno
+                WHERE op.operacao = 1 AND op.cancelado = 0
+                GROUP BY op.id_turno
+            ),
+            itens AS (
+                SELECT
+                    op.id_turno,
+                    SUM(it.valor_total_liquido) AS total_vendas,
+                    COUNT(DISTINCT it.id_usuario_vendedor) AS qtd_vendedores
+                FROM dbo.operacao_pdv op
+                JOIN turnos tt ON tt.id_turno = op.id_turno
+                JOIN dbo.item_operacao_pdv it ON it.id_operacao = op.id_operacao
+                WHERE op.operacao = 1 AND op.cancelado = 0 AND it.cancelado = 0
+                GROUP BY op.id_turno
+            ),
+            ranked AS (
+                SELECT
+                    op.id_turno,
+                    it.id_usuario_vendedor AS id_usuario,
+                    ROW_NUMBER() OVER (
+                        PARTITION BY op.id_turno
+                        ORDER BY COUNT(*) DESC,
+                                 SUM(it.valor_total_liquido) DESC,
+                                 it.id_usuario_vendedor ASC
+                    ) AS rn
+                FROM dbo.operacao_pdv op
+                JOIN turnos tt ON tt.id_turno = op.id_turno
+                JOIN dbo.item_operacao_pdv it ON it.id_operacao = op.id_operacao
+                WHERE op.operacao = 1 AND op.cancelado = 0 AND it.cancelado = 0
+                  AND it.id_usuario_vendedor IS NOT NULL
+                GROUP BY op.id_turno, it.id_usuario_vendedor
+            )
+            SELECT
                 t.id_turno,
                 t.sequencial,
                 t.fechado,
@@ -593,54 +936,19 @@ class QueryExecutor:
                 t.data_hora_termino,
                 DATEDIFF(MINUTE, t.data_hora_inicio, t.data_hora_termino) AS duracao_minutos,
                 t.id_usuario AS id_operador,
-                u.nome AS nome_operador,
-                u.login AS login_operador,
-                (SELECT COUNT(*) FROM dbo.operacao_pdv op
-                 WHERE op.id_turno = t.id_turno AND op.operacao = 1
-                   AND op.cancelado = 0) AS qtd_vendas,
-                (SELECT ISNULL(SUM(it.valor_total_liquido), 0)
-                 FROM dbo.operacao_pdv op2
-                 JOIN dbo.item_operacao_pdv it ON it.id_operacao = op2.id_operacao
-                 WHERE op2.id_turno = t.id_turno AND op2.operacao = 1
-                   AND op2.cancelado = 0 AND it.cancelado = 0) AS total_vendas,
-                (SELECT TOP 1 uv.id_usuario
-                 FROM dbo.operacao_pdv ov
-                 JOIN dbo.item_operacao_pdv iv ON iv.id_operacao = ov.id_operacao
-                 JOIN dbo.usuario uv ON uv.id_usuario = iv.id_usuario_vendedor
-                 WHERE ov.id_turno = t.id_turno AND ov.operacao = 1
-                   AND ov.cancelado = 0 AND iv.cancelado = 0
-                 GROUP BY uv.id_usuario ORDER BY COUNT(*) DESC
-                ) AS id_responsavel,
-                (SELECT TOP 1 uv.nome
-                 FROM dbo.operacao_pdv ov
-                 JOIN dbo.item_operacao_pdv iv ON iv.id_operacao = ov.id_operacao
-                 JOIN dbo.usuario uv ON uv.id_usuario = iv.id_usuario_vendedor
-                 WHERE ov.id_turno = t.id_turno AND ov.operacao = 1
-                   AND ov.cancelado = 0 AND iv.cancelado = 0
-                 GROUP BY uv.id_usuario, uv.nome ORDER BY COUNT(*) DESC
-                ) AS nome_responsavel,
-                (SELECT TOP 1 uv.login
-                 FROM dbo.operacao_pdv ov
-                 JOIN dbo.item_operacao_pdv iv ON iv.id_operacao = ov.id_operacao
-                 JOIN dbo.usuario uv ON uv.id_usuario = iv.id_usuario_vendedor
-                 WHERE ov.id_turno = t.id_turno AND ov.operacao = 1
-                   AND ov.cancelado = 0 AND iv.cancelado = 0
-                 GROUP BY uv.id_usuario, uv.login ORDER BY COUNT(*) DESC
-                ) AS login_responsavel,
-                (SELECT COUNT(DISTINCT iv2.id_usuario_vendedor)
-                 FROM dbo.operacao_pdv ov2
-                 JOIN dbo.item_operacao_pdv iv2 ON iv2.id_operacao = ov2.id_operacao
-                 WHERE ov2.id_turno = t.id_turno AND ov2.operacao = 1
-                   AND ov2.cancelado = 0 AND iv2.cancelado = 0
-                ) AS qtd_vendedores
-            FROM dbo.turno t
-            LEFT JOIN dbo.usuario u ON u.id_usuario = t.id_usuario
-            WHERE t.id_ponto_venda = ? AND t.fechado = 1
+                ISNULL(v.qtd_vendas, 0) AS qtd_vendas,
+                ISNULL(i.total_vendas, 0) AS total_vendas,
+                r.id_usuario AS id_responsavel,
+                ISNULL(i.qtd_vendedores, 0) AS qtd_vendedores
+            FROM turnos t
+            LEFT JOIN vendas v ON v.id_turno = t.id_turno
+            LEFT JOIN itens i ON i.id_turno = t.id_turno
+            LEFT JOIN ranked r ON r.id_turno = t.id_turno AND r.rn = 1
             ORDER BY t.data_hora_inicio DESC
         """
 
         logger.debug(f"Fetching turno snapshot (last {limit}) for store {id_ponto_venda}")
-        results = self.db.execute_query(query, (id_ponto_venda,))
+        results = self.db.execute_query(query, params)
         logger.info(f"Turno snapshot: {len(results)} closed turnos")
         return results
 
@@ -648,11 +956,22 @@ class QueryExecutor:
         self,
         id_ponto_venda: int,
         limit: int = 10,
+        since: Optional[datetime] = None,
     ) -> list[dict[str, Any]]:
         """
         Get the last N completed sales with summary for verification.
-        Includes vendor, item count, and total.
+        Includes vendor id (names come from the user directory), item count,
+        and total.
+
+        since: only rows with data_hora_termino after this instant
+        (incremental refresh for the snapshot cache).
         """
+        since_filter = ""
+        params: tuple = (id_ponto_venda,)
+        if since is not None:
+            since_filter = "AND op.data_hora_termino > ?"
+            params += (since,)
+
         query = f"""
             SELECT TOP {limit}
                 op.id_operacao,
@@ -669,31 +988,22 @@ class QueryExecutor:
                  FROM dbo.item_operacao_pdv i
                  WHERE i.id_operacao = op.id_operacao
                    AND i.cancelado = 0) AS total_itens,
-                (SELECT TOP 1 uv.id_usuario
-                 FROM dbo.item_operacao_pdv iv
-                 JOIN dbo.usuario uv ON uv.id_usuario = iv.id_usuario_vendedor
-                 WHERE iv.id_operacao = op.id_operacao
-                   AND iv.cancelado = 0) AS id_vendedor,
-                (SELECT TOP 1 uv.nome
-                 FROM dbo.item_operacao_pdv iv
-                 JOIN dbo.usuario uv ON uv.id_usuario = iv.id_usuario_vendedor
-                 WHERE iv.id_operacao = op.id_operacao
-                   AND iv.cancelado = 0) AS nome_vendedor,
-                (SELECT TOP 1 uv.login
+                (SELECT TOP 1 iv.id_usuario_vendedor
                  FROM dbo.item_operacao_pdv iv
-                 JOIN dbo.usuario uv ON uv.id_usuario = iv.id_usuario_vendedor
                  WHERE iv.id_operacao = op.id_operacao
-                   AND iv.cancelado = 0) AS login_vendedor
+                   AND iv.cancelado = 0
+                   AND iv.id_usuario_vendedor IS NOT NULL) AS id_vendedor
             FROM dbo.operacao_pdv op
             JOIN dbo.turno t ON t.id_turno = op.id_turno
             WHERE t.id_ponto_venda = ?
               AND op.operacao = 1 AND op.cancelado = 0
               AND op.data_hora_termino IS NOT NULL
+              {since_filter}
             ORDER BY op.data_hora_termino DESC
         """
 
         logger.debug(f"Fetching vendas snapshot (last {limit}) for store {id_ponto_venda}")
-        results = self.db.execute_query(query, (id_ponto_venda,))
+        results = self.db.execute_query(query, params)
         logger.info(f"Vendas snapshot: {len(results)} recent sales")
         return results
 
@@ -702,30 +1012,51 @@ class QueryExecutor:
         id_turno: str,
     ) -> Optional[dict[str, Any]]:
         """
-        Get the principal vendor (most items sold) for a specific turno.
-        Returns {id_usuario, nome} or None if no sales.
+        Get the principal vendor (most items sold) for a specific turno, or
+        None if no sales. Single-turno call of get_turno_responsavel_for_turnos.
         """
-        query = """
-            SELECT TOP 1
-                uv.id_usuario,
-                uv.nome,
-                uv.login
-            FROM dbo.operacao_pdv ov
-            JOIN dbo.item_operacao_pdv iv ON iv.id_operacao = ov.id_operacao
-            JOIN dbo.usuario uv ON uv.id_usuario = iv.id_usuario_vendedor
-            WHERE ov.id_turno = ?
-              AND ov.operacao = 1 AND ov.cancelado = 0 AND iv.cancelado = 0
-            GROUP BY uv.id_usuario, uv.nome, uv.login
-            ORDER BY COUNT(*) DESC, SUM(iv.valor_total_liquido) DESC, uv.id_usuario ASC
-        """
-
-        results = self.db.execute_query(query, (str(id_turno),))
-        if results:
-            logger.debug(
-                f"Turno {str(id_turno)[:12]}... responsavel: {results[0]['nome']}"
+        ranked = self.get_turno_responsavel_for_turnos([id_turno])
+        return next(iter(ranked.values()), None)
+
+    def get_turno_responsavel_for_turnos(
+        self,
+        ids_turno: list[str],
+    ) -> dict[str, dict[str, Any]]:
+        """
+        Batch variant of get_turno_responsavel.
+        Ranks vendors per turno (items sold, then value, then lowest
+        id_usuario, as get_turno_snapshot does) and keeps the top one.
+        Returns {id_turno: {id_turno, id_usuario}}; turnos without sales are
+        absent. Names come from the user directory.
+        """
+        if not ids_turno:
+            return {}
+
+        query = f"""
+            WITH ranked AS (
+                SELECT
+                    ov.id_turno,
+                    iv.id_usuario_vendedor AS id_usuario,
+                    ROW_NUMBER() OVER (
+                        PARTITION BY ov.id_turno
+                        ORDER BY COUNT(*) DESC,
+                                 SUM(iv.valor_total_liquido) DESC,
+                                 iv.id_usuario_vendedor ASC
+                    ) AS rn
+                FROM dbo.operacao_pdv ov
+                JOIN dbo.item_operacao_pdv iv ON iv.id_operacao = ov.id_operacao
+                WHERE ov.id_turno IN ({_in_placeholders(len(ids_turno))})
+                  AND ov.operacao = 1 AND ov.cancelado = 0 AND iv.cancelado = 0
+                  AND iv.id_usuario_vendedor IS NOT NULL
+                GROUP BY ov.id_turno, iv.id_usuario_vendedor
             )
-            return results[0]
-        return None
+            SELECT id_turno, id_usuario
+            FROM ranked
+            WHERE rn = 1
+        """
+
+        results = self.db.execute_query(query, tuple(str(t) for t in ids_turno))
+        return {str(row["id_turno"]): row for row in results}
 
 
 def create_query_executor(db: DatabaseConnection) -> QueryExecutor:
@@ -11,12 +11,28 @@ Key schema differences from HiperPdv:
   - turno IDs are INDEPENDENT between PDV and Gestão (different UUIDs)
 """
 
+import uuid
 from datetime import datetime
-from typing import Any, Optional
+from typing import Any, Iterator, Optional
 
 from loguru import logger
 
 from .db import DatabaseConnection
+from .queries import (
+    PRODUCT_LOOKUP_CHUNK,
+    WINDOW_EXTRACT_SETS,
+    _group_by_turno,
+    _in_placeholders,
+)
+
+
+def _turno_uuid(id_turno: str) -> uuid.UUID:
+    """
+    Bind a turno id as a native uniqueidentifier parameter.
+    Predicates compare id_turno columns directly so they stay index-seekable;
+    CONVERT(VARCHAR(36), ...) is only used in the projection.
+    """
+    return uuid.UUID(str(id_turno))
 
 
 class GestaoQueryExecutor:
@@ -94,19 +110,121 @@ class GestaoQueryExecutor:
         results = self.db.execute_query(query, (dt_from, dt_to, id_filial))
         return [row["id_operacao"] for row in results]
 
+    def count_loja_operations(
+        self,
+        dt_from: datetime,
+        dt_to: datetime,
+        id_filial: int,
+    ) -> int:
+        """
+        Count the Loja sales in the window (same filter as get_loja_operation_ids).
+        Used to size catch-up chunks.
+        """
+        query = """
+            SELECT COUNT(*)
+            FROM dbo.operacao_pdv op
+            WHERE op.operacao = 1
+              AND op.cancelado = 0
+              AND op.origem = 2
+              AND op.data_hora_termino IS NOT NULL
+              AND op.data_hora_termino >= ?
+              AND op.data_hora_termino < ?
+              AND op.id_filial = ?
+        """
+
+        return self.db.execute_scalar(query, (dt_from, dt_to, id_filial)) or 0
+
+    def probe_loja_window(
+        self,
+        dt_from: datetime,
+        dt_to: datetime,
+        id_filial: int,
+    ) -> dict[str, int]:
+        """
+        Change-detection probe for Gestão (see QueryExecutor.probe_window):
+        Loja sales plus turno closure/shortage events in the window.
+        """
+        query = """
+            SELECT
+                (SELECT COUNT(*)
+                 FROM dbo.operacao_pdv op
+                 WHERE op.operacao = 1
+                   AND op.cancelado = 0
+                   AND op.origem = 2
+                   AND op.data_hora_termino IS NOT NULL
+                   AND op.data_hora_termino >= ?
+                   AND op.data_hora_termino < ?
+                   AND op.id_filial = ?) AS sales,
+                (SELECT COUNT(*)
+                 FROM dbo.operacao_pdv op
+                 WHERE op.operacao IN (4, 9)
+                   AND op.origem = 2
+                   AND op.data_hora_termino IS NOT NULL
+                   AND op.data_hora_termino >= ?
+                   AND op.data_hora_termino < ?
+                   AND op.id_filial = ?)
+                + (SELECT COUNT(*)
+                   FROM dbo.turno t
+                   WHERE t.fechado = 1
+                     AND t.data_hora_termino IS NOT NULL
+                     AND t.data_hora_termino >= ?
+                     AND t.data_hora_termino < ?
+                     AND t.id_filial = ?) AS turno_events
+        """
+
+        params = (dt_from, dt_to, id_filial) * 3
+        results = self.db.execute_query(query, params)
+        row = results[0] if results else {}
+        return {"sales": row.get("sales") or 0, "turno_events": row.get("turno_events") or 0}
+
+    # ──────────────────────────────────────────────
+    # Users and products (lookups for the sale item queries)
+    # ──────────────────────────────────────────────
+
+    def get_loja_users(self) -> list[dict[str, Any]]:
+        """All Gestão users (id_usuario, nome, login), loaded by directory.UserDirectory."""
+        query = """
+            SELECT id_usuario, nome, login
+            FROM dbo.usuario
+        """
+
+        results = self.db.execute_query(query)
+        logger.debug(f"[Gestão] Loaded {len(results)} users")
+        return results
+
+    def get_loja_product_names(self, ids_produto: list[int]) -> list[dict[str, Any]]:
+        """
+        Gestão product names (id_produto, nome) for the given ids, loaded by
+        catalog.ProductCatalog. One query per PRODUCT_LOOKUP_CHUNK ids.
+        """
+        results = []
+        for start in range(0, len(ids_produto), PRODUCT_LOOKUP_CHUNK):
+            chunk = ids_produto[start:start + PRODUCT_LOOKUP_CHUNK]
+            query = f"""
+                SELECT id_produto, nome
+                FROM dbo.produto
+                WHERE id_produto IN ({_in_placeholders(len(chunk))})
+            """
+            results += self.db.execute_query(query, tuple(chunk))
+
+        logger.debug(f"[Gestão] Loaded {len(results)}/{len(ids_produto)} product names")
+        return results
+
     # ──────────────────────────────────────────────
     # Sale items
     # ──────────────────────────────────────────────
 
-    def get_loja_sale_items(
+    def iter_loja_sale_items(
         self,
         dt_from: datetime,
         dt_to: datetime,
         id_filial: int,
-    ) -> list[dict[str, Any]]:
+    ) -> Iterator[dict[str, Any]]:
         """
-        Get individual sale items for Loja sales with product names and vendor info.
-        Each row = one item in one sale.
+        Get individual sale items for Loja sales.
+        Each row = one item in one sale, with only ids for product and vendor
+        (names come from get_loja_product_names / get_loja_users, cached).
+        Streams rows in fetch batches (see DatabaseConnection.iter_query).
         """
         query = """
             WITH ops AS (
@@ -128,24 +246,28 @@ class GestaoQueryExecutor:
                 it.item AS line_no,
                 it.id_produto,
                 it.codigo_barras,
-                p.nome AS nome_produto,
                 it.quantidade_primaria AS qtd,
                 it.valor_unitario_liquido AS preco_unit,
                 it.valor_total_liquido AS total_item,
                 ISNULL(it.valor_desconto, 0) AS desconto_item,
-                it.id_usuario_vendedor,
-                uv.nome AS nome_vendedor,
-                uv.login AS login_vendedor
+                it.id_usuario_vendedor
             FROM ops
             JOIN dbo.item_operacao_pdv it ON it.id_operacao = ops.id_operacao
-            JOIN dbo.produto p ON p.id_produto = it.id_produto
-            LEFT JOIN dbo.usuario uv ON uv.id_usuario = it.id_usuario_vendedor
             WHERE it.cancelado = 0
             ORDER BY ops.data_hora_termino, ops.id_operacao, it.item
         """
 
         logger.debug(f"[Gestão] Fetching Loja sale items from {dt_from} to {dt_to}")
-        results = self.db.execute_query(query, (dt_from, dt_to, id_filial))
+        yield from self.db.iter_query(query, (dt_from, dt_to, id_filial))
+
+    def get_loja_sale_items(
+        self,
+        dt_from: datetime,
+        dt_to: datetime,
+        id_filial: int,
+    ) -> list[dict[str, Any]]:
+        """Materialized iter_loja_sale_items (all rows as a list)."""
+        results = list(self.iter_loja_sale_items(dt_from, dt_to, id_filial))
         logger.info(f"[Gestão] Found {len(results)} Loja sale items in window")
         return results
 
@@ -155,21 +277,22 @@ class GestaoQueryExecutor:
     #       Troco is in operacao_pdv.ValorTroco instead
     # ──────────────────────────────────────────────
 
-    def get_loja_sale_payments(
+    def iter_loja_sale_payments(
         self,
         dt_from: datetime,
         dt_to: datetime,
         id_filial: int,
-    ) -> list[dict[str, Any]]:
+    ) -> Iterator[dict[str, Any]]:
         """
         Get payments per Loja sale.
         Each row = one payment in one sale.
 
         NOTE: valor_troco comes from operacao_pdv.ValorTroco (not finalizador_operacao_pdv).
+        Streams rows in fetch batches (see DatabaseConnection.iter_query).
         """
         query = """
             WITH ops AS (
-                SELECT id_operacao, ISNULL(ValorTroco, 0) AS valor_troco_op
+                SELECT id_operacao, id_turno, ISNULL(ValorTroco, 0) AS valor_troco_op
                 FROM dbo.operacao_pdv
                 WHERE operacao = 1 AND cancelado = 0
                   AND origem = 2
@@ -182,6 +305,7 @@ class GestaoQueryExecutor:
                 SELECT
                     fo.id_finalizador_operacao_pdv AS line_id,
                     fo.id_operacao,
+                    CONVERT(VARCHAR(36), ops.id_turno) AS id_turno,
                     fo.id_finalizador,
                     fpv.nome AS meio_pagamento,
                     fo.valor,
@@ -198,6 +322,7 @@ class GestaoQueryExecutor:
             SELECT
                 line_id,
                 id_operacao,
+                id_turno,
                 id_finalizador,
                 meio_pagamento,
                 valor,
@@ -208,7 +333,16 @@ class GestaoQueryExecutor:
         """
 
         logger.debug(f"[Gestão] Fetching Loja sale payments from {dt_from} to {dt_to}")
-        results = self.db.execute_query(query, (dt_from, dt_to, id_filial))
+        yield from self.db.iter_query(query, (dt_from, dt_to, id_filial))
+
+    def get_loja_sale_payments(
+        self,
+        dt_from: datetime,
+        dt_to: datetime,
+        id_filial: int,
+    ) -> list[dict[str, Any]]:
+        """Materialized iter_loja_sale_payments (all rows as a list)."""
+        results = list(self.iter_loja_sale_payments(dt_from, dt_to, id_filial))
         logger.info(f"[Gestão] Found {len(results)} Loja sale payments in window")
         return results
 
@@ -311,6 +445,114 @@ class GestaoQueryExecutor:
         logger.info(f"[Gestão] Found {len(results)} Loja payment method aggregations")
         return results
 
+    # ──────────────────────────────────────────────
+    # Window extract (single operacao_pdv scan per cycle)
+    # ──────────────────────────────────────────────
+
+    def iter_loja_window_extract(
+        self,
+        dt_from: datetime,
+        dt_to: datetime,
+        id_filial: int,
+    ) -> Iterator[tuple[str, dict[str, Any]]]:
+        """
+        Scan the Loja operations of the window ONCE into a #ops temp table and
+        derive ids, items and payments from it in a single multi-result-set
+        batch. Yields (dataset, row) pairs streamed in fetch batches; rows
+        match the individual get_loja_* queries.
+        """
+        query = """
+            SET NOCOUNT ON;
+
+            IF OBJECT_ID('tempdb..#ops') IS NOT NULL DROP TABLE #ops;
+
+            SELECT id_operacao, id_turno, data_hora_termino,
+                   ISNULL(ValorTroco, 0) AS valor_troco_op
+            INTO #ops
+            FROM dbo.operacao_pdv
+            WHERE operacao = 1 AND cancelado = 0
+              AND origem = 2
+              AND data_hora_termino IS NOT NULL
+              AND data_hora_termino >= ?
+              AND data_hora_termino < ?
+              AND id_filial = ?;
+
+            -- 1. Operation IDs
+            SELECT id_operacao FROM #ops ORDER BY id_operacao;
+
+            -- 2. Sale items
+            SELECT
+                ops.id_operacao,
+                CONVERT(VARCHAR(36), ops.id_turno) AS id_turno,
+                ops.data_hora_termino,
+                it.id_item_operacao_pdv AS line_id,
+                it.item AS line_no,
+                it.id_produto,
+                it.codigo_barras,
+                it.quantidade_primaria AS qtd,
+                it.valor_unitario_liquido AS preco_unit,
+                it.valor_total_liquido AS total_item,
+                ISNULL(it.valor_desconto, 0) AS desconto_item,
+                it.id_usuario_vendedor
+            FROM #ops ops
+            JOIN dbo.item_operacao_pdv it ON it.id_operacao = ops.id_operacao
+            WHERE it.cancelado = 0
+            ORDER BY ops.data_hora_termino, ops.id_operacao, it.item;
+
+            -- 3. Sale payments (troco from operacao_pdv.ValorTroco, first payment only)
+            WITH pagamentos AS (
+                SELECT
+                    fo.id_finalizador_operacao_pdv AS line_id,
+                    fo.id_operacao,
+                    CONVERT(VARCHAR(36), ops.id_turno) AS id_turno,
+                    fo.id_finalizador,
+                    fpv.nome AS meio_pagamento,
+                    fo.valor,
+                    ops.valor_troco_op,
+                    fo.parcela,
+                    ROW_NUMBER() OVER (
+                        PARTITION BY fo.id_operacao
+                        ORDER BY fo.id_finalizador ASC
+                    ) AS rn
+                FROM #ops ops
+                JOIN dbo.finalizador_operacao_pdv fo ON fo.id_operacao = ops.id_operacao
+                LEFT JOIN dbo.finalizador_pdv fpv ON fpv.id_finalizador = fo.id_finalizador
+            )
+            SELECT
+                line_id,
+                id_operacao,
+                id_turno,
+                id_finalizador,
+                meio_pagamento,
+                valor,
+                CASE WHEN rn = 1 THEN valor_troco_op ELSE 0 END AS valor_troco,
+                parcela
+            FROM pagamentos
+            ORDER BY id_operacao, id_finalizador;
+
+            DROP TABLE #ops;
+        """
+
+        logger.debug(f"[Gestão] Fetching Loja window extract from {dt_from} to {dt_to}")
+        for index, row in self.db.iter_batch(query, (dt_from, dt_to, id_filial)):
+            yield WINDOW_EXTRACT_SETS[index], row
+
+    def get_loja_window_extract(
+        self,
+        dt_from: datetime,
+        dt_to: datetime,
+        id_filial: int,
+    ) -> dict[str, Any]:
+        """Materialized iter_loja_window_extract: {ops_ids, sale_items, sale_payments}."""
+        extract: dict[str, Any] = {name: [] for name in WINDOW_EXTRACT_SETS}
+        for name, row in self.iter_loja_window_extract(dt_from, dt_to, id_filial):
+            extract[name].append(row["id_operacao"] if name == "ops_ids" else row)
+        logger.info(
+            f"[Gestão] Loja window extract: {len(extract['ops_ids'])} operations, "
+            f"{len(extract['sale_items'])} items, {len(extract['sale_payments'])} payments"
+        )
+        return extract
+
     # ──────────────────────────────────────────────
     # Vendas snapshot (últimas N vendas Loja)
     # ──────────────────────────────────────────────
@@ -319,11 +561,22 @@ class GestaoQueryExecutor:
         self,
         id_filial: int,
         limit: int = 10,
+        since: Optional[datetime] = None,
     ) -> list[dict[str, Any]]:
         """
         Get the last N completed Loja sales with summary for verification.
-        Includes vendor, item count, total, and login.
+        Includes vendor id (names come from the user directory), item count,
+        and total.
+
+        since: only rows with data_hora_termino after this instant
+        (incremental refresh for the snapshot cache).
         """
+        since_filter = ""
+        params: tuple = (id_filial,)
+        if since is not None:
+            since_filter = "AND op.data_hora_termino > ?"
+            params += (since,)
+
         query = f"""
             SELECT TOP {limit}
                 op.id_operacao,
@@ -339,31 +592,22 @@ class GestaoQueryExecutor:
                  FROM dbo.item_operacao_pdv i
                  WHERE i.id_operacao = op.id_operacao
                    AND i.cancelado = 0) AS total_itens,
-                (SELECT TOP 1 uv.id_usuario
+                (SELECT TOP 1 iv.id_usuario_vendedor
                  FROM dbo.item_operacao_pdv iv
-                 JOIN dbo.usuario uv ON uv.id_usuario = iv.id_usuario_vendedor
                  WHERE iv.id_operacao = op.id_operacao
-                   AND iv.cancelado = 0) AS id_vendedor,
-                (SELECT TOP 1 uv.nome
-                 FROM dbo.item_operacao_pdv iv
-                 JOIN dbo.usuario uv ON uv.id_usuario = iv.id_usuario_vendedor
-                 WHERE iv.id_operacao = op.id_operacao
-                   AND iv.cancelado = 0) AS nome_vendedor,
-                (SELECT TOP 1 uv.login
-                 FROM dbo.item_operacao_pdv iv
-                 JOIN dbo.usuario uv ON uv.id_usuario = iv.id_usuario_vendedor
-                 WHERE iv.id_operacao = op.id_operacao
-                   AND iv.cancelado = 0) AS login_vendedor
+                   AND iv.cancelado = 0
+                   AND iv.id_usuario_vendedor IS NOT NULL) AS id_vendedor
             FROM dbo.operacao_pdv op
             WHERE op.operacao = 1 AND op.cancelado = 0
               AND op.origem = 2
               AND op.data_hora_termino IS NOT NULL
               AND op.id_filial = ?
+              {since_filter}
             ORDER BY op.data_hora_termino DESC
         """
 
         logger.debug(f"[Gestão] Fetching Loja vendas snapshot (last {limit}) for filial {id_filial}")
-        results = self.db.execute_query(query, (id_filial,))
+        results = self.db.execute_query(query, params)
         logger.info(f"[Gestão] Loja vendas snapshot: {len(results)} recent sales")
         return results
 
@@ -373,6 +617,21 @@ class GestaoQueryExecutor:
     # Uses id_filial instead of id_ponto_venda
     # ══════════════════════════════════════════════
 
+    def get_loja_open_turnos(self, id_filial: int) -> list[dict[str, Any]]:
+        """
+        Get the currently open Gestão turnos of the filial (one per caixa).
+        Polled by the closure watch (--loop with ADAPTIVE_SCHEDULE).
+        """
+        query = """
+            SELECT t.id_turno
+            FROM dbo.turno t
+            WHERE t.fechado = 0
+              AND t.id_filial = ?
+        """
+
+        logger.debug(f"[Gestão] Fetching open Loja turnos for filial {id_filial}")
+        return self.db.execute_query(query, (id_filial,))
+
     def get_loja_turnos_with_activity(
         self,
         dt_from: datetime,
@@ -389,7 +648,7 @@ class GestaoQueryExecutor:
         """
         query = """
             WITH activity AS (
-                SELECT DISTINCT CONVERT(VARCHAR(36), op.id_turno) AS id_turno
+                SELECT DISTINCT op.id_turno
                 FROM dbo.operacao_pdv op
                 WHERE op.operacao IN (1, 4, 9)
                   AND op.origem = 2
@@ -399,7 +658,7 @@ class GestaoQueryExecutor:
                   AND op.id_filial = ?
             ),
             recent_close AS (
-                SELECT CONVERT(VARCHAR(36), t.id_turno) AS id_turno
+                SELECT t.id_turno
                 FROM dbo.turno t
                 WHERE t.fechado = 1
                   AND t.data_hora_termino IS NOT NULL
@@ -408,7 +667,7 @@ class GestaoQueryExecutor:
                   AND t.id_filial = ?
             ),
             open_turno AS (
-                SELECT CONVERT(VARCHAR(36), t.id_turno) AS id_turno
+                SELECT t.id_turno
                 FROM dbo.turno t
                 WHERE t.fechado = 0
                   AND t.id_filial = ?
@@ -430,7 +689,7 @@ class GestaoQueryExecutor:
                 u.nome AS nome_operador,
                 u.login AS login_operador
             FROM all_ids a
-            JOIN dbo.turno t ON CONVERT(VARCHAR(36), t.id_turno) = a.id_turno
+            JOIN dbo.turno t ON t.id_turno = a.id_turno
             LEFT JOIN dbo.usuario u ON u.id_usuario = t.id_usuario
             ORDER BY t.data_hora_inicio DESC
         """
@@ -448,12 +707,63 @@ class GestaoQueryExecutor:
         id_turno: str,
     ) -> list[dict[str, Any]]:
         """
-        Get the values DECLARED by the operator at turno closing (operacao=9).
-        These are what the employee says they have in the register.
-        Uses Gestão DB (which has its own independent turno IDs).
+        Get the values DECLARED by the operator at Gestão turno closing (operacao=9).
+        Single-turno call of get_loja_turno_closure_values_for_turnos.
         """
-        query = """
+        grouped = self.get_loja_turno_closure_values_for_turnos([id_turno])
+        return next(iter(grouped.values()), [])
+
+    def get_loja_turno_shortage_values(
+        self,
+        id_turno: str,
+    ) -> list[dict[str, Any]]:
+        """
+        Get the cash shortage values (operacao=4) for a Gestão turno.
+        Single-turno call of get_loja_turno_shortage_values_for_turnos.
+        """
+        grouped = self.get_loja_turno_shortage_values_for_turnos([id_turno])
+        return next(iter(grouped.values()), [])
+
+    def get_loja_payments_by_method_for_turno(
+        self,
+        id_turno: str,
+    ) -> list[dict[str, Any]]:
+        """
+        Get payment totals by method for a specific Gestão turno (op=1, origem=2).
+        Single-turno call of get_loja_payments_by_method_for_turnos.
+        """
+        grouped = self.get_loja_payments_by_method_for_turnos([id_turno])
+        return next(iter(grouped.values()), [])
+
+    def get_loja_turno_responsavel(
+        self,
+        id_turno: str,
+    ) -> Optional[dict[str, Any]]:
+        """
+        Get the principal vendor for a specific Gestão turno, or None if no
+        sales. Single-turno call of get_loja_turno_responsavel_for_turnos.
+        """
+        ranked = self.get_loja_turno_responsavel_for_turnos([id_turno])
+        return next(iter(ranked.values()), None)
+
+    # ──────────────────────────────────────────────
+    # Batch turno queries (one round trip for all turnos)
+    # ──────────────────────────────────────────────
+
+    def get_loja_turno_closure_values_for_turnos(
+        self,
+        ids_turno: list[str],
+    ) -> dict[str, list[dict[str, Any]]]:
+        """
+        Batch variant of get_loja_turno_closure_values (operacao=9).
+        Returns {id_turno: rows} for all requested Gestão turnos.
+        """
+        if not ids_turno:
+            return {}
+
+        query = f"""
             SELECT
+                CONVERT(VARCHAR(36), op.id_turno) AS id_turno,
                 fo.id_finalizador,
                 fpv.nome AS meio_pagamento,
                 SUM(ISNULL(fo.valor, 0)) AS total_declarado
@@ -461,24 +771,28 @@ class GestaoQueryExecutor:
             JOIN dbo.finalizador_operacao_pdv fo ON fo.id_operacao = op.id_operacao
             LEFT JOIN dbo.finalizador_pdv fpv ON fpv.id_finalizador = fo.id_finalizador
             WHERE op.operacao = 9
-              AND CONVERT(VARCHAR(36), op.id_turno) = ?
-            GROUP BY fo.id_finalizador, fpv.nome
-            ORDER BY fo.id_finalizador
+              AND op.id_turno IN ({_in_placeholders(len(ids_turno))})
+            GROUP BY op.id_turno, fo.id_finalizador, fpv.nome
+            ORDER BY id_turno, fo.id_finalizador
         """
 
-        results = self.db.execute_query(query, (id_turno,))
-        return results
+        results = self.db.execute_query(query, tuple(_turno_uuid(i) for i in ids_turno))
+        return _group_by_turno(results)
 
-    def get_loja_turno_shortage_values(
+    def get_loja_turno_shortage_values_for_turnos(
         self,
-        id_turno: str,
-    ) -> list[dict[str, Any]]:
+        ids_turno: list[str],
+    ) -> dict[str, list[dict[str, Any]]]:
         """
-        Get the cash shortage values (operacao=4) for a Gestão turno.
-        This is the difference between system total and declared total.
+        Batch variant of get_loja_turno_shortage_values (operacao=4).
+        Returns {id_turno: rows} for all requested Gestão turnos.
         """
-        query = """
+        if not ids_turno:
+            return {}
+
+        query = f"""
             SELECT
+                CONVERT(VARCHAR(36), op.id_turno) AS id_turno,
                 fo.id_finalizador,
                 fpv.nome AS meio_pagamento,
                 SUM(ISNULL(fo.valor, 0)) AS total_falta
@@ -486,33 +800,35 @@ class GestaoQueryExecutor:
             JOIN dbo.finalizador_operacao_pdv fo ON fo.id_operacao = op.id_operacao
             LEFT JOIN dbo.finalizador_pdv fpv ON fpv.id_finalizador = fo.id_finalizador
             WHERE op.operacao = 4
-              AND CONVERT(VARCHAR(36), op.id_turno) = ?
-            GROUP BY fo.id_finalizador, fpv.nome
-            ORDER BY fo.id_finalizador
+              AND op.id_turno IN ({_in_placeholders(len(ids_turno))})
+            GROUP BY op.id_turno, fo.id_finalizador, fpv.nome
+            ORDER BY id_turno, fo.id_finalizador
         """
 
-        results = self.db.execute_query(query, (id_turno,))
-        return results
+        results = self.db.execute_query(query, tuple(_turno_uuid(i) for i in ids_turno))
+        return _group_by_turno(results)
 
-    def get_loja_payments_by_method_for_turno(
+    def get_loja_payments_by_method_for_turnos(
         self,
-        id_turno: str,
-    ) -> list[dict[str, Any]]:
+        ids_turno: list[str],
+    ) -> dict[str, list[dict[str, Any]]]:
         """
-        Get payment totals by method for a specific Gestão turno (op=1 only).
-        Used to build totais_sistema per turno.
-
-        NOTE: Only counts Loja sales (origem=2).
+        Batch variant of get_loja_payments_by_method_for_turno (op=1, origem=2).
+        Returns {id_turno: rows} for all requested Gestão turnos.
         """
-        query = """
+        if not ids_turno:
+            return {}
+
+        query = f"""
             WITH ops AS (
-                SELECT id_operacao
+                SELECT id_operacao, id_turno
                 FROM dbo.operacao_pdv
                 WHERE operacao = 1 AND cancelado = 0
                   AND origem = 2
-                  AND CONVERT(VARCHAR(36), id_turno) = ?
+                  AND id_turno IN ({_in_placeholders(len(ids_turno))})
             )
             SELECT
+                CONVERT(VARCHAR(36), ops.id_turno) AS id_turno,
                 fo.id_finalizador,
                 fpv.nome AS meio_pagamento,
                 COUNT(DISTINCT fo.id_operacao) AS qtd_vendas,
@@ -520,56 +836,137 @@ class GestaoQueryExecutor:
             FROM ops
             JOIN dbo.finalizador_operacao_pdv fo ON fo.id_operacao = ops.id_operacao
             LEFT JOIN dbo.finalizador_pdv fpv ON fpv.id_finalizador = fo.id_finalizador
-            GROUP BY fo.id_finalizador, fpv.nome
-            ORDER BY total_pago DESC
+            GROUP BY ops.id_turno, fo.id_finalizador, fpv.nome
+            ORDER BY id_turno, total_pago DESC
         """
 
-        results = self.db.execute_query(query, (id_turno,))
-        return results
+        results = self.db.execute_query(query, tuple(_turno_uuid(i) for i in ids_turno))
+        return _group_by_turno(results)
 
-    def get_loja_turno_responsavel(
+    def get_loja_turno_responsavel_for_turnos(
         self,
-        id_turno: str,
-    ) -> Optional[dict[str, Any]]:
+        ids_turno: list[str],
+    ) -> dict[str, dict[str, Any]]:
         """
-        Get the principal vendor (most items sold) for a specific Gestão turno.
-        Returns {id_usuario, nome, login} or None if no sales.
+        Batch variant of get_loja_turno_responsavel.
+        Ranks vendors per turno (value sold, then lowest id_usuario_vendedor,
+        as get_loja_turno_snapshot does) and keeps the top one.
+        Returns {id_turno: {id_turno, id_usuario}}; turnos without sales are
+        absent. Names come from the user directory.
         """
-        query = """
+        if not ids_turno:
+            return {}
+
+        query = f"""
             WITH ops AS (
-                SELECT id_operacao
+                SELECT id_operacao, id_turno
                 FROM dbo.operacao_pdv
                 WHERE operacao = 1 AND cancelado = 0
                   AND origem = 2
-                  AND CONVERT(VARCHAR(36), id_turno) = ?
+                  AND id_turno IN ({_in_placeholders(len(ids_turno))})
+            ),
+            ranked AS (
+                SELECT
+                    ops.id_turno,
+                    it.id_usuario_vendedor AS id_usuario,
+                    ROW_NUMBER() OVER (
+                        PARTITION BY ops.id_turno
+                        ORDER BY SUM(it.valor_total_liquido) DESC,
+                                 it.id_usuario_vendedor ASC
+                    ) AS rn
+                FROM ops
+                JOIN dbo.item_operacao_pdv it ON it.id_operacao = ops.id_operacao
+                WHERE it.cancelado = 0
+                  AND it.id_usuario_vendedor IS NOT NULL
+                GROUP BY ops.id_turno, it.id_usuario_vendedor
             )
-            SELECT TOP 1
-                it.id_usuario_vendedor AS id_usuario,
-                u.nome,
-                u.login
-            FROM ops
-            JOIN dbo.item_operacao_pdv it ON it.id_operacao = ops.id_operacao
-            LEFT JOIN dbo.usuario u ON u.id_usuario = it.id_usuario_vendedor
-            WHERE it.cancelado = 0
-              AND it.id_usuario_vendedor IS NOT NULL
-            GROUP BY it.id_usuario_vendedor, u.nome, u.login
-            ORDER BY SUM(it.valor_total_liquido) DESC
+            SELECT
+                CONVERT(VARCHAR(36), id_turno) AS id_turno,
+                id_usuario
+            FROM ranked
+            WHERE rn = 1
         """
 
-        results = self.db.execute_query(query, (id_turno,))
-        return results[0] if results else None
+        results = self.db.execute_query(query, tuple(_turno_uuid(i) for i in ids_turno))
+        return {str(row["id_turno"]): row for row in results}
 
     def get_loja_turno_snapshot(
         self,
         id_filial: int,
         limit: int = 10,
+        since: Optional[datetime] = None,
     ) -> list[dict[str, Any]]:
         """
         Get the last N closed Gestão turnos with full details for verification.
-        Includes responsible vendor (most items sold), sales count, and total.
+        Includes responsible vendor (highest sold value), sales count, and total.
+
+        Set-based: the last N turnos are picked first, then sales and items
+        are aggregated once per turno and the top vendor is ranked with
+        ROW_NUMBER in the same order as get_loja_turno_responsavel_for_turnos
+        (value sold, then lowest id_usuario_vendedor).
+
+        Returns user ids only (id_operador, id_responsavel); names come from
+        the user directory.
+
+        since: only rows with data_hora_termino after this instant
+        (incremental refresh for the snapshot cache).
         """
+        since_filter = ""
+        params: tuple = (id_filial,)
+        if since is not None:
+            since_filter = "AND t.data_hora_termino > ?"
+            params += (since,)
+
         query = f"""
-            SELECT TOP {limit}
+            WITH turnos AS (
+                SELECT TOP {limit}
+                    t.id_turno, t.sequencial, t.fechado,
+                    t.data_hora_inicio, t.data_hora_termino, t.id_usuario
+                FROM dbo.turno t
+                WHERE t.fechado = 1
+                  AND t.id_filial = ?
+                  {since_filter}
+                ORDER BY t.data_hora_termino DESC
+            ),
+            vendas AS (
+                SELECT op.id_turno, COUNT(DISTINCT op.id_operacao) AS qtd_vendas
+                FROM dbo.operacao_pdv op
+                JOIN turnos tt ON tt.id_turno = op.id_turno
+                WHERE op.operacao = 1 AND op.cancelado = 0
+                  AND op.origem = 2
+                GROUP BY op.id_turno
+            ),
+            itens AS (
+                SELECT
+                    op.id_turno,
+                    SUM(i.valor_total_liquido) AS total_vendas,
+                    COUNT(DISTINCT i.id_usuario_vendedor) AS qtd_vendedores
+                FROM dbo.operacao_pdv op
+                JOIN turnos tt ON tt.id_turno = op.id_turno
+                JOIN dbo.item_operacao_pdv i ON i.id_operacao = op.id_operacao
+                WHERE op.operacao = 1 AND op.cancelado = 0
+                  AND op.origem = 2
+                  AND i.cancelado = 0
+                GROUP BY op.id_turno
+            ),
+            ranked AS (
+                SELECT
+                    op.id_turno,
+                    i.id_usuario_vendedor,
+                    ROW_NUMBER() OVER (
+                        PARTITION BY op.id_turno
+                        ORDER BY SUM(i.valor_total_liquido) DESC, i.id_usuario_vendedor ASC
+                    ) AS rn
+                FROM dbo.operacao_pdv op
+                JOIN turnos tt ON tt.id_turno = op.id_turno
+                JOIN dbo.item_operacao_pdv i ON i.id_operacao = op.id_operacao
+                WHERE op.operacao = 1 AND op.cancelado = 0
+                  AND op.origem = 2
+                  AND i.cancelado = 0
+                  AND i.id_usuario_vendedor IS NOT NULL
+                GROUP BY op.id_turno, i.id_usuario_vendedor
+            )
+            SELECT
                 CONVERT(VARCHAR(36), t.id_turno) AS id_turno,
                 t.sequencial,
                 t.fechado,
@@ -578,75 +975,19 @@ class GestaoQueryExecutor:
                 DATEDIFF(MINUTE, t.data_hora_inicio, t.data_hora_termino)
                     AS duracao_minutos,
                 t.id_usuario AS id_operador,
-                u.nome AS nome_operador,
-                u.login AS login_operador,
-                (SELECT COUNT(DISTINCT op.id_operacao)
-                 FROM dbo.operacao_pdv op
-                 WHERE op.operacao = 1 AND op.cancelado = 0
-                   AND op.origem = 2
-                   AND CONVERT(VARCHAR(36), op.id_turno) = CONVERT(VARCHAR(36), t.id_turno)
-                ) AS qtd_vendas,
-                (SELECT ISNULL(SUM(i.valor_total_liquido), 0)
-                 FROM dbo.operacao_pdv op
-                 JOIN dbo.item_operacao_pdv i ON i.id_operacao = op.id_operacao
-                 WHERE op.operacao = 1 AND op.cancelado = 0
-                   AND op.origem = 2
-                   AND i.cancelado = 0
-                   AND CONVERT(VARCHAR(36), op.id_turno) = CONVERT(VARCHAR(36), t.id_turno)
-                ) AS total_vendas,
-                (SELECT COUNT(DISTINCT i2.id_usuario_vendedor)
-                 FROM dbo.operacao_pdv op2
-                 JOIN dbo.item_operacao_pdv i2 ON i2.id_operacao = op2.id_operacao
-                 WHERE op2.operacao = 1 AND op2.cancelado = 0
-                   AND op2.origem = 2
-                   AND i2.cancelado = 0
-                   AND i2.id_usuario_vendedor IS NOT NULL
-                   AND CONVERT(VARCHAR(36), op2.id_turno) = CONVERT(VARCHAR(36), t.id_turno)
-                ) AS qtd_vendedores,
-                (SELECT TOP 1 i3.id_usuario_vendedor
-                 FROM dbo.operacao_pdv op3
-                 JOIN dbo.item_operacao_pdv i3 ON i3.id_operacao = op3.id_operacao
-                 WHERE op3.operacao = 1 AND op3.cancelado = 0
-                   AND op3.origem = 2
-                   AND i3.cancelado = 0
-                   AND i3.id_usuario_vendedor IS NOT NULL
-                   AND CONVERT(VARCHAR(36), op3.id_turno) = CONVERT(VARCHAR(36), t.id_turno)
-                 GROUP BY i3.id_usuario_vendedor
-                 ORDER BY SUM(i3.valor_total_liquido) DESC
-                ) AS id_responsavel,
-                (SELECT TOP 1 u3.nome
-                 FROM dbo.operacao_pdv op3
-                 JOIN dbo.item_operacao_pdv i3 ON i3.id_operacao = op3.id_operacao
-                 LEFT JOIN dbo.usuario u3 ON u3.id_usuario = i3.id_usuario_vendedor
-                 WHERE op3.operacao = 1 AND op3.cancelado = 0
-                   AND op3.origem = 2
-                   AND i3.cancelado = 0
-                   AND i3.id_usuario_vendedor IS NOT NULL
-                   AND CONVERT(VARCHAR(36), op3.id_turno) = CONVERT(VARCHAR(36), t.id_turno)
-                 GROUP BY i3.id_usuario_vendedor, u3.nome
-                 ORDER BY SUM(i3.valor_total_liquido) DESC
-                ) AS nome_responsavel,
-                (SELECT TOP 1 u3.login
-                 FROM dbo.operacao_pdv op3
-                 JOIN dbo.item_operacao_pdv i3 ON i3.id_operacao = op3.id_operacao
-                 LEFT JOIN dbo.usuario u3 ON u3.id_usuario = i3.id_usuario_vendedor
-                 WHERE op3.operacao = 1 AND op3.cancelado = 0
-                   AND op3.origem = 2
-                   AND i3.cancelado = 0
-                   AND i3.id_usuario_vendedor IS NOT NULL
-                   AND CONVERT(VARCHAR(36), op3.id_turno) = CONVERT(VARCHAR(36), t.id_turno)
-                 GROUP BY i3.id_usuario_vendedor, u3.login
-                 ORDER BY SUM(i3.valor_total_liquido) DESC
-                ) AS login_responsavel
-            FROM dbo.turno t
-            LEFT JOIN dbo.usuario u ON u.id_usuario = t.id_usuario
-            WHERE t.fechado = 1
-              AND t.id_filial = ?
+                ISNULL(v.qtd_vendas, 0) AS qtd_vendas,
+                ISNULL(i.total_vendas, 0) AS total_vendas,
+                ISNULL(i.qtd_vendedores, 0) AS qtd_vendedores,
+                r.id_usuario_vendedor AS id_responsavel
+            FROM turnos t
+            LEFT JOIN vendas v ON v.id_turno = t.id_turno
+            LEFT JOIN itens i ON i.id_turno = t.id_turno
+            LEFT JOIN ranked r ON r.id_turno = t.id_turno AND r.rn = 1
             ORDER BY t.data_hora_termino DESC
         """
 
         logger.debug(f"[Gestão] Fetching Loja turno snapshot (last {limit}) for filial {id_filial}")
-        results = self.db.execute_query(query, (id_filial,))
+        results = self.db.execute_query(query, params)
         logger.info(f"[Gestão] Loja turno snapshot: {len(results)} recent turnos")
         return results
 
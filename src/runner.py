@@ -7,17 +7,21 @@ Flow:
   3. Gather turno-level data (sistema vs declarado) — PDV + Gestão
   4. Gather individual sale details (items + payments) — PDV + Loja
   5. Build aggregated resumo — PDV + Loja combined
-  6. Build snapshots (turnos + vendas) — PDV + Gestão combined
-  7. Send JSON payload
+  6. Build snapshots (turnos + vendas) — PDV + Gestão combined, cached
+  7. Send JSON payload (delta: unchanged turnos/snapshots omitted)
   8. Update state on success
 """
 
-from datetime import datetime
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from itertools import chain
+from typing import Any, Callable, Iterator, Optional
 
 from loguru import logger
 
+from .catalog import ProductCatalog, create_product_catalog
 from .db import DatabaseConnection, create_db_connection, create_gestao_db_connection
+from .directory import UserDirectory, create_user_directory
 from .payload import (
     SyncPayload,
     TurnoDetail,
@@ -25,16 +29,39 @@ from .payload import (
     VendaSnapshot,
     SaleDetail,
     OperatorInfo,
+    ResumoAggregator,
+    SaleDetailsBuilder,
     build_payload,
     build_turno_detail,
-    build_sale_details,
+    check_resumo_consistency,
+    content_hash,
     _aware,
 )
 from .queries import QueryExecutor, create_query_executor
 from .queries_gestao import GestaoQueryExecutor, create_gestao_query_executor
 from .sender import HttpSender, SendResult, create_sender
 from .settings import Settings
-from .state import StateManager, WindowCalculator, create_state_manager, create_window_calculator
+from .state import (
+    DeltaState,
+    SnapshotCache,
+    StateManager,
+    WindowCalculator,
+    create_delta_state,
+    create_snapshot_cache,
+    create_state_manager,
+    create_window_calculator,
+)
+
+
+# Smallest catch-up chunk when splitting by CATCHUP_MAX_OPS
+_MIN_CATCHUP_CHUNK = timedelta(minutes=1)
+
+# Delta payloads: payload list → entry key
+_DELTA_SECTIONS: dict[str, Callable[[Any], str]] = {
+    "turnos": lambda t: f"{t.canal}:{t.id_turno}",
+    "snapshot_turnos": lambda t: f"{t.canal}:{t.id_turno}",
+    "snapshot_vendas": lambda v: f"{v.canal}:{v.id_operacao}",
+}
 
 
 class SyncRunner:
@@ -50,6 +77,12 @@ class SyncRunner:
         sender: HttpSender,
         state_manager: StateManager,
         window_calculator: WindowCalculator,
+        snapshot_cache: Optional[SnapshotCache] = None,
+        delta_state: Optional[DeltaState] = None,
+        users_pdv: Optional[UserDirectory] = None,
+        users_loja: Optional[UserDirectory] = None,
+        products_pdv: Optional[ProductCatalog] = None,
+        products_loja: Optional[ProductCatalog] = None,
     ):
         self.settings = settings
         self.db = db
@@ -59,7 +92,18 @@ class SyncRunner:
         self.sender = sender
         self.state_manager = state_manager
         self.window_calculator = window_calculator
+        self.snapshot_cache = snapshot_cache
+        self.delta_state = delta_state
+        # Vendor / operator and product names per database (the item queries
+        # return ids only)
+        self.users_pdv = users_pdv
+        self.users_loja = users_loja
+        self.products_pdv = products_pdv
+        self.products_loja = products_loja
         self._gestao_warning: Optional[str] = None
+        # Activity of the last run() (read by the adaptive scheduler)
+        self.last_cycle_ops = 0
+        self.last_window_minutes = 0.0
 
     def run(self) -> bool:
         """
@@ -76,6 +120,8 @@ class SyncRunner:
         logger.info("=" * 60)
         logger.info("Starting PDV Sync v4.0")
         logger.info("=" * 60)
+        self.last_cycle_ops = 0
+        self.last_window_minutes = 0.0
 
         try:
             # Step 1: Process outbox queue
@@ -85,52 +131,195 @@ class SyncRunner:
 
             # Step 2: Calculate sync window
             dt_from, dt_to = self.window_calculator.calculate_window()
+            self.last_window_minutes = (dt_to - dt_from).total_seconds() / 60
 
-            # Step 3: Gather data and build payload
-            payload = self._build_payload(dt_from, dt_to)
-            if payload is None:
-                logger.warning("No payload to send (possibly no data in window)")
-                self.window_calculator.mark_success(dt_to)
-                return True  # Not an error, just no data
-
-            # Step 3.5: Decide if POST is needed
-            # POST if: has sales (PDV or Loja) OR a turno closed in this window
-            has_sales = payload.ops.count > 0 or payload.ops.loja_count > 0
-            has_closed_turno = any(t.fechado for t in payload.turnos)
-
-            if not has_sales and not has_closed_turno:
-                logger.info("No sales and no turno closure — skipping POST")
-                self.window_calculator.mark_success(dt_to)
-                return True
-
-            if has_closed_turno and not has_sales:
-                logger.info(
-                    "No new sales but turno CLOSED — sending closure data"
-                )
-
-            # Step 4: Send payload
-            result = self._send_payload(payload)
+            # Step 2.5: Oversized window (agent was offline) → catch-up in chunks
+            if dt_to - dt_from > timedelta(minutes=self.settings.catchup_chunk_minutes):
+                return self._run_catchup(dt_from, dt_to)
 
-            # Step 5: Update state on success
-            if result.success:
-                self.window_calculator.mark_success(dt_to)
-                logger.success("Sync completed successfully")
-                return True
-            else:
-                logger.warning("Sync completed with errors (payload saved to outbox)")
-                return False
+            return self._sync_window(dt_from, dt_to)
 
         except Exception as e:
             logger.exception(f"Sync failed with exception: {e}")
             return False
 
         finally:
+            logger.debug(
+                f"DB pool — PDV: {self.db.stats.model_dump()} | "
+                f"Gestão: {self.gestao_db.stats.model_dump()}"
+            )
+            logger.debug(f"Upload: {self.sender.stats.model_dump()}")
             logger.info("=" * 60)
 
+    def _sync_window(self, dt_from: datetime, dt_to: datetime) -> bool:
+        """
+        Build, send and commit one window (steps 3-5 of run).
+        Returns True if the window was committed (state advanced to dt_to).
+        """
+        # Step 2.9: Change probe — skip the extraction on idle windows
+        if self.settings.change_probe and not self._window_has_changes(dt_from, dt_to):
+            logger.info("Probe: no sales and no turno events — skipping extraction")
+            self.window_calculator.mark_success(dt_to)
+            return True
+
+        # Step 3: Gather data and build payload
+        payload = self._build_payload(dt_from, dt_to)
+        if payload is None:
+            logger.warning("No payload to send (possibly no data in window)")
+            self.window_calculator.mark_success(dt_to)
+            return True  # Not an error, just no data
+
+        # Step 3.2: Delta — drop turnos/snapshots the API already has
+        delta_hashes = self._apply_delta(payload)
+
+        # Step 3.5: Decide if POST is needed
+        # POST if: has sales (PDV or Loja) OR a turno closed in this window
+        self.last_cycle_ops += payload.ops.count + payload.ops.loja_count
+        has_sales = payload.ops.count > 0 or payload.ops.loja_count > 0
+        has_closed_turno = any(t.fechado for t in payload.turnos)
+
+        if not has_sales and not has_closed_turno:
+            logger.info("No sales and no turno closure — skipping POST")
+            self.window_calculator.mark_success(dt_to)
+            return True
+
+        if has_closed_turno and not has_sales:
+            logger.info(
+                "No new sales but turno CLOSED — sending closure data"
+            )
+
+        # Step 4: Send payload
+        result = self._send_payload(payload)
+
+        # Step 5: Update state on success
+        if result.success:
+            self.window_calculator.mark_success(dt_to)
+            if self.delta_state is not None:
+                self.delta_state.acknowledge(delta_hashes, full=not payload.integrity.delta)
+            logger.success("Sync completed successfully")
+            return True
+        else:
+            logger.warning("Sync completed with errors (payload saved to outbox)")
+            return False
+
+    def _apply_delta(self, payload: SyncPayload) -> dict[str, dict[str, str]]:
+        """
+        Delta payloads: hash every turno / snapshot entry and, unless a full
+        resend is due, remove the ones whose content the API already
+        acknowledged (payload.integrity.delta is set then).
+        Returns the hashes of all entries, to be acknowledged after a
+        successful POST.
+        """
+        if self.delta_state is None:
+            return {}
+
+        full = self.delta_state.needs_full_resend()
+        hashes: dict[str, dict[str, str]] = {}
+        omitted = 0
+        for section, key_of in _DELTA_SECTIONS.items():
+            entries = getattr(payload, section)
+            digests = [(key_of(e), content_hash(e)) for e in entries]
+            hashes[section] = dict(digests)
+            if full:
+                continue
+            kept = [
+                e for e, (key, digest) in zip(entries, digests)
+                if not self.delta_state.is_acknowledged(section, key, digest)
+            ]
+            omitted += len(entries) - len(kept)
+            setattr(payload, section, kept)
+
+        payload.integrity.delta = not full
+        logger.info(
+            "Delta: full resend" if full
+            else f"Delta: {omitted} unchanged turnos/snapshots omitted"
+        )
+        return hashes
+
+    def _window_has_changes(self, dt_from: datetime, dt_to: datetime) -> bool:
+        """
+        Probe both databases (one tiny query each) for sales or turno
+        closure/shortage events in the window. Any probe failure counts as
+        a change so the full extraction (and its error handling) runs.
+        """
+        try:
+            pdv = self.queries.probe_window(
+                dt_from, dt_to, self.settings.store_id_ponto_venda
+            )
+            loja = self.gestao_queries.probe_loja_window(
+                dt_from, dt_to, self.settings.resolved_store_id_filial
+            )
+        except Exception as e:
+            logger.warning(f"Change probe failed, running full extraction: {e}")
+            return True
+
+        logger.debug(f"Probe — PDV: {pdv} | Loja: {loja}")
+        return any(pdv.values()) or any(loja.values())
+
+    def _run_catchup(self, dt_from: datetime, dt_to: datetime) -> bool:
+        """
+        Catch-up mode: process an oversized window as sequential chunks.
+        Each chunk is committed (mark_success) before the next one starts, so a
+        crash or failed POST resumes from the last completed chunk.
+        """
+        logger.warning(
+            f"Catch-up mode: window of {dt_to - dt_from} split into chunks of "
+            f"≤{self.settings.catchup_chunk_minutes} min / "
+            f"≤{self.settings.catchup_max_ops} operations"
+        )
+        for n, (chunk_from, chunk_to) in enumerate(
+            self._catchup_chunks(dt_from, dt_to), start=1
+        ):
+            logger.info(f"Catch-up chunk {n}: {chunk_from} -> {chunk_to}")
+            if not self._sync_window(chunk_from, chunk_to):
+                logger.warning(
+                    f"Catch-up stopped at chunk {n}; next cycle resumes from {chunk_from}"
+                )
+                return False
+
+        logger.success("Catch-up completed")
+        return True
+
+    def _catchup_chunks(
+        self, dt_from: datetime, dt_to: datetime
+    ) -> Iterator[tuple[datetime, datetime]]:
+        """
+        Yield consecutive [from, to) chunks covering the window. A chunk is
+        at most CATCHUP_CHUNK_MINUTES long and is halved while it holds more
+        than CATCHUP_MAX_OPS sales (PDV + Loja), down to one minute.
+        Chunks are computed lazily, right before each one is processed.
+        """
+        chunk = timedelta(minutes=self.settings.catchup_chunk_minutes)
+        max_ops = self.settings.catchup_max_ops
+        start = dt_from
+        while start < dt_to:
+            end = min(start + chunk, dt_to)
+            while end - start > _MIN_CATCHUP_CHUNK and self._count_window_ops(start, end) > max_ops:
+                end = start + (end - start) / 2
+            yield start, end
+            start = end
+
+    def _count_window_ops(self, dt_from: datetime, dt_to: datetime) -> int:
+        """Sales in the window across both channels (Gestão failures count as 0)."""
+        count = self.queries.count_operations(dt_from, dt_to)
+        try:
+            count += self.gestao_queries.count_loja_operations(
+                dt_from, dt_to, self.settings.resolved_store_id_filial
+            )
+        except Exception as e:
+            logger.warning(f"[Gestão] Failed to count Loja operations: {e}")
+        return count
+
     def _build_payload(
         self, dt_from: datetime, dt_to: datetime
     ) -> Optional[SyncPayload]:
-        """Build the sync payload v4.0 from both databases."""
+        """
+        Build the sync payload v4.0 from both databases.
+
+        The PDV and Gestão branches hit independent databases through their
+        own DatabaseConnection, so they run concurrently (one worker thread
+        per branch) unless PARALLEL_EXTRACT=false.
+        """
         logger.info("Gathering data from databases (PDV + Gestão)")
 
         store_id = self.settings.store_id_ponto_venda
@@ -142,76 +331,41 @@ class SyncRunner:
                 "Set STORE_ID_FILIAL in .env if PDV and Gestão use different store IDs."
             )
 
-        # ── Store Info ──
-        store_info = self.queries.get_store_info(store_id)
+        if self.settings.parallel_extract:
+            with ThreadPoolExecutor(max_workers=2, thread_name_prefix="extract") as pool:
+                pdv_future = pool.submit(self._gather_pdv, dt_from, dt_to)
+                loja_future = pool.submit(self._gather_loja, dt_from, dt_to, store_id_filial)
+                pdv = pdv_future.result()
+                loja = loja_future.result()
+        else:
+            pdv = self._gather_pdv(dt_from, dt_to)
+            loja = self._gather_loja(dt_from, dt_to, store_id_filial)
+
+        store_info = pdv["store_info"]
         store_name = store_info["nome"] if store_info else f"PDV {store_id}"
         store_cnpj = store_info.get("cnpj") if store_info else None
 
-        # ══════════════════════════════════════
-        # PDV (HiperPdv / Caixa) data
-        # ══════════════════════════════════════
-        ops_ids = self.queries.get_operation_ids(dt_from, dt_to)
-        if not ops_ids:
-            logger.info("[PDV] No operations found in window")
-
-        # Turnos PDV (canal=HIPER_CAIXA)
-        turnos_pdv = self._build_turnos(dt_from, dt_to)
-
-        # Individual PDV sale details (marked as HIPER_CAIXA)
-        vendas_pdv = self._build_sale_details(dt_from, dt_to, canal="HIPER_CAIXA")
-
-        # PDV aggregated data
-        sales_by_vendor_pdv = self.queries.get_sales_by_vendor(dt_from, dt_to)
-        payments_by_method_pdv = self.queries.get_payments_by_method(dt_from, dt_to)
-
-        # ══════════════════════════════════════
-        # Gestão (Hiper / Loja) data
-        # ══════════════════════════════════════
-        turnos_loja = []
-        try:
-            loja_ids = self.gestao_queries.get_loja_operation_ids(
-                dt_from, dt_to, store_id_filial
-            )
-            if loja_ids:
-                logger.info(f"[Gestão] Found {len(loja_ids)} Loja operations in window")
-            else:
-                logger.info("[Gestão] No Loja operations in window")
-
-            # Turnos Gestão (canal=HIPER_LOJA) — independent UUIDs
-            turnos_loja = self._build_loja_turnos(dt_from, dt_to)
-
-            # Individual Loja sale details (marked as HIPER_LOJA)
-            vendas_loja = self._build_loja_sale_details(dt_from, dt_to)
-
-            # Loja aggregated data
-            sales_by_vendor_loja = self.gestao_queries.get_loja_sales_by_vendor(
-                dt_from, dt_to, store_id_filial
-            )
-            payments_by_method_loja = self.gestao_queries.get_loja_payments_by_method(
-                dt_from, dt_to, store_id_filial
-            )
-        except Exception as e:
-            logger.warning(f"[Gestão] Failed to fetch Loja data: {e}")
-            self._gestao_warning = f"GESTAO_DB_FAILURE: {str(e)[:200]}"
-            loja_ids = []
-            vendas_loja = []
-            sales_by_vendor_loja = []
-            payments_by_method_loja = []
-
         # ══════════════════════════════════════
         # Merge both channels
         # ══════════════════════════════════════
-        turnos = turnos_pdv + turnos_loja
-        vendas = vendas_pdv + vendas_loja
-        sales_by_vendor = sales_by_vendor_pdv + sales_by_vendor_loja
-        payments_by_method = payments_by_method_pdv + payments_by_method_loja
+        turnos = pdv["turnos"] + loja["turnos"]
+        vendas = pdv["vendas"] + loja["vendas"]
+        sales_by_vendor = pdv["sales_by_vendor"] + loja["sales_by_vendor"]
+        payments_by_method = pdv["payments_by_method"] + loja["payments_by_method"]
 
         # ── Snapshots for verification — both channels ──
-        snapshot_turnos = self._build_turno_snapshots_combined()
-        snapshot_vendas = self._build_venda_snapshots_combined()
+        snapshot_turnos = self._combine_turno_snapshots(
+            pdv["snapshot_turnos"], loja["snapshot_turnos"]
+        )
+        snapshot_vendas = self._combine_venda_snapshots(
+            pdv["snapshot_vendas"], loja["snapshot_vendas"]
+        )
+        if self.snapshot_cache is not None:
+            self.snapshot_cache.save()
 
         # ── Warnings ──
         warnings = self._check_warnings(sales_by_vendor, payments_by_method)
+        warnings += pdv["resumo_warnings"] + loja["resumo_warnings"]
 
         # ── Build payload ──
         payload = build_payload(
@@ -223,23 +377,27 @@ class SyncRunner:
             window_minutes=self.settings.sync_window_minutes,
             turnos=turnos,
             vendas=vendas,
-            ops_ids=ops_ids,
+            ops_ids=pdv["ops_ids"],
             sales_by_vendor=sales_by_vendor,
             payments_by_method=payments_by_method,
             snapshot_turnos=snapshot_turnos,
             snapshot_vendas=snapshot_vendas,
             warnings=warnings,
-            loja_ids=loja_ids,
+            loja_ids=loja["ops_ids"],
             store_cnpj=store_cnpj,
             store_id_filial=store_id_filial,
         )
 
         # Log payload summary
-        pdv_count = len(vendas_pdv)
-        loja_count = len(vendas_loja)
         logger.info(f"Payload built: {payload.ops.count} PDV ops + {payload.ops.loja_count} Loja ops")
-        logger.info(f"  - Turnos PDV: {len(turnos_pdv)} | Turnos Loja: {len(turnos_loja)} | Total: {len(turnos)}")
-        logger.info(f"  - Vendas PDV: {pdv_count} | Vendas Loja: {loja_count} | Total: {len(payload.vendas)}")
+        logger.info(
+            f"  - Turnos PDV: {len(pdv['turnos'])} | Turnos Loja: {len(loja['turnos'])} "
+            f"| Total: {len(turnos)}"
+        )
+        logger.info(
+            f"  - Vendas PDV: {len(pdv['vendas'])} | Vendas Loja: {len(loja['vendas'])} "
+            f"| Total: {len(vendas)}"
+        )
         logger.info(f"  - Vendors (resumo): {len(payload.resumo.by_vendor)}")
         logger.info(f"  - Payment methods (resumo): {len(payload.resumo.by_payment)}")
         logger.info(f"  - Snapshot turnos: {len(payload.snapshot_turnos)}")
@@ -250,6 +408,112 @@ class SyncRunner:
 
         return payload
 
+    def _gather_pdv(self, dt_from: datetime, dt_to: datetime) -> dict[str, Any]:
+        """
+        PDV (HiperPdv / Caixa) branch. Uses only self.db / self.queries.
+        Errors propagate: without PDV data there is no payload.
+        """
+        store_id = self.settings.store_id_ponto_venda
+
+        # ── Store Info ──
+        store_info = self.queries.get_store_info(store_id)
+
+        # Individual PDV sale details (marked as HIPER_CAIXA) and aggregated
+        # data, built in one streaming pass over the window rows
+        window_pdv = self._consume_window(
+            self._stream_pdv_window(dt_from, dt_to),
+            canal="HIPER_CAIXA",
+            users=self.users_pdv,
+            products=self.products_pdv,
+        )
+        if not window_pdv["ops_ids"]:
+            logger.info("[PDV] No operations found in window")
+        vendas_pdv = window_pdv["vendas"]
+        sales_by_vendor_pdv = window_pdv["sales_by_vendor"]
+        payments_by_method_pdv = window_pdv["payments_by_method"]
+
+        # Turnos PDV (canal=HIPER_CAIXA)
+        turnos_pdv = self._build_turnos(dt_from, dt_to)
+
+        resumo_warnings = []
+        if self.settings.resumo_sql_check:
+            resumo_warnings += check_resumo_consistency(
+                sales_by_vendor_pdv,
+                payments_by_method_pdv,
+                self.queries.get_sales_by_vendor(dt_from, dt_to),
+                self.queries.get_payments_by_method(dt_from, dt_to),
+                canal="HIPER_CAIXA",
+            )
+
+        return {
+            "store_info": store_info,
+            "ops_ids": window_pdv["ops_ids"],
+            "turnos": turnos_pdv,
+            "vendas": vendas_pdv,
+            "sales_by_vendor": sales_by_vendor_pdv,
+            "payments_by_method": payments_by_method_pdv,
+            "resumo_warnings": resumo_warnings,
+            "snapshot_turnos": self._pdv_turno_snapshots(),
+            "snapshot_vendas": self._pdv_venda_snapshots(),
+        }
+
+    def _gather_loja(
+        self, dt_from: datetime, dt_to: datetime, store_id_filial: int
+    ) -> dict[str, Any]:
+        """
+        Gestão (Hiper / Loja) branch. Uses only self.gestao_db / self.gestao_queries.
+        Failures are isolated: the cycle continues with empty Loja data and a
+        GESTAO_DB_FAILURE warning.
+        """
+        turnos_loja = []
+        resumo_warnings = []
+        try:
+            # Individual Loja sale details (marked as HIPER_LOJA) and aggregated
+            # data, built in one streaming pass over the window rows
+            window_loja = self._consume_window(
+                self._stream_loja_window(dt_from, dt_to, store_id_filial),
+                canal="HIPER_LOJA",
+                users=self.users_loja,
+                products=self.products_loja,
+            )
+            loja_ids = window_loja["ops_ids"]
+            if loja_ids:
+                logger.info(f"[Gestão] Found {len(loja_ids)} Loja operations in window")
+            else:
+                logger.info("[Gestão] No Loja operations in window")
+            vendas_loja = window_loja["vendas"]
+            sales_by_vendor_loja = window_loja["sales_by_vendor"]
+            payments_by_method_loja = window_loja["payments_by_method"]
+
+            # Turnos Gestão (canal=HIPER_LOJA) — independent UUIDs
+            turnos_loja = self._build_loja_turnos(dt_from, dt_to)
+            if self.settings.resumo_sql_check:
+                resumo_warnings += check_resumo_consistency(
+                    sales_by_vendor_loja,
+                    payments_by_method_loja,
+                    self.gestao_queries.get_loja_sales_by_vendor(dt_from, dt_to, store_id_filial),
+                    self.gestao_queries.get_loja_payments_by_method(dt_from, dt_to, store_id_filial),
+                    canal="HIPER_LOJA",
+                )
+        except Exception as e:
+            logger.warning(f"[Gestão] Failed to fetch Loja data: {e}")
+            self._gestao_warning = f"GESTAO_DB_FAILURE: {str(e)[:200]}"
+            loja_ids = []
+            vendas_loja = []
+            sales_by_vendor_loja = []
+            payments_by_method_loja = []
+
+        return {
+            "ops_ids": loja_ids,
+            "turnos": turnos_loja,
+            "vendas": vendas_loja,
+            "sales_by_vendor": sales_by_vendor_loja,
+            "payments_by_method": payments_by_method_loja,
+            "resumo_warnings": resumo_warnings,
+            "snapshot_turnos": self._loja_turno_snapshots(),
+            "snapshot_vendas": self._loja_venda_snapshots(),
+        }
+
     def _build_turnos(
         self, dt_from: datetime, dt_to: datetime
     ) -> list[TurnoDetail]:
@@ -264,23 +528,29 @@ class SyncRunner:
             if current:
                 turnos_raw = [current]
 
-        turno_details = []
-        for turno in turnos_raw:
-            id_turno = turno.get("id_turno")
-            if not id_turno:
-                continue
+        turnos_raw = [t for t in turnos_raw if t.get("id_turno")]
+        if not turnos_raw:
+            return []
+
+        # Batch-fetch per-turno data: one query each, regardless of turno count
+        ids_turno = [str(t["id_turno"]) for t in turnos_raw]
+        ids_fechados = [str(t["id_turno"]) for t in turnos_raw if t.get("fechado")]
 
-            id_turno_str = str(id_turno)
+        payments_by_turno = self.queries.get_payments_by_method_for_turnos(ids_turno)
+        closure_by_turno = self.queries.get_turno_closure_values_for_turnos(ids_fechados)
+        shortage_by_turno = self.queries.get_turno_shortage_values_for_turnos(ids_fechados)
+        responsavel_by_turno = self.queries.get_turno_responsavel_for_turnos(ids_turno)
 
-            # Get system totals (op=1) for this turno
-            system_payments = self.queries.get_payments_by_method_for_turno(id_turno_str)
+        turno_details = []
+        for turno in turnos_raw:
+            id_turno_str = str(turno["id_turno"])
 
-            # Get closure values (op=9) if turno is closed
+            # Closure values (op=9) and shortage (op=4) only for closed turnos
             closure_values = None
             shortage_values = None
             if turno.get("fechado"):
-                closure_values = self.queries.get_turno_closure_values(id_turno_str)
-                shortage_values = self.queries.get_turno_shortage_values(id_turno_str)
+                closure_values = closure_by_turno.get(id_turno_str, [])
+                shortage_values = shortage_by_turno.get(id_turno_str, [])
 
                 if closure_values:
                     logger.info(
@@ -288,15 +558,14 @@ class SyncRunner:
                         f"fechado=True, {len(closure_values)} closure entries"
                     )
 
-            # Get responsavel (principal vendor) for this turno
-            responsavel = self.queries.get_turno_responsavel(id_turno_str)
-
             detail = build_turno_detail(
                 turno=turno,
-                system_payments=system_payments,
+                system_payments=payments_by_turno.get(id_turno_str, []),
                 closure_values=closure_values,
                 shortage_values=shortage_values,
-                responsavel=responsavel,
+                responsavel=self._responsavel(
+                    "HIPER_CAIXA", responsavel_by_turno.get(id_turno_str)
+                ),
             )
             turno_details.append(detail)
 
@@ -312,26 +581,28 @@ class SyncRunner:
             dt_from, dt_to, store_id_filial
         )
 
+        turnos_raw = [t for t in turnos_raw if t.get("id_turno")]
         if not turnos_raw:
             return []
 
-        turno_details = []
-        for turno in turnos_raw:
-            id_turno = turno.get("id_turno")
-            if not id_turno:
-                continue
+        # Batch-fetch per-turno data from Gestão: one query each (op=1 origem=2, op=9, op=4)
+        ids_turno = [str(t["id_turno"]) for t in turnos_raw]
+        ids_fechados = [str(t["id_turno"]) for t in turnos_raw if t.get("fechado")]
 
-            id_turno_str = str(id_turno)
+        payments_by_turno = self.gestao_queries.get_loja_payments_by_method_for_turnos(ids_turno)
+        closure_by_turno = self.gestao_queries.get_loja_turno_closure_values_for_turnos(ids_fechados)
+        shortage_by_turno = self.gestao_queries.get_loja_turno_shortage_values_for_turnos(ids_fechados)
+        responsavel_by_turno = self.gestao_queries.get_loja_turno_responsavel_for_turnos(ids_turno)
 
-            # Get system totals (op=1, origem=2) for this Gestão turno
-            system_payments = self.gestao_queries.get_loja_payments_by_method_for_turno(id_turno_str)
+        turno_details = []
+        for turno in turnos_raw:
+            id_turno_str = str(turno["id_turno"])
 
-            # Get closure values (op=9) if turno is closed
             closure_values = None
             shortage_values = None
             if turno.get("fechado"):
-                closure_values = self.gestao_queries.get_loja_turno_closure_values(id_turno_str)
-                shortage_values = self.gestao_queries.get_loja_turno_shortage_values(id_turno_str)
+                closure_values = closure_by_turno.get(id_turno_str, [])
+                shortage_values = shortage_by_turno.get(id_turno_str, [])
 
                 if closure_values:
                     logger.info(
@@ -339,15 +610,14 @@ class SyncRunner:
                         f"fechado=True, {len(closure_values)} closure entries"
                     )
 
-            # Get responsavel (principal vendor) for this Gestão turno
-            responsavel = self.gestao_queries.get_loja_turno_responsavel(id_turno_str)
-
             detail = build_turno_detail(
                 turno=turno,
-                system_payments=system_payments,
+                system_payments=payments_by_turno.get(id_turno_str, []),
                 closure_values=closure_values,
                 shortage_values=shortage_values,
-                responsavel=responsavel,
+                responsavel=self._responsavel(
+                    "HIPER_LOJA", responsavel_by_turno.get(id_turno_str)
+                ),
                 canal="HIPER_LOJA",
             )
             turno_details.append(detail)
@@ -387,16 +657,8 @@ class SyncRunner:
                     data_hora_termino=termino,
                     duracao_minutos=row.get("duracao_minutos"),
                     periodo=periodo,
-                    operador=OperatorInfo(
-                        id_usuario=row.get("id_operador"),
-                        nome=row.get("nome_operador"),
-                        login=row.get("login_operador"),
-                    ),
-                    responsavel=OperatorInfo(
-                        id_usuario=row.get("id_responsavel"),
-                        nome=row.get("nome_responsavel"),
-                        login=row.get("login_responsavel"),
-                    ),
+                    operador=self._operator(canal, row.get("id_operador")),
+                    responsavel=self._operator(canal, row.get("id_responsavel")),
                     qtd_vendas=row.get("qtd_vendas", 0),
                     total_vendas=row.get("total_vendas", 0),
                     qtd_vendedores=row.get("qtd_vendedores", 0),
@@ -404,27 +666,178 @@ class SyncRunner:
             )
         return snapshots
 
-    def _build_turno_snapshots_combined(self) -> list[TurnoSnapshot]:
+    def _operator(self, canal: str, id_usuario: Optional[int]) -> OperatorInfo:
         """
-        Build turno snapshots from BOTH channels (PDV + Gestão).
-        Combines last 10 PDV + last 10 Gestão, sorts by date, takes top 10.
+        OperatorInfo for a user id returned by the snapshot / responsavel
+        queries (they return ids only): the shared entry of the channel's
+        user directory. Without a directory, or when it cannot be loaded,
+        only id_usuario is filled in.
         """
+        users = self.users_pdv if canal == "HIPER_CAIXA" else self.users_loja
+        if users is not None and id_usuario:
+            try:
+                return users.get(id_usuario)
+            except Exception as e:
+                logger.warning(f"[{canal}] User directory unavailable, names left empty: {e}")
+        return OperatorInfo(id_usuario=id_usuario)
+
+    def _responsavel(self, canal: str, row: Optional[dict]) -> Optional[dict]:
+        """Responsavel row (id_usuario only) with nome/login from the user directory."""
+        if row is None:
+            return None
+        return self._operator(canal, row.get("id_usuario")).model_dump()
+
+    def _build_venda_snapshot_from_rows(
+        self, raw: list[dict], canal: str
+    ) -> list[VendaSnapshot]:
+        """Build VendaSnapshot objects from raw query rows."""
+        snapshots = []
+        for row in raw:
+            snapshots.append(
+                VendaSnapshot(
+                    id_operacao=row["id_operacao"],
+                    canal=canal,
+                    data_hora_inicio=_aware(row.get("data_hora_inicio")),
+                    data_hora_termino=_aware(row.get("data_hora_termino")),
+                    duracao_segundos=row.get("duracao_segundos"),
+                    id_turno=str(row["id_turno"]) if row.get("id_turno") else None,
+                    turno_seq=row.get("turno_seq"),  # Loja doesn't have turno_seq
+                    vendedor=self._operator(canal, row.get("id_vendedor")),
+                    qtd_itens=row.get("qtd_itens", 0),
+                    total_itens=row.get("total_itens", 0),
+                )
+            )
+        return snapshots
+
+    def _cached_snapshots(
+        self,
+        key: str,
+        model: type,
+        fetch: Callable[[Optional[datetime]], list],
+        id_attr: str,
+        sort_attr: str,
+        limit: int,
+    ) -> list:
+        """
+        Snapshots for one channel, merged with the snapshot cache.
+
+        fetch(since) runs the snapshot query and builds the models; since is
+        the newest cached data_hora_termino, or None on a full refresh (or
+        when SNAPSHOT_CACHE is off).
+        """
+        cache = self.snapshot_cache
+        if cache is None:
+            return fetch(None)
+
+        full_refresh = cache.needs_full_refresh(key)
+        cached = []
+        if not full_refresh:
+            try:
+                cached = [model.model_validate(row) for row in cache.get(key)]
+            except ValueError as e:
+                logger.warning(f"Discarding snapshot cache '{key}': {e}")
+                full_refresh = True
+
+        since = max(
+            (s.data_hora_termino for s in cached if s.data_hora_termino),
+            default=None,
+        )
+        fresh = fetch(since)
+
+        fresh_ids = {getattr(s, id_attr) for s in fresh}
+        merged = fresh + [s for s in cached if getattr(s, id_attr) not in fresh_ids]
+        merged.sort(
+            key=lambda s: getattr(s, sort_attr) or datetime.min,
+            reverse=True,
+        )
+        merged = merged[:limit]
+
+        cache.put(key, [s.model_dump(mode="json") for s in merged], full_refresh)
+        logger.debug(
+            f"Snapshot '{key}': {len(fresh)} fetched, {len(cached)} cached"
+            f"{' (full refresh)' if full_refresh else ''}"
+        )
+        return merged
+
+    def _pdv_turno_snapshots(self) -> list[TurnoSnapshot]:
+        """Last 20 closed PDV turnos (canal=HIPER_CAIXA)."""
         store_id = self.settings.store_id_ponto_venda
+        return self._cached_snapshots(
+            "turnos:HIPER_CAIXA",
+            TurnoSnapshot,
+            lambda since: self._build_turno_snapshot_from_rows(
+                self.queries.get_turno_snapshot(store_id, limit=20, since=since),
+                "HIPER_CAIXA",
+            ),
+            id_attr="id_turno",
+            sort_attr="data_hora_inicio",
+            limit=20,
+        )
+
+    def _loja_turno_snapshots(self) -> list[TurnoSnapshot]:
+        """Last 20 closed Gestão turnos (canal=HIPER_LOJA); empty on failure."""
         store_id_filial = self.settings.resolved_store_id_filial
+        try:
+            return self._cached_snapshots(
+                "turnos:HIPER_LOJA",
+                TurnoSnapshot,
+                lambda since: self._build_turno_snapshot_from_rows(
+                    self.gestao_queries.get_loja_turno_snapshot(
+                        store_id_filial, limit=20, since=since
+                    ),
+                    "HIPER_LOJA",
+                ),
+                id_attr="id_turno",
+                sort_attr="data_hora_termino",
+                limit=20,
+            )
+        except Exception as e:
+            logger.warning(f"[Gestão] Failed to fetch Loja turno snapshots: {e}")
+            return []
 
-        # ── PDV turno snapshots ──
-        pdv_raw = self.queries.get_turno_snapshot(store_id, limit=20)
-        pdv_snapshots = self._build_turno_snapshot_from_rows(pdv_raw, "HIPER_CAIXA")
+    def _pdv_venda_snapshots(self) -> list[VendaSnapshot]:
+        """Last 30 PDV sales (canal=HIPER_CAIXA)."""
+        store_id = self.settings.store_id_ponto_venda
+        return self._cached_snapshots(
+            "vendas:HIPER_CAIXA",
+            VendaSnapshot,
+            lambda since: self._build_venda_snapshot_from_rows(
+                self.queries.get_vendas_snapshot(store_id, limit=30, since=since),
+                "HIPER_CAIXA",
+            ),
+            id_attr="id_operacao",
+            sort_attr="data_hora_termino",
+            limit=30,
+        )
 
-        # ── Gestão turno snapshots ──
-        loja_snapshots = []
+    def _loja_venda_snapshots(self) -> list[VendaSnapshot]:
+        """Last 30 Loja sales (canal=HIPER_LOJA); empty on failure."""
+        store_id_filial = self.settings.resolved_store_id_filial
         try:
-            loja_raw = self.gestao_queries.get_loja_turno_snapshot(store_id_filial, limit=20)
-            loja_snapshots = self._build_turno_snapshot_from_rows(loja_raw, "HIPER_LOJA")
+            return self._cached_snapshots(
+                "vendas:HIPER_LOJA",
+                VendaSnapshot,
+                lambda since: self._build_venda_snapshot_from_rows(
+                    self.gestao_queries.get_loja_vendas_snapshot(
+                        store_id_filial, limit=30, since=since
+                    ),
+                    "HIPER_LOJA",
+                ),
+                id_attr="id_operacao",
+                sort_attr="data_hora_termino",
+                limit=30,
+            )
         except Exception as e:
-            logger.warning(f"[Gestão] Failed to fetch Loja turno snapshots: {e}")
+            logger.warning(f"[Gestão] Failed to fetch Loja snapshots: {e}")
+            return []
 
-        # ── Combine and sort by data_hora_inicio DESC, take top 20 ──
+    def _combine_turno_snapshots(
+        self, pdv_snapshots: list[TurnoSnapshot], loja_snapshots: list[TurnoSnapshot]
+    ) -> list[TurnoSnapshot]:
+        """
+        Combine turno snapshots from BOTH channels (PDV + Gestão).
+        Sorts by data_hora_inicio DESC and takes the top 20.
+        """
         all_snapshots = pdv_snapshots + loja_snapshots
         all_snapshots.sort(
             key=lambda s: s.data_hora_inicio or datetime.min,
@@ -440,65 +853,13 @@ class SyncRunner:
         )
         return combined
 
-    def _build_venda_snapshots_combined(self) -> list[VendaSnapshot]:
+    def _combine_venda_snapshots(
+        self, pdv_snapshots: list[VendaSnapshot], loja_snapshots: list[VendaSnapshot]
+    ) -> list[VendaSnapshot]:
         """
-        Build venda snapshots from BOTH channels (últimas vendas gerais).
-        Combines last 10 PDV + last 10 Loja, sorts by date, takes top 10.
+        Combine venda snapshots from BOTH channels (últimas vendas gerais).
+        Sorts by data_hora_termino DESC and takes the top 30.
         """
-        store_id = self.settings.store_id_ponto_venda
-
-        # ── PDV snapshots ──
-        pdv_raw = self.queries.get_vendas_snapshot(store_id, limit=30)
-        pdv_snapshots = []
-        for row in pdv_raw:
-            pdv_snapshots.append(
-                VendaSnapshot(
-                    id_operacao=row["id_operacao"],
-                    canal="HIPER_CAIXA",
-                    data_hora_inicio=_aware(row.get("data_hora_inicio")),
-                    data_hora_termino=_aware(row.get("data_hora_termino")),
-                    duracao_segundos=row.get("duracao_segundos"),
-                    id_turno=str(row["id_turno"]) if row.get("id_turno") else None,
-                    turno_seq=row.get("turno_seq"),
-                    vendedor=OperatorInfo(
-                        id_usuario=row.get("id_vendedor"),
-                        nome=row.get("nome_vendedor"),
-                        login=row.get("login_vendedor"),
-                    ),
-                    qtd_itens=row.get("qtd_itens", 0),
-                    total_itens=row.get("total_itens", 0),
-                )
-            )
-
-        # ── Loja snapshots ──
-        loja_snapshots = []
-        try:
-            loja_raw = self.gestao_queries.get_loja_vendas_snapshot(
-                self.settings.resolved_store_id_filial, limit=30
-            )
-            for row in loja_raw:
-                loja_snapshots.append(
-                    VendaSnapshot(
-                        id_operacao=row["id_operacao"],
-                        canal="HIPER_LOJA",
-                        data_hora_inicio=_aware(row.get("data_hora_inicio")),
-                        data_hora_termino=_aware(row.get("data_hora_termino")),
-                        duracao_segundos=row.get("duracao_segundos"),
-                        id_turno=str(row["id_turno"]) if row.get("id_turno") else None,
-                        turno_seq=None,  # Loja doesn't have turno_seq
-                        vendedor=OperatorInfo(
-                            id_usuario=row.get("id_vendedor"),
-                            nome=row.get("nome_vendedor"),
-                            login=row.get("login_vendedor"),
-                        ),
-                        qtd_itens=row.get("qtd_itens", 0),
-                        total_itens=row.get("total_itens", 0),
-                    )
-                )
-        except Exception as e:
-            logger.warning(f"[Gestão] Failed to fetch Loja snapshots: {e}")
-
-        # ── Combine and sort by data_hora_termino DESC, take top 30 ──
         all_snapshots = pdv_snapshots + loja_snapshots
         all_snapshots.sort(
             key=lambda s: s.data_hora_termino or datetime.min,
@@ -514,40 +875,73 @@ class SyncRunner:
         )
         return combined
 
-    def _build_sale_details(
-        self, dt_from: datetime, dt_to: datetime,
-        canal: str = "HIPER_CAIXA",
-    ) -> list[SaleDetail]:
-        """Build individual PDV sale details with items and payments."""
-        sale_items = self.queries.get_sale_items(dt_from, dt_to)
-        sale_payments = self.queries.get_sale_payments(dt_from, dt_to)
-
-        if not sale_items:
-            return []
-
-        vendas = build_sale_details(sale_items, sale_payments, canal=canal)
-        logger.info(f"Built {len(vendas)} individual {canal} sale details")
-        return vendas
-
-    def _build_loja_sale_details(
-        self, dt_from: datetime, dt_to: datetime,
-    ) -> list[SaleDetail]:
-        """Build individual Loja sale details with items and payments."""
-        store_id_filial = self.settings.resolved_store_id_filial
-
-        sale_items = self.gestao_queries.get_loja_sale_items(
-            dt_from, dt_to, store_id_filial
-        )
-        sale_payments = self.gestao_queries.get_loja_sale_payments(
-            dt_from, dt_to, store_id_filial
+    def _stream_pdv_window(
+        self, dt_from: datetime, dt_to: datetime
+    ) -> Iterator[tuple[str, dict[str, Any]]]:
+        """
+        Stream the PDV window datasets as (dataset, row) pairs
+        (ops_ids, sale_items, sale_payments).
+        Uses the single-scan window extract unless WINDOW_EXTRACT=false.
+        """
+        if self.settings.window_extract:
+            return self.queries.iter_window_extract(dt_from, dt_to)
+
+        q = self.queries
+        return chain(
+            (("ops_ids", {"id_operacao": i}) for i in q.get_operation_ids(dt_from, dt_to)),
+            (("sale_payments", row) for row in q.iter_sale_payments(dt_from, dt_to)),
+            (("sale_items", row) for row in q.iter_sale_items(dt_from, dt_to)),
         )
 
-        if not sale_items:
-            return []
+    def _stream_loja_window(
+        self, dt_from: datetime, dt_to: datetime, store_id_filial: int
+    ) -> Iterator[tuple[str, dict[str, Any]]]:
+        """Stream the Loja window datasets from Gestão (same shape as _stream_pdv_window)."""
+        if self.settings.window_extract:
+            return self.gestao_queries.iter_loja_window_extract(dt_from, dt_to, store_id_filial)
+
+        gq = self.gestao_queries
+        return chain(
+            (("ops_ids", {"id_operacao": i})
+             for i in gq.get_loja_operation_ids(dt_from, dt_to, store_id_filial)),
+            (("sale_payments", row)
+             for row in gq.iter_loja_sale_payments(dt_from, dt_to, store_id_filial)),
+            (("sale_items", row)
+             for row in gq.iter_loja_sale_items(dt_from, dt_to, store_id_filial)),
+        )
 
-        vendas = build_sale_details(sale_items, sale_payments, canal="HIPER_LOJA")
-        logger.info(f"Built {len(vendas)} individual HIPER_LOJA sale details")
-        return vendas
+    def _consume_window(
+        self,
+        stream: Iterator[tuple[str, dict[str, Any]]],
+        canal: str,
+        users: Optional[UserDirectory] = None,
+        products: Optional[ProductCatalog] = None,
+    ) -> dict[str, Any]:
+        """
+        Build ops_ids, sale details and the resumo aggregates in one pass over
+        a window stream. Rows are turned into models / accumulated as they are
+        fetched, so memory follows FETCH_BATCH_SIZE rather than the window size.
+        """
+        ops_ids = []
+        aggregator = ResumoAggregator(users)
+        builder = SaleDetailsBuilder(canal, aggregator, users, products)
+        for dataset, row in stream:
+            if dataset == "ops_ids":
+                ops_ids.append(row["id_operacao"])
+            elif dataset == "sale_items":
+                builder.add_item(row)
+            else:
+                builder.add_payment(row)
+
+        vendas = builder.build() if self.settings.payload_validation else builder.build_records()
+        if vendas:
+            logger.info(f"Built {len(vendas)} individual {canal} sale details")
+        return {
+            "ops_ids": ops_ids,
+            "vendas": vendas,
+            "sales_by_vendor": aggregator.vendor_rows(),
+            "payments_by_method": aggregator.payment_rows(),
+        }
 
     def _check_warnings(
         self,
@@ -576,9 +970,8 @@ class SyncRunner:
         return warnings
 
     def _send_payload(self, payload: SyncPayload) -> SendResult:
-        """Send the payload to the API."""
-        payload_dict = payload.model_dump(mode="json", by_alias=True)
-        return self.sender.send(payload_dict)
+        """Send the payload to the API (serialized once; the bytes are reused for outbox/retries)."""
+        return self.sender.send(payload.to_json_bytes(), sync_id=payload.integrity.sync_id)
 
 
 def create_runner(settings: Settings) -> SyncRunner:
@@ -596,12 +989,50 @@ def create_runner(settings: Settings) -> SyncRunner:
         token=settings.api_token,
         timeout=settings.request_timeout_seconds,
         outbox_dir=settings.outbox_dir,
+        compression=settings.http_compression,
+        compression_min_bytes=settings.http_compression_min_bytes,
+        outbox_store=settings.outbox_store,
+        outbox_compression=settings.outbox_compression,
+        batch_endpoint=settings.outbox_batch_endpoint,
+        batch_max_items=settings.outbox_batch_max_items,
+        batch_max_bytes=settings.outbox_batch_max_bytes,
+        workers=settings.outbox_workers,
+        ordering=settings.outbox_ordering,
+        breaker_failures=settings.outbox_breaker_failures,
+        breaker_cooldown_seconds=settings.outbox_breaker_cooldown_seconds,
     )
     state_manager = create_state_manager(settings.state_file)
     window_calculator = create_window_calculator(
         state_manager=state_manager,
         window_minutes=settings.sync_window_minutes,
     )
+    snapshot_cache = None
+    if settings.snapshot_cache:
+        snapshot_cache = create_snapshot_cache(
+            settings.state_file, settings.snapshot_full_refresh_minutes
+        )
+    # Loaded on first lookup, one per database (each has its own dbo.usuario)
+    users_pdv = create_user_directory(
+        queries.get_users, settings.user_directory_ttl_minutes, label="PDV"
+    )
+    users_loja = create_user_directory(
+        gestao_queries.get_loja_users, settings.user_directory_ttl_minutes, label="Gestão"
+    )
+    products_file = settings.state_file if settings.product_cache_persist else None
+    products_pdv = create_product_catalog(
+        queries.get_product_names, settings.product_cache_ttl_minutes, products_file, label="PDV"
+    )
+    products_loja = create_product_catalog(
+        gestao_queries.get_loja_product_names,
+        settings.product_cache_ttl_minutes,
+        products_file,
+        label="Gestão",
+    )
+    delta_state = None
+    if settings.delta_payloads:
+        delta_state = create_delta_state(
+            settings.state_file, settings.delta_full_resend_minutes
+        )
 
     return SyncRunner(
         settings=settings,
@@ -612,4 +1043,10 @@ def create_runner(settings: Settings) -> SyncRunner:
         sender=sender,
         state_manager=state_manager,
         window_calculator=window_calculator,
+        snapshot_cache=snapshot_cache,
+        delta_state=delta_state,
+        users_pdv=users_pdv,
+        users_loja=users_loja,
+        products_pdv=products_pdv,
+        products_loja=products_loja,
     )
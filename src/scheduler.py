@@ -0,0 +1,155 @@
+"""
+Adaptive sync interval for loop mode (--loop).
+
+The interval between cycles follows store activity:
+  - store closed (no open turno)  → SYNC_INTERVAL_MAX_MINUTES
+  - peak (ops/min ≥ PEAK_OPS_PER_MINUTE over the last cycles)
+                                  → SYNC_INTERVAL_MIN_MINUTES
+  - otherwise                     → SYNC_WINDOW_MINUTES
+
+A ClosureWatch polls the open PDV and Loja turnos between cycles so a turno
+closure triggers an immediate sync instead of waiting for the next interval.
+"""
+
+import threading
+from collections import deque
+from typing import Any, Optional
+
+from loguru import logger
+
+
+class AdaptiveInterval:
+    """Chooses the next sync interval from recent cycle activity."""
+
+    def __init__(
+        self,
+        base_minutes: int,
+        min_minutes: int,
+        max_minutes: int,
+        peak_ops_per_minute: float,
+        history: int = 3,
+    ):
+        self.base_minutes = base_minutes
+        self.min_minutes = min_minutes
+        self.max_minutes = max_minutes
+        self.peak_ops_per_minute = peak_ops_per_minute
+        self.current = base_minutes
+        # (ops, window minutes) of the last cycles
+        self._recent: deque[tuple[int, float]] = deque(maxlen=history)
+
+    def record(self, ops: int, window_minutes: float) -> None:
+        """Record the sales count and window length of a finished cycle."""
+        if window_minutes > 0:
+            self._recent.append((ops, window_minutes))
+
+    def ops_per_minute(self) -> float:
+        """Sales rate over the recorded cycles."""
+        minutes = sum(m for _, m in self._recent)
+        if minutes <= 0:
+            return 0.0
+        return sum(ops for ops, _ in self._recent) / minutes
+
+    def next_interval(self, store_open: bool) -> int:
+        """Interval (minutes) for the next cycle; also stored in self.current."""
+        if not store_open:
+            self.current = self.max_minutes
+        elif self.ops_per_minute() >= self.peak_ops_per_minute:
+            self.current = self.min_minutes
+        else:
+            self.current = self.base_minutes
+        return self.current
+
+
+class ClosureWatch:
+    """
+    Tracks the open turnos and reports when one of them is closed: the
+    current PDV turno of the ponto de venda (fechado flips, or a newer turno
+    replaces it) and, when gestao_queries is given, the open Loja turnos of
+    the filial.
+
+    A closure seen while a sync is running cannot pull the sync job forward
+    (APScheduler skips a run while the job is still in flight, max_instances=1),
+    so it is remembered and sync_finished() asks the running job for one more
+    cycle instead.
+    """
+
+    def __init__(
+        self,
+        queries: Any,
+        id_ponto_venda: int,
+        gestao_queries: Any = None,
+        id_filial: Optional[int] = None,
+    ):
+        self.queries = queries
+        self.id_ponto_venda = id_ponto_venda
+        self.gestao_queries = gestao_queries
+        self.id_filial = id_filial
+        self.store_open = True  # Until the first check, assume activity
+        self._open: dict[str, set[str]] = {"PDV": set(), "Loja": set()}
+        self._syncing = False
+        self._closed_during_sync = False
+        self._lock = threading.Lock()
+
+    @property
+    def syncing(self) -> bool:
+        """True between sync_started() and the sync_finished() that ends the cycle."""
+        return self._syncing
+
+    def _open_pdv(self) -> set[str]:
+        turno = self.queries.get_current_turno(self.id_ponto_venda)
+        if turno is None or turno.get("fechado"):
+            return set()
+        return {str(turno["id_turno"]).upper()}
+
+    def _open_loja(self) -> set[str]:
+        rows = self.gestao_queries.get_loja_open_turnos(self.id_filial)
+        return {str(row["id_turno"]).upper() for row in rows}
+
+    def check(self) -> bool:
+        """
+        Refresh the open turnos of each source.
+        Returns True if a previously open turno has been closed since the last check.
+        A source whose query fails keeps its previous state.
+        """
+        sources = [("PDV", self._open_pdv)]
+        if self.gestao_queries is not None:
+            sources.append(("Loja", self._open_loja))
+
+        with self._lock:
+            closed = False
+            refreshed = False
+            for label, fetch in sources:
+                try:
+                    current = fetch()
+                except Exception as e:
+                    logger.warning(f"Closure watch ({label}) failed: {e}")
+                    continue
+                refreshed = True
+                for id_turno in sorted(self._open[label] - current):
+                    logger.info(f"{label} turno {id_turno} closed")
+                    closed = True
+                self._open[label] = current
+
+            if refreshed:
+                self.store_open = any(self._open.values())
+            if closed and self._syncing:
+                self._closed_during_sync = True
+            return closed
+
+    def sync_started(self) -> None:
+        """Mark a sync cycle as running (closures seen from now on are covered by it)."""
+        with self._lock:
+            self._syncing = True
+            self._closed_during_sync = False
+
+    def sync_finished(self) -> bool:
+        """
+        End a sync cycle. Returns True if a turno closed while it ran: the
+        caller runs one more cycle right away and the sync stays marked running.
+        """
+        with self._lock:
+            if self._closed_during_sync:
+                self._closed_during_sync = False
+                return True
+            self._syncing = False
+            return False
@@ -2,17 +2,21 @@
 HTTP sender with retry logic and offline fallback.
 Uses tenacity for exponential backoff retries.
 Smart error classification: 4xx → dead_letter, 5xx → outbox retry.
+
+A payload is serialized once; the same JSON bytes are posted, stored in the
+outbox and re-sent verbatim on every retry.
 """
 
-import json
-import shutil
+import threading
+import time
 import uuid
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Optional, Union
 
 import requests
 from loguru import logger
+from requests.adapters import HTTPAdapter
 from pydantic import BaseModel
 from tenacity import (
     retry,
@@ -23,18 +27,15 @@ from tenacity import (
 )
 
 from . import SCHEMA_VERSION
-
-try:
-    import orjson
-
-    def json_dumps(obj: Any) -> str:
-        """Fast JSON serialization with orjson."""
-        return orjson.dumps(obj, default=str).decode("utf-8")
-
-except ImportError:
-    def json_dumps(obj: Any) -> str:
-        """Standard JSON serialization."""
-        return json.dumps(obj, default=str, ensure_ascii=False)
+from .outbox import (
+    OUTBOX_TTL_DAYS,
+    OutboxManager,
+    compress,
+    dumps_bytes,
+    loads_bytes,
+    zstandard,
+)
+from .outbox_sqlite import SqliteOutboxStore
 
 
 # HTTP status codes that should NOT be retried (client errors / validation)
@@ -43,8 +44,18 @@ NO_RETRY_CODES = {400, 401, 403, 404, 409, 422}
 # Max retry attempts before moving to dead_letter
 MAX_OUTBOX_RETRIES = 50
 
-# Days before outbox files expire
-OUTBOX_TTL_DAYS = 7
+# Keep-alive connections kept open to the API host
+HTTP_POOL_MAXSIZE = 4
+
+# Batch outbox drain defaults (OUTBOX_BATCH_MAX_ITEMS / OUTBOX_BATCH_MAX_BYTES)
+OUTBOX_BATCH_MAX_ITEMS = 100
+OUTBOX_BATCH_MAX_BYTES = 2 * 1024 * 1024
+
+
+# Outbox entry handle: file path (OutboxManager) or row id (SqliteOutboxStore)
+OutboxKey = Union[Path, int]
+# Loaded outbox entry: (key, metadata, payload bytes as originally posted)
+OutboxEntry = tuple[OutboxKey, dict[str, Any], bytes]
 
 
 class SendResult(BaseModel):
@@ -58,125 +69,116 @@ class SendResult(BaseModel):
     outbox_path: Optional[str] = None
 
 
-class OutboxManager:
-    """Manages the offline outbox queue and dead_letter archive."""
-
-    def __init__(self, outbox_dir: Path):
-        self.outbox_dir = Path(outbox_dir)
-        self.dead_letter_dir = self.outbox_dir.parent / "dead_letter"
-        self._ensure_directories()
-
-    def _ensure_directories(self) -> None:
-        """Ensure outbox and dead_letter directories exist."""
-        self.outbox_dir.mkdir(parents=True, exist_ok=True)
-        self.dead_letter_dir.mkdir(parents=True, exist_ok=True)
-
-    def save(self, payload: dict[str, Any], sync_id: str) -> Path:
-        """Save a failed payload to the outbox for retry."""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"{timestamp}_{sync_id[:12]}.json"
-        filepath = self.outbox_dir / filename
-
-        # Wrap payload with retry metadata
-        envelope = {
-            "_retry_count": 0,
-            "_created_at": datetime.now().isoformat(),
-            "payload": payload,
-        }
-
-        with open(filepath, "w", encoding="utf-8") as f:
-            json.dump(envelope, f, ensure_ascii=False, indent=2, default=str)
-
-        logger.warning(f"Payload saved to outbox: {filepath}")
-        return filepath
-
-    def save_dead_letter(
-        self, payload: dict[str, Any], sync_id: str, reason: str, status_code: Optional[int] = None
-    ) -> Path:
-        """Save a permanently failed payload to dead_letter (no retry)."""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        code_suffix = f"_{status_code}" if status_code else ""
-        filename = f"{timestamp}_{sync_id[:12]}{code_suffix}.json"
-        filepath = self.dead_letter_dir / filename
-
-        envelope = {
-            "_reason": reason,
-            "_status_code": status_code,
-            "_dead_at": datetime.now().isoformat(),
-            "payload": payload,
-        }
-
-        with open(filepath, "w", encoding="utf-8") as f:
-            json.dump(envelope, f, ensure_ascii=False, indent=2, default=str)
-
-        logger.error(f"Payload moved to dead_letter: {filepath} (reason: {reason})")
-        return filepath
-
-    def list_pending(self) -> list[Path]:
-        """List valid pending payloads (not expired)."""
-        if not self.outbox_dir.exists():
-            return []
-
-        cutoff = datetime.now() - timedelta(days=OUTBOX_TTL_DAYS)
-        files = sorted(self.outbox_dir.glob("*.json"))
-        valid = []
-
-        for f in files:
-            # Check file age by modification time
-            mtime = datetime.fromtimestamp(f.stat().st_mtime)
-            if mtime < cutoff:
-                logger.warning(f"Outbox file expired ({OUTBOX_TTL_DAYS}d TTL): {f.name}")
-                self._move_to_dead_letter(f, reason=f"expired_ttl_{OUTBOX_TTL_DAYS}d")
-            else:
-                valid.append(f)
-
-        if valid:
-            logger.info(f"Found {len(valid)} pending payloads in outbox")
-        return valid
-
-    def load(self, filepath: Path) -> Optional[dict[str, Any]]:
-        """Load and unwrap a payload from the outbox."""
-        try:
-            with open(filepath, "r", encoding="utf-8") as f:
-                data = json.load(f)
-
-            # Handle both old format (raw payload) and new envelope format
-            if "payload" in data and "_retry_count" in data:
-                return data  # New envelope format
-            else:
-                # Old format: wrap it
-                return {"_retry_count": 0, "payload": data}
-
-        except (json.JSONDecodeError, IOError) as e:
-            logger.error(f"Failed to load outbox file {filepath}: {e}")
-            return None
-
-    def increment_retry(self, filepath: Path, envelope: dict) -> int:
-        """Increment retry count and save back. Returns new count."""
-        envelope["_retry_count"] = envelope.get("_retry_count", 0) + 1
-        envelope["_last_retry"] = datetime.now().isoformat()
-
-        with open(filepath, "w", encoding="utf-8") as f:
-            json.dump(envelope, f, ensure_ascii=False, indent=2, default=str)
+class SendStats(BaseModel):
+    """Upload counters (per HttpSender, cumulative)."""
+
+    posts: int = 0  # payloads encoded for POST (retries of one payload count once)
+    compressed: int = 0  # payloads sent with a Content-Encoding
+    raw_bytes: int = 0  # JSON size before compression
+    wire_bytes: int = 0  # body size actually sent
+    requests: int = 0  # HTTP attempts (including tenacity retries)
+    connections: int = 0  # TCP/TLS handshakes (new pooled connections)
+    reused: int = 0  # attempts served on an existing keep-alive connection
+
+
+class CircuitBreaker:
+    """
+    Stops hammering an API that is down.
+
+    closed    → requests flow; failure_threshold consecutive failures open it
+    open      → requests are refused until cooldown_seconds have passed
+    half-open → one trial request; success closes, failure re-opens
+
+    Failures are network errors (after tenacity retries) and 5xx responses;
+    any other response means the endpoint is up.
+    """
+
+    def __init__(self, failure_threshold: int, cooldown_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """True if a request may be sent now."""
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self._opened_at >= self.cooldown_seconds:
+                self.state = "half-open"
+                logger.info("Circuit half-open: sending a trial request")
+                return True
+            return False
+
+    def is_open(self) -> bool:
+        """True while allow() would refuse; unlike allow(), never starts the trial."""
+        with self._lock:
+            if self.state == "open":
+                return time.monotonic() - self._opened_at < self.cooldown_seconds
+            return self.state == "half-open"
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self.state != "closed":
+                logger.info("Circuit closed: API reachable again")
+            self.state = "closed"
+            self._failures = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self.state == "half-open" or (
+                self.state == "closed" and self._failures >= self.failure_threshold
+            ):
+                self.state = "open"
+                self._opened_at = time.monotonic()
+                logger.warning(
+                    f"Circuit open after {self._failures} consecutive failures "
+                    f"(retry in {self.cooldown_seconds:.0f}s)"
+                )
 
-        return envelope["_retry_count"]
 
-    def remove(self, filepath: Path) -> None:
-        """Remove a successfully sent payload from the outbox."""
-        try:
-            filepath.unlink()
-            logger.info(f"Removed from outbox: {filepath}")
-        except IOError as e:
-            logger.warning(f"Failed to remove outbox file {filepath}: {e}")
-
-    def _move_to_dead_letter(self, filepath: Path, reason: str) -> None:
-        """Move an outbox file to dead_letter."""
-        try:
-            dest = self.dead_letter_dir / filepath.name
-            shutil.move(str(filepath), str(dest))
-            logger.warning(f"Moved to dead_letter: {filepath.name} ({reason})")
-        except IOError as e:
-            logger.error(f"Failed to move to dead_letter: {e}")
+def _window_bounds(raw: bytes) -> tuple[str, str]:
+    """(from, to) of a serialized payload's window, as ISO strings ("" if absent)."""
+    try:
+        window = loads_bytes(raw).get("window") or {}
+    except ValueError:
+        window = {}
+    return str(window.get("from") or ""), str(window.get("to") or "")
+
+
+def encode_body(
+    raw: bytes, compression: str, min_bytes: int
+) -> tuple[bytes, Optional[str]]:
+    """
+    Compress the UTF-8 JSON body for upload.
+    Returns (body, content_encoding); content_encoding is None when the body
+    is sent as-is (compression off, or body smaller than min_bytes).
+    """
+    if compression == "none" or len(raw) < min_bytes:
+        return raw, None
+    if compression == "zstd" and zstandard is None:
+        compression = "gzip"
+    return compress(raw, compression), compression
+
+
+def create_outbox_store(
+    kind: str, outbox_dir: Path, compression: str = "none"
+) -> Union[OutboxManager, SqliteOutboxStore]:
+    """
+    Outbox storage engine: "files" (one JSON file per payload, OutboxManager)
+    or "sqlite" (single WAL database, SqliteOutboxStore — imports existing files).
+    The file store takes back files the SQLite store imported but had not
+    drained yet (*.migrated).
+    compression (none/gzip/zstd) applies to the stored envelopes.
+    """
+    if kind == "sqlite":
+        return SqliteOutboxStore(outbox_dir, ttl_days=OUTBOX_TTL_DAYS, compression=compression)
+    outbox = OutboxManager(outbox_dir, compression=compression)
+    outbox.restore_migrated()
+    return outbox
 
 
 class HttpSender:
@@ -188,11 +190,64 @@ class HttpSender:
         token: str,
         timeout: int,
         outbox_dir: Path,
+        compression: str = "none",
+        compression_min_bytes: int = 1024,
+        outbox_store: str = "files",
+        outbox_compression: str = "none",
+        batch_endpoint: Optional[str] = None,
+        batch_max_items: int = OUTBOX_BATCH_MAX_ITEMS,
+        batch_max_bytes: int = OUTBOX_BATCH_MAX_BYTES,
+        workers: int = 1,
+        ordering: str = "strict",
+        breaker_failures: int = 3,
+        breaker_cooldown_seconds: float = 300,
     ):
         self.endpoint = endpoint
+        self.batch_endpoint = batch_endpoint
+        self.batch_max_items = batch_max_items
+        self.batch_max_bytes = batch_max_bytes
+        self.workers = max(workers, 1)
+        self.ordering = ordering
+        self.breaker = CircuitBreaker(breaker_failures, breaker_cooldown_seconds)
+        self._stats_lock = threading.Lock()
         self.token = token
         self.timeout = timeout
-        self.outbox = OutboxManager(outbox_dir)
+        self.outbox = create_outbox_store(outbox_store, outbox_dir, outbox_compression)
+        if compression == "zstd" and zstandard is None:
+            logger.warning("HTTP_COMPRESSION=zstd but zstandard is not installed, using gzip")
+            compression = "gzip"
+        self.compression = compression
+        self.compression_min_bytes = compression_min_bytes
+        self.stats = SendStats()
+        self.session = self._create_session()
+
+    def _create_session(self) -> requests.Session:
+        """
+        Long-lived session: DNS/TCP/TLS handshakes are paid once and the
+        keep-alive connection is reused by send() and process_outbox().
+        Retries stay with tenacity (adapter max_retries=0).
+        """
+        session = requests.Session()
+        self._adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=max(HTTP_POOL_MAXSIZE, self.workers),
+            max_retries=0,
+        )
+        session.mount("https://", self._adapter)
+        session.mount("http://", self._adapter)
+        session.headers.update(self._get_headers())
+        return session
+
+    def _update_connection_stats(self) -> None:
+        """Refresh handshake/reuse counters from the adapter's urllib3 pools."""
+        pools = self._adapter.poolmanager.pools
+        with self._stats_lock:
+            self.stats.connections = sum(pools[key].num_connections for key in pools.keys())
+            self.stats.reused = max(self.stats.requests - self.stats.connections, 0)
+
+    def close(self) -> None:
+        """Close pooled keep-alive connections."""
+        self.session.close()
 
     def _get_headers(self) -> dict[str, str]:
         """Build request headers."""
@@ -209,33 +264,88 @@ class HttpSender:
         retry=retry_if_exception_type((requests.Timeout, requests.ConnectionError)),
         before_sleep=before_sleep_log(logger, "WARNING"),
     )
-    def _send_with_retry(self, payload_json: str) -> requests.Response:
+    def _send_with_retry(
+        self,
+        body: bytes,
+        content_encoding: Optional[str] = None,
+        url: Optional[str] = None,
+    ) -> requests.Response:
         """Send with tenacity retry on network errors. Each attempt gets unique X-Request-Id."""
         request_id = str(uuid.uuid4())
-        headers = self._get_headers()
-        headers["X-Request-Id"] = request_id
+        headers = {"X-Request-Id": request_id}
+        if content_encoding:
+            headers["Content-Encoding"] = content_encoding
         logger.info(f"POST attempt (request_id={request_id})")
-        return requests.post(
-            self.endpoint,
-            data=payload_json,
-            headers=headers,
-            timeout=self.timeout,
+        with self._stats_lock:
+            self.stats.requests += 1
+        try:
+            return self.session.post(
+                url or self.endpoint,
+                data=body,
+                headers=headers,
+                timeout=self.timeout,
+            )
+        finally:
+            self._update_connection_stats()
+
+    def _encode_raw(self, raw: bytes) -> tuple[bytes, Optional[str]]:
+        """Compress an already serialized JSON body and update the upload counters."""
+        body, content_encoding = encode_body(
+            raw, self.compression, self.compression_min_bytes
         )
+        raw_size = len(raw)
+
+        with self._stats_lock:
+            self.stats.posts += 1
+            self.stats.raw_bytes += raw_size
+            self.stats.wire_bytes += len(body)
+            if content_encoding:
+                self.stats.compressed += 1
+        if content_encoding:
+            logger.info(
+                f"Body: {raw_size / 1024:.1f} KB -> {len(body) / 1024:.1f} KB "
+                f"({content_encoding}, {raw_size / max(len(body), 1):.1f}x)"
+            )
+        else:
+            logger.debug(f"Body: {raw_size / 1024:.1f} KB (uncompressed)")
+        return body, content_encoding
 
-    def send(self, payload: dict[str, Any]) -> SendResult:
+    def send(
+        self, payload: Union[dict[str, Any], bytes], sync_id: Optional[str] = None
+    ) -> SendResult:
         """
         Send a payload to the API.
+        payload is either a dict or the already serialized JSON bytes (pass
+        sync_id with bytes); bytes are posted and stored as-is.
         Smart error handling:
           - 2xx: success
           - 4xx (400/401/403/422): dead_letter (no retry, payload is invalid)
           - 5xx / network error: outbox (retry next cycle)
         """
-        sync_id = payload.get("integrity", {}).get("sync_id", "unknown")
+        if isinstance(payload, bytes):
+            raw = payload
+        else:
+            raw = dumps_bytes(payload)
+            sync_id = sync_id or payload.get("integrity", {}).get("sync_id")
+        sync_id = sync_id or "unknown"
         logger.info(f"Sending payload to {self.endpoint} (sync_id={sync_id[:12]}...)")
 
+        if not self.breaker.allow():
+            logger.warning("Circuit open — API down, payload goes straight to outbox")
+            outbox_path = self.outbox.save(raw, sync_id)
+            return SendResult(
+                success=False,
+                message="Circuit open (outbox)",
+                saved_to_outbox=True,
+                outbox_path=str(outbox_path),
+            )
+
         try:
-            payload_json = json_dumps(payload)
-            response = self._send_with_retry(payload_json)
+            response = self._send_with_retry(*self._encode_raw(raw))
+            if response.status_code >= 500:
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
 
             if response.status_code in (200, 201):
                 logger.success(
@@ -254,7 +364,7 @@ class HttpSender:
                     f"Client error (no retry): HTTP {response.status_code} - {body_preview}"
                 )
                 dl_path = self.outbox.save_dead_letter(
-                    payload, sync_id,
+                    raw, sync_id,
                     reason=f"http_{response.status_code}",
                     status_code=response.status_code,
                 )
@@ -271,7 +381,7 @@ class HttpSender:
                 logger.error(
                     f"Server error (will retry): HTTP {response.status_code} - {response.text[:200]}"
                 )
-                outbox_path = self.outbox.save(payload, sync_id)
+                outbox_path = self.outbox.save(raw, sync_id)
                 return SendResult(
                     success=False,
                     status_code=response.status_code,
@@ -282,7 +392,8 @@ class HttpSender:
 
         except requests.RequestException as e:
             logger.error(f"Network error after retries: {e}")
-            outbox_path = self.outbox.save(payload, sync_id)
+            self.breaker.record_failure()
+            outbox_path = self.outbox.save(raw, sync_id)
             return SendResult(
                 success=False,
                 message=f"Network error: {e}",
@@ -296,70 +407,277 @@ class HttpSender:
         - Expired payloads (>TTL) are moved to dead_letter automatically
         - Payloads exceeding MAX_OUTBOX_RETRIES are moved to dead_letter
         - 4xx responses move payload to dead_letter (no further retry)
+        - With a batch endpoint configured, payloads are bundled (see
+          _process_outbox_batched)
+        - Otherwise payloads are drained by up to `workers` threads under the
+          `ordering` policy (see _drain_strict / _drain_by_window / _drain_unordered)
+        - While the circuit breaker is open nothing is sent; skipped payloads
+          keep their retry count
         Returns the number of successfully sent payloads.
         """
         pending = self.outbox.list_pending()  # Already filters expired
         if not pending:
             return 0
 
+        if self.breaker.is_open():
+            logger.warning(f"Circuit open — skipping outbox drain ({len(pending)} pending)")
+            return 0
+
         logger.info(f"Processing {len(pending)} pending payloads from outbox")
+        if self.batch_endpoint:
+            return self._process_outbox_batched(pending)
+
+        if self.ordering == "unordered" and self.workers > 1:
+            outcomes = self._drain_unordered(pending)
+        elif self.ordering == "by_window" and self.workers > 1:
+            outcomes = self._drain_by_window(pending)
+        else:
+            outcomes = self._drain_strict(pending)
+
+        skipped = outcomes.count("skipped")
+        if skipped:
+            logger.warning(f"Outbox drain stopped early: {skipped} payloads left for next cycle")
+        return outcomes.count("sent")
+
+    def _drain_strict(self, pending: list[OutboxKey]) -> list[str]:
+        """One at a time in file (= creation) order; stops at the first retryable failure."""
+        outcomes = []
+        for filepath in pending:
+            outcome = self._drain_one(filepath)
+            outcomes.append(outcome)
+            if outcome in ("failed", "skipped"):
+                break
+        outcomes += ["skipped"] * (len(pending) - len(outcomes))
+        return outcomes
+
+    def _drain_by_window(self, pending: list[OutboxKey]) -> list[str]:
+        """
+        Payloads whose windows overlap form a chain, sent in window order and
+        stopped at its first retryable failure. Disjoint chains cover
+        different sales and are drained concurrently. Only the window bounds
+        are read up front; each payload is loaded again when it is sent.
+        """
+        window_bounds = {}
+        for filepath in pending:
+            loaded = self._load_outbox_entry(filepath)
+            if loaded is not None:
+                window_bounds[filepath] = _window_bounds(loaded[1])
+
+        chains: list[list[OutboxKey]] = []
+        chain_end = ""
+        for filepath in sorted(window_bounds, key=window_bounds.__getitem__):
+            start, end = window_bounds[filepath]
+            if chains and start < chain_end:
+                chains[-1].append(filepath)
+                chain_end = max(chain_end, end)
+            else:
+                chains.append([filepath])
+                chain_end = end
+
+        logger.info(f"Draining {len(window_bounds)} payloads as {len(chains)} window chains")
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="outbox") as pool:
+            return [o for outcomes in pool.map(self._drain_strict, chains) for o in outcomes]
+
+    def _drain_unordered(self, pending: list[OutboxKey]) -> list[str]:
+        """Every payload independently through the worker pool."""
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="outbox") as pool:
+            return list(pool.map(self._drain_one, pending))
+
+    def _drain_one(self, filepath: OutboxKey) -> str:
+        """
+        Load one outbox payload and send its stored bytes, verbatim.
+        Returns "sent", "rejected" (dead_letter), "failed" (kept for retry),
+        "skipped" (circuit open, not attempted) or "dropped" (unreadable or
+        over MAX_OUTBOX_RETRIES, not attempted).
+        """
+        if self.breaker.is_open():
+            return "skipped"
+        loaded = self._load_outbox_entry(filepath)
+        if loaded is None:
+            return "dropped"
+        if not self.breaker.allow():
+            return "skipped"
+
+        meta, raw = loaded
+        retry_count = meta.get("_retry_count", 0)
+        sync_id = meta.get("_sync_id") or "unknown"
+
+        logger.info(
+            f"Retrying outbox payload: {self.outbox.describe(filepath)} "
+            f"(sync_id={sync_id[:12]}..., attempt #{retry_count + 1})"
+        )
+
+        try:
+            response = self._send_with_retry(*self._encode_raw(raw))
+        except requests.RequestException as e:
+            logger.warning(f"Outbox payload network error: {e}")
+            self.breaker.record_failure()
+            self.outbox.increment_retry(filepath, meta)
+            return "failed"
+
+        if response.status_code >= 500:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+
+        if self._apply_outbox_status(filepath, meta, response.status_code):
+            return "sent"
+        return "rejected" if response.status_code in NO_RETRY_CODES else "failed"
+
+    def _load_outbox_entry(self, filepath: OutboxKey) -> Optional[tuple[dict[str, Any], bytes]]:
+        """Load (metadata, payload bytes); dead-letters the entry when over MAX_OUTBOX_RETRIES."""
+        loaded = self.outbox.load_raw(filepath)
+        if loaded is None:
+            return None
+
+        if loaded[0].get("_retry_count", 0) >= MAX_OUTBOX_RETRIES:
+            logger.error(
+                f"Max retries ({MAX_OUTBOX_RETRIES}) exceeded: {self.outbox.describe(filepath)}"
+            )
+            self.outbox._move_to_dead_letter(filepath, reason="max_retries_exceeded")
+            return None
+
+        return loaded
+
+    def _apply_outbox_status(
+        self, filepath: OutboxKey, meta: dict[str, Any], status_code: Optional[int]
+    ) -> bool:
+        """
+        Settle one outbox file from its HTTP status (whole request or batch item).
+        Returns True if the payload was accepted.
+        """
+        if status_code in (200, 201):
+            logger.success(f"Outbox payload sent: {self.outbox.describe(filepath)}")
+            self.outbox.remove(filepath)
+            return True
+
+        if status_code in NO_RETRY_CODES:
+            # Client error — stop retrying, move to dead_letter
+            logger.error(
+                f"Outbox payload permanently rejected: "
+                f"HTTP {status_code} - {self.outbox.describe(filepath)}"
+            )
+            self.outbox._move_to_dead_letter(filepath, reason=f"http_{status_code}")
+            return False
+
+        # Server error (or no result for the item) — increment retry, keep in outbox
+        new_count = self.outbox.increment_retry(filepath, meta)
+        logger.warning(
+            f"Outbox payload still failing: HTTP {status_code} "
+            f"(retry {new_count}/{MAX_OUTBOX_RETRIES})"
+        )
+        return False
+
+    def _process_outbox_batched(self, pending: list[OutboxKey]) -> int:
+        """
+        Drain the outbox through the batch endpoint.
+
+        Payloads are bundled into requests of at most batch_max_items items
+        and batch_max_bytes of JSON:
+            {"schema_version": "...", "items": [payload, ...]}
+        The API answers with one result per item, in the same order:
+            {"results": [{"status": 200}, {"status": 422}, ...]}
+        Each result settles its file like a single POST would. A failed
+        batch request keeps every item in the outbox and stops the drain:
+        non-2xx or network errors bump the retry counts, while a
+        NO_RETRY_CODES status for the whole request (endpoint not deployed,
+        bad token, rejected envelope) says nothing about the individual
+        payloads and leaves them untouched. The circuit breaker is consulted
+        before every batch.
+        """
         success_count = 0
+        batch: list[OutboxEntry] = []
+        batch_bytes = 0
 
         for filepath in pending:
-            envelope = self.outbox.load(filepath)
-            if envelope is None:
+            loaded = self._load_outbox_entry(filepath)
+            if loaded is None:
                 continue
 
-            payload = envelope.get("payload", envelope)
-            retry_count = envelope.get("_retry_count", 0)
-            sync_id = payload.get("integrity", {}).get("sync_id", "unknown")
+            meta, item = loaded
+            if batch and (
+                len(batch) >= self.batch_max_items
+                or batch_bytes + len(item) > self.batch_max_bytes
+            ):
+                sent = self._send_outbox_batch(batch)
+                if sent is None:
+                    return success_count
+                success_count += sent
+                batch, batch_bytes = [], 0
+
+            batch.append((filepath, meta, item))
+            batch_bytes += len(item)
+
+        if batch:
+            success_count += self._send_outbox_batch(batch) or 0
+        return success_count
 
-            # Check max retries
-            if retry_count >= MAX_OUTBOX_RETRIES:
-                logger.error(
-                    f"Max retries ({MAX_OUTBOX_RETRIES}) exceeded: {filepath.name}"
-                )
-                self.outbox._move_to_dead_letter(filepath, reason="max_retries_exceeded")
-                continue
+    def _send_outbox_batch(
+        self, batch: list[OutboxEntry]
+    ) -> Optional[int]:
+        """
+        POST one batch and settle its files.
+        Returns the number of accepted payloads, or None if the batch was not
+        settled: circuit open (not sent), batch request rejected with a 4xx
+        (items kept as they were) or the batch request itself failed (items
+        kept in the outbox with their retry count bumped).
+        """
+        if not self.breaker.allow():
+            logger.warning(f"Circuit open — outbox batch of {len(batch)} payloads left for next cycle")
+            return None
 
-            logger.info(
-                f"Retrying outbox payload: {filepath.name} "
-                f"(sync_id={sync_id[:12]}..., attempt #{retry_count + 1})"
+        raw = b"".join((
+            b'{"schema_version":"', SCHEMA_VERSION.encode("utf-8"), b'","items":[',
+            b",".join(item for _, _, item in batch),
+            b"]}",
+        ))
+        logger.info(f"Sending outbox batch: {len(batch)} payloads ({len(raw) / 1024:.1f} KB)")
+
+        try:
+            response = self._send_with_retry(*self._encode_raw(raw), url=self.batch_endpoint)
+        except requests.RequestException as e:
+            logger.warning(f"Outbox batch failed: {e}")
+            self.breaker.record_failure()
+            for filepath, meta, _ in batch:
+                self.outbox.increment_retry(filepath, meta)
+            return None
+
+        if response.status_code >= 500:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+
+        if response.status_code in NO_RETRY_CODES:
+            # Client error for the request, not a per-item result — keep the items
+            logger.error(
+                f"Outbox batch rejected: HTTP {response.status_code} - {response.text[:200]} "
+                f"({len(batch)} payloads kept, check OUTBOX_BATCH_ENDPOINT / API_TOKEN)"
             )
+            return None
+
+        try:
+            if response.status_code not in (200, 201):
+                raise requests.HTTPError(
+                    f"HTTP {response.status_code} - {response.text[:200]}", response=response
+                )
+            results = response.json().get("results", [])
+        except (requests.HTTPError, ValueError) as e:
+            logger.warning(f"Outbox batch failed: {e}")
+            for filepath, meta, _ in batch:
+                self.outbox.increment_retry(filepath, meta)
+            return None
 
-            try:
-                payload_json = json_dumps(payload)
-                response = self._send_with_retry(payload_json)
-
-                if response.status_code in (200, 201):
-                    logger.success(f"Outbox payload sent: {filepath.name}")
-                    self.outbox.remove(filepath)
-                    success_count += 1
-
-                elif response.status_code in NO_RETRY_CODES:
-                    # Client error — stop retrying, move to dead_letter
-                    logger.error(
-                        f"Outbox payload permanently rejected: "
-                        f"HTTP {response.status_code} - {filepath.name}"
-                    )
-                    self.outbox._move_to_dead_letter(
-                        filepath, reason=f"http_{response.status_code}"
-                    )
-
-                else:
-                    # Server error — increment retry, keep in outbox
-                    new_count = self.outbox.increment_retry(filepath, envelope)
-                    logger.warning(
-                        f"Outbox payload still failing: HTTP {response.status_code} "
-                        f"(retry {new_count}/{MAX_OUTBOX_RETRIES})"
-                    )
-
-            except requests.RequestException as e:
-                logger.warning(f"Outbox payload network error: {e}")
-                self.outbox.increment_retry(filepath, envelope)
-                break  # Stop processing outbox if network is down
+        if len(results) != len(batch):
+            logger.warning(
+                f"Outbox batch returned {len(results)} results for {len(batch)} items"
+            )
 
-        return success_count
+        accepted = 0
+        for index, (filepath, meta, _) in enumerate(batch):
+            status = results[index].get("status") if index < len(results) else None
+            if self._apply_outbox_status(filepath, meta, status):
+                accepted += 1
+        return accepted
 
 
 def create_sender(
@@ -367,6 +685,30 @@ def create_sender(
     token: str,
     timeout: int,
     outbox_dir: Path,
+    compression: str = "none",
+    compression_min_bytes: int = 1024,
+    outbox_store: str = "files",
+    outbox_compression: str = "none",
+    batch_endpoint: Optional[str] = None,
+    batch_max_items: int = OUTBOX_BATCH_MAX_ITEMS,
+    batch_max_bytes: int = OUTBOX_BATCH_MAX_BYTES,
+    workers: int = 1,
+    ordering: str = "strict",
+    breaker_failures: int = 3,
+    breaker_cooldown_seconds: float = 300,
 ) -> HttpSender:
     """Factory function to create HTTP sender."""
-    return HttpSender(endpoint, token, timeout, outbox_dir)
+    return HttpSender(
+        endpoint, token, timeout, outbox_dir,
+        compression=compression,
+        compression_min_bytes=compression_min_bytes,
+        outbox_store=outbox_store,
+        outbox_compression=outbox_compression,
+        batch_endpoint=batch_endpoint,
+        batch_max_items=batch_max_items,
+        batch_max_bytes=batch_max_bytes,
+        workers=workers,
+        ordering=ordering,
+        breaker_failures=breaker_failures,
+        breaker_cooldown_seconds=breaker_cooldown_seconds,
+    )
@@ -79,6 +79,10 @@ class Settings(BaseSettings):
     # SQL Server encryption (Driver 18 defaults to Encrypt=yes, which breaks localhost)
     sql_encrypt: str = Field(default="no", alias="SQL_ENCRYPT")
     sql_trust_server_cert: str = Field(default="yes", alias="SQL_TRUST_SERVER_CERT")
+    # Pooled connections idle longer than this are validated (SELECT 1) before reuse
+    db_pool_idle_ttl_seconds: int = Field(default=60, alias="DB_POOL_IDLE_TTL_SECONDS")
+    # Rows fetched per round trip when streaming large result sets (sale items/payments)
+    fetch_batch_size: int = Field(default=2000, alias="FETCH_BATCH_SIZE")
 
     # Store
     store_id_ponto_venda: int = Field(default=10, alias="STORE_ID_PONTO_VENDA")
@@ -89,13 +93,92 @@ class Settings(BaseSettings):
     api_endpoint: str = Field(alias="API_ENDPOINT")
     api_token: str = Field(alias="API_TOKEN")
     request_timeout_seconds: int = Field(default=15, alias="REQUEST_TIMEOUT_SECONDS")
+    # Request body compression: none | gzip | zstd (zstd needs the zstandard
+    # package, falls back to gzip). Only bodies ≥ HTTP_COMPRESSION_MIN_BYTES are
+    # compressed. Enable only if the API accepts Content-Encoding.
+    http_compression: str = Field(default="none", alias="HTTP_COMPRESSION")
+    http_compression_min_bytes: int = Field(default=1024, alias="HTTP_COMPRESSION_MIN_BYTES")
 
     # Sync
     sync_window_minutes: int = Field(default=10, alias="SYNC_WINDOW_MINUTES")
+    # Adaptive schedule (--loop only): SYNC_WINDOW_MINUTES is the base interval,
+    # shortened to SYNC_INTERVAL_MIN_MINUTES at peak (≥ PEAK_OPS_PER_MINUTE sales
+    # per minute over the last cycles) and stretched to SYNC_INTERVAL_MAX_MINUTES
+    # while no turno is open. The open PDV and Loja turnos are polled every
+    # CLOSURE_WATCH_SECONDS (two small queries); a closure triggers an
+    # immediate sync. Off by default.
+    adaptive_schedule: bool = Field(default=False, alias="ADAPTIVE_SCHEDULE")
+    sync_interval_min_minutes: int = Field(default=2, alias="SYNC_INTERVAL_MIN_MINUTES")
+    sync_interval_max_minutes: int = Field(default=30, alias="SYNC_INTERVAL_MAX_MINUTES")
+    peak_ops_per_minute: float = Field(default=1.0, alias="PEAK_OPS_PER_MINUTE")
+    closure_watch_seconds: int = Field(default=60, alias="CLOSURE_WATCH_SECONDS")
+    # Window extract: scan operacao_pdv once per cycle (temp table + multi result sets)
+    # instead of one query per dataset. Set to false to use the individual queries.
+    window_extract: bool = Field(default=True, alias="WINDOW_EXTRACT")
+    # Change probe: one COUNT query per database before the extraction; windows
+    # with no sales and no turno closure/shortage skip the extraction entirely.
+    change_probe: bool = Field(default=True, alias="CHANGE_PROBE")
+    # Build sale details (vendas) as validated pydantic models. Off (default):
+    # plain records serialized straight to the same JSON, skipping per-row
+    # validation — much cheaper on large catch-up windows.
+    payload_validation: bool = Field(default=False, alias="PAYLOAD_VALIDATION")
+    # Vendor / operator names are resolved from an in-process copy of
+    # dbo.usuario (the item queries return only ids), reloaded after
+    # USER_DIRECTORY_TTL_MINUTES or when an unknown user id shows up.
+    user_directory_ttl_minutes: int = Field(default=60, alias="USER_DIRECTORY_TTL_MINUTES")
+    # Product names are resolved from a local catalogue cache (the item
+    # queries return only id_produto): in memory plus products.sqlite3 next to
+    # STATE_FILE (PRODUCT_CACHE_PERSIST=false keeps it in memory only). Names
+    # are refetched once older than PRODUCT_CACHE_TTL_MINUTES.
+    product_cache_ttl_minutes: int = Field(default=1440, alias="PRODUCT_CACHE_TTL_MINUTES")
+    product_cache_persist: bool = Field(default=True, alias="PRODUCT_CACHE_PERSIST")
+    # Run the PDV and Gestão extraction branches concurrently (one worker thread
+    # and one connection per database). Set to false to run them one after another.
+    parallel_extract: bool = Field(default=True, alias="PARALLEL_EXTRACT")
+    # Also run the SQL resumo aggregates and flag divergences from the in-process
+    # aggregation in integrity.warnings (diagnostic; costs 2 extra queries per DB)
+    resumo_sql_check: bool = Field(default=False, alias="RESUMO_SQL_CHECK")
+    # Snapshot cache: keep closed turno / sale snapshots in snapshot_cache.json
+    # (next to STATE_FILE) and only query rows newer than the cache each cycle.
+    # Every SNAPSHOT_FULL_REFRESH_MINUTES the snapshots are re-read from scratch.
+    snapshot_cache: bool = Field(default=True, alias="SNAPSHOT_CACHE")
+    snapshot_full_refresh_minutes: int = Field(default=60, alias="SNAPSHOT_FULL_REFRESH_MINUTES")
+    # Delta payloads: omit turnos / snapshots whose content the API already
+    # acknowledged (hashes in delta_state.json next to STATE_FILE; payload
+    # carries integrity.delta=true). A full payload goes out every
+    # DELTA_FULL_RESEND_MINUTES. Requires an API that merges partial lists.
+    delta_payloads: bool = Field(default=False, alias="DELTA_PAYLOADS")
+    delta_full_resend_minutes: int = Field(default=60, alias="DELTA_FULL_RESEND_MINUTES")
+
+    # Catch-up: windows longer than CATCHUP_CHUNK_MINUTES (agent was offline)
+    # are synced as sequential chunks, each committed before the next. A chunk
+    # is halved while it holds more than CATCHUP_MAX_OPS sales.
+    catchup_chunk_minutes: int = Field(default=60, alias="CATCHUP_CHUNK_MINUTES")
+    catchup_max_ops: int = Field(default=1000, alias="CATCHUP_MAX_OPS")
 
     # Paths (absolute paths for production, relative for dev)
     state_file: Path = Field(default=Path("./data/state.json"), alias="STATE_FILE")
     outbox_dir: Path = Field(default=Path("./data/outbox"), alias="OUTBOX_DIR")
+    # Outbox storage: files (one JSON per payload) or sqlite (one WAL database
+    # next to OUTBOX_DIR; existing *.json files are imported on first start)
+    outbox_store: str = Field(default="files", alias="OUTBOX_STORE")
+    # Compression of stored outbox / dead_letter envelopes: none | gzip | zstd
+    outbox_compression: str = Field(default="none", alias="OUTBOX_COMPRESSION")
+    # Batch outbox drain: when set, pending outbox payloads are bundled into
+    # POSTs to this endpoint (≤ OUTBOX_BATCH_MAX_ITEMS items / MAX_BYTES of JSON)
+    outbox_batch_endpoint: Optional[str] = Field(default=None, alias="OUTBOX_BATCH_ENDPOINT")
+    outbox_batch_max_items: int = Field(default=100, alias="OUTBOX_BATCH_MAX_ITEMS")
+    outbox_batch_max_bytes: int = Field(default=2 * 1024 * 1024, alias="OUTBOX_BATCH_MAX_BYTES")
+    # Outbox drain: OUTBOX_WORKERS concurrent POSTs under OUTBOX_ORDERING
+    #   strict    — one at a time in creation order, stop at the first failure
+    #   by_window — overlapping windows in order, disjoint windows concurrently
+    #   unordered — all payloads concurrently
+    # After OUTBOX_BREAKER_FAILURES consecutive network/5xx failures the API is
+    # considered down: nothing is sent for OUTBOX_BREAKER_COOLDOWN_SECONDS.
+    outbox_workers: int = Field(default=1, alias="OUTBOX_WORKERS")
+    outbox_ordering: str = Field(default="strict", alias="OUTBOX_ORDERING")
+    outbox_breaker_failures: int = Field(default=3, alias="OUTBOX_BREAKER_FAILURES")
+    outbox_breaker_cooldown_seconds: int = Field(default=300, alias="OUTBOX_BREAKER_COOLDOWN_SECONDS")
 
     # Logging
     log_file: Path = Field(default=Path("./logs/agent.log"), alias="LOG_FILE")
@@ -103,7 +186,7 @@ class Settings(BaseSettings):
     log_rotation: str = Field(default="10 MB", alias="LOG_ROTATION")
     log_retention: str = Field(default="30 days", alias="LOG_RETENTION")
 
-    @field_validator("sql_username", "sql_password", mode="before")
+    @field_validator("sql_username", "sql_password", "outbox_batch_endpoint", mode="before")
     @classmethod
     def empty_str_to_none(cls, v: Optional[str]) -> Optional[str]:
         """Convert empty strings to None."""
@@ -111,6 +194,33 @@ class Settings(BaseSettings):
             return None
         return v
 
+    @field_validator("http_compression", "outbox_compression", mode="before")
+    @classmethod
+    def normalize_compression(cls, v: Optional[str]) -> str:
+        """Accept none/gzip/zstd (case-insensitive); empty means none."""
+        value = (v or "none").strip().lower()
+        if value not in ("none", "gzip", "zstd"):
+            raise ValueError(f"Compression must be none, gzip or zstd (got {v!r})")
+        return value
+
+    @field_validator("outbox_store", mode="before")
+    @classmethod
+    def normalize_outbox_store(cls, v: Optional[str]) -> str:
+        """Accept files/sqlite (case-insensitive); empty means files."""
+        value = (v or "files").strip().lower()
+        if value not in ("sqlite", "files"):
+            raise ValueError(f"OUTBOX_STORE must be sqlite or files (got {v!r})")
+        return value
+
+    @field_validator("outbox_ordering", mode="before")
+    @classmethod
+    def normalize_ordering(cls, v: Optional[str]) -> str:
+        """Accept strict/by_window/unordered (case-insensitive); empty means strict."""
+        value = (v or "strict").strip().lower().replace("-", "_")
+        if value not in ("strict", "by_window", "unordered"):
+            raise ValueError(f"OUTBOX_ORDERING must be strict, by_window or unordered (got {v!r})")
+        return value
+
     @property
     def resolved_store_id_filial(self) -> int:
         """Return store_id_filial if set, otherwise fall back to store_id_ponto_venda."""
@@ -193,6 +303,7 @@ class Settings(BaseSettings):
         logger.info(f"Auth Mode: {auth_mode}")
         logger.info(f"ODBC Driver: {driver_display}")
         logger.info(f"Encrypt: {self.sql_encrypt} | TrustCert: {self.sql_trust_server_cert}")
+        logger.info(f"Pool Idle TTL: {self.db_pool_idle_ttl_seconds}s | Fetch Batch: {self.fetch_batch_size} rows")
         logger.info("-" * 60)
         logger.info(f"Store ID PDV: {self.store_id_ponto_venda}")
         logger.info(f"Store ID Filial (Gestão): {self.resolved_store_id_filial}")
@@ -201,10 +312,59 @@ class Settings(BaseSettings):
         logger.info(f"API Endpoint: {self.api_endpoint}")
         logger.info(f"API Token: {'*' * 8}...{self.api_token[-4:] if len(self.api_token) > 4 else '****'}")
         logger.info(f"Timeout: {self.request_timeout_seconds}s")
+        logger.info(
+            f"Compression: {self.http_compression} "
+            f"(min {self.http_compression_min_bytes} bytes)"
+        )
         logger.info("-" * 60)
         logger.info(f"Sync Window: {self.sync_window_minutes} minutes")
+        if self.adaptive_schedule:
+            logger.info(
+                f"Adaptive Schedule: {self.sync_interval_min_minutes}-"
+                f"{self.sync_interval_max_minutes} min "
+                f"(peak ≥ {self.peak_ops_per_minute} ops/min, "
+                f"closure watch {self.closure_watch_seconds}s)"
+            )
+        else:
+            logger.info("Adaptive Schedule: off")
+        logger.info(f"Window Extract: {'on' if self.window_extract else 'off'}")
+        logger.info(f"Change Probe: {'on' if self.change_probe else 'off'}")
+        logger.info(f"Payload Validation: {'on' if self.payload_validation else 'off'}")
+        logger.info(f"User Directory TTL: {self.user_directory_ttl_minutes} min")
+        logger.info(
+            f"Product Cache: {'sqlite' if self.product_cache_persist else 'memory'} "
+            f"(TTL {self.product_cache_ttl_minutes} min)"
+        )
+        logger.info(f"Parallel Extract: {'on' if self.parallel_extract else 'off'}")
+        logger.info(f"Resumo SQL Check: {'on' if self.resumo_sql_check else 'off'}")
+        logger.info(
+            f"Snapshot Cache: {'on' if self.snapshot_cache else 'off'} "
+            f"(full refresh every {self.snapshot_full_refresh_minutes} min)"
+        )
+        logger.info(
+            f"Delta Payloads: {'on' if self.delta_payloads else 'off'} "
+            f"(full resend every {self.delta_full_resend_minutes} min)"
+        )
+        logger.info(
+            f"Catch-up chunks: {self.catchup_chunk_minutes} min / "
+            f"{self.catchup_max_ops} ops"
+        )
         logger.info(f"State File: {self.state_file}")
-        logger.info(f"Outbox Dir: {self.outbox_dir}")
+        logger.info(
+            f"Outbox Dir: {self.outbox_dir} "
+            f"(store: {self.outbox_store}, compression: {self.outbox_compression})"
+        )
+        logger.info(
+            f"Outbox Drain: {self.outbox_ordering} x{self.outbox_workers} "
+            f"(breaker {self.outbox_breaker_failures} failures / "
+            f"{self.outbox_breaker_cooldown_seconds}s)"
+        )
+        if self.outbox_batch_endpoint:
+            logger.info(
+                f"Outbox Batch: {self.outbox_batch_endpoint} "
+                f"(≤{self.outbox_batch_max_items} items / "
+                f"{self.outbox_batch_max_bytes // 1024} KB)"
+            )
         logger.info(f"Log File: {self.log_file}")
         logger.info("=" * 60)
 
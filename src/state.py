@@ -1,12 +1,14 @@
 """
 State management for incremental sync.
-Tracks the last successful sync timestamp.
+Tracks the last successful sync timestamp, caches closed snapshots and
+remembers which turnos/snapshots the API already acknowledged (delta payloads).
 """
 
 import json
+import os
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Optional
+from typing import Any, Optional
 
 from loguru import logger
 from pydantic import BaseModel
@@ -14,6 +16,24 @@ from pydantic import BaseModel
 from . import BRT
 
 
+def _write_json(path: Path, data: Any, **dump_kwargs: Any) -> None:
+    """
+    Write JSON atomically: dump to a temp file in the same directory, then
+    os.replace() it over the target, so a crash mid-write leaves the previous
+    file intact instead of truncated JSON.
+    """
+    tmp = path.with_name(path.name + ".tmp")
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, **dump_kwargs)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
 class SyncState(BaseModel):
     """Persistent sync state."""
 
@@ -65,8 +85,7 @@ class StateManager:
             )
         }
 
-        with open(self.state_file, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2)
+        _write_json(self.state_file, data, indent=2)
 
         logger.info(f"State saved: last_sync_to={state.last_sync_to}")
 
@@ -119,6 +138,137 @@ class WindowCalculator:
         self.state_manager.update_last_sync(dt_to)
 
 
+class SnapshotCache:
+    """
+    Persisted cache of snapshot rows (snapshot_turnos / snapshot_vendas).
+
+    Closed turnos and finished sales do not change, so each cycle only needs
+    the rows newer than what is already cached. Entries are stored per key
+    (e.g. "turnos:HIPER_CAIXA") in a JSON file next to state.json, each with
+    the time of its last full refresh; once that is older than
+    full_refresh_minutes the key is re-read from scratch to pick up late
+    edits (cancellations, corrected closures).
+    """
+
+    def __init__(self, cache_file: Path, full_refresh_minutes: int = 60):
+        self.cache_file = Path(cache_file)
+        self.full_refresh_minutes = full_refresh_minutes
+        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+        self._entries: dict[str, dict[str, Any]] = self._load()
+        self._dirty = False
+
+    def _load(self) -> dict[str, dict[str, Any]]:
+        """Load cached entries from file."""
+        if not self.cache_file.exists():
+            return {}
+
+        try:
+            with open(self.cache_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            entries = data.get("entries", {})
+            logger.debug(f"Loaded snapshot cache: {', '.join(entries) or 'empty'}")
+            return entries
+        except (json.JSONDecodeError, ValueError, AttributeError) as e:
+            logger.warning(f"Invalid snapshot cache, starting fresh: {e}")
+            return {}
+
+    def needs_full_refresh(self, key: str) -> bool:
+        """True if the key was never cached or its last full refresh is too old."""
+        entry = self._entries.get(key)
+        if not entry or not entry.get("refreshed_at"):
+            return True
+
+        refreshed_at = datetime.fromisoformat(entry["refreshed_at"])
+        age = datetime.now(BRT) - refreshed_at
+        return age >= timedelta(minutes=self.full_refresh_minutes)
+
+    def get(self, key: str) -> list[dict[str, Any]]:
+        """Cached rows for a key (JSON-mode model dumps)."""
+        entry = self._entries.get(key)
+        return list(entry["rows"]) if entry else []
+
+    def put(self, key: str, rows: list[dict[str, Any]], full_refresh: bool) -> None:
+        """Replace the cached rows for a key."""
+        entry = self._entries.get(key, {})
+        refreshed_at = entry.get("refreshed_at")
+        if full_refresh or refreshed_at is None:
+            refreshed_at = datetime.now(BRT).isoformat()
+
+        self._entries[key] = {"refreshed_at": refreshed_at, "rows": rows}
+        self._dirty = True
+
+    def save(self) -> None:
+        """Write the cache to disk if anything changed."""
+        if not self._dirty:
+            return
+
+        _write_json(self.cache_file, {"entries": self._entries})
+
+        self._dirty = False
+        logger.debug(f"Snapshot cache saved: {self.cache_file}")
+
+
+class DeltaState:
+    """
+    Content hashes of the turnos / snapshot entries the API has acknowledged
+    (delta payloads).
+
+    Hashes are kept per section ("turnos", "snapshot_turnos",
+    "snapshot_vendas") and entry key (e.g. "HIPER_CAIXA:<id_turno>") in
+    delta_state.json next to state.json. They are only replaced after a
+    successful POST, so a payload that ends up in the outbox does not mark
+    its entries as sent. Every full_resend_minutes a full payload is sent
+    regardless of the hashes.
+    """
+
+    def __init__(self, state_file: Path, full_resend_minutes: int = 60):
+        self.state_file = Path(state_file)
+        self.full_resend_minutes = full_resend_minutes
+        self.state_file.parent.mkdir(parents=True, exist_ok=True)
+        self._full_sent_at: Optional[str] = None
+        self._hashes: dict[str, dict[str, str]] = {}
+        self._load()
+
+    def _load(self) -> None:
+        """Load acknowledged hashes from file."""
+        if not self.state_file.exists():
+            return
+
+        try:
+            with open(self.state_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self._full_sent_at = data.get("full_sent_at")
+            self._hashes = data.get("hashes", {})
+        except (json.JSONDecodeError, ValueError, AttributeError) as e:
+            logger.warning(f"Invalid delta state, next payload is full: {e}")
+            self._full_sent_at, self._hashes = None, {}
+
+    def needs_full_resend(self) -> bool:
+        """True if no full payload was acknowledged within full_resend_minutes."""
+        if not self._full_sent_at:
+            return True
+
+        age = datetime.now(BRT) - datetime.fromisoformat(self._full_sent_at)
+        return age >= timedelta(minutes=self.full_resend_minutes)
+
+    def is_acknowledged(self, section: str, key: str, digest: str) -> bool:
+        """True if the API already acknowledged this exact entry content."""
+        return self._hashes.get(section, {}).get(key) == digest
+
+    def acknowledge(self, hashes: dict[str, dict[str, str]], full: bool) -> None:
+        """
+        Record the hashes of every entry in an acknowledged payload (sent or
+        omitted) and save. Sections are replaced, so entries that dropped out
+        of the payload are forgotten.
+        """
+        self._hashes.update(hashes)
+        if full:
+            self._full_sent_at = datetime.now(BRT).isoformat()
+
+        _write_json(self.state_file, {"full_sent_at": self._full_sent_at, "hashes": self._hashes})
+        logger.debug(f"Delta state saved: {self.state_file}")
+
+
 def create_state_manager(state_file: Path) -> StateManager:
     """Factory function to create state manager."""
     return StateManager(state_file)
@@ -130,3 +280,13 @@ def create_window_calculator(
 ) -> WindowCalculator:
     """Factory function to create window calculator."""
     return WindowCalculator(state_manager, window_minutes)
+
+
+def create_snapshot_cache(state_file: Path, full_refresh_minutes: int) -> SnapshotCache:
+    """Factory function to create the snapshot cache next to the state file."""
+    return SnapshotCache(Path(state_file).parent / "snapshot_cache.json", full_refresh_minutes)
+
+
+def create_delta_state(state_file: Path, full_resend_minutes: int) -> DeltaState:
+    """Factory function to create the delta state next to the state file."""
+    return DeltaState(Path(state_file).parent / "delta_state.json", full_resend_minutes)
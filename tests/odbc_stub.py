@@ -0,0 +1,64 @@
+"""
+Offline stand-ins for the native modules imported by src.db / src.settings.
+
+pyodbc needs the unixODBC / Windows ODBC runtime and winreg exists only on
+Windows, so importing src.db (and src.queries, which imports it) fails on a
+machine without them. Importing this module first registers placeholder
+modules for whichever of the two cannot be imported; the real ones are
+always used when available. No query ever reaches a database: the tests
+pass their own DB objects to QueryExecutor / GestaoQueryExecutor.
+
+    import odbc_stub  # noqa: F401  (before importing src.db / src.queries)
+"""
+
+import sys
+import types
+
+
+def _stub_pyodbc() -> types.ModuleType:
+    module = types.ModuleType("pyodbc")
+
+    class Error(Exception):
+        pass
+
+    class OperationalError(Error):
+        pass
+
+    class InterfaceError(Error):
+        pass
+
+    class ProgrammingError(Error):
+        pass
+
+    class Connection:
+        pass
+
+    class Cursor:
+        pass
+
+    def connect(*args, **kwargs):
+        raise OperationalError("08001", "pyodbc stub: no ODBC driver available")
+
+    for obj in (Error, OperationalError, InterfaceError, ProgrammingError, Connection, Cursor):
+        obj.__module__ = "pyodbc"
+        setattr(module, obj.__name__, obj)
+    module.connect = connect
+    return module
+
+
+def _stub_winreg() -> types.ModuleType:
+    module = types.ModuleType("winreg")
+    module.HKEY_LOCAL_MACHINE = 0x80000002
+
+    def OpenKey(*args, **kwargs):
+        raise FileNotFoundError("winreg stub: no registry")
+
+    module.OpenKey = OpenKey
+    return module
+
+
+for _name, _factory in (("pyodbc", _stub_pyodbc), ("winreg", _stub_winreg)):
+    try:
+        __import__(_name)
+    except ImportError:
+        sys.modules[_name] = _factory()
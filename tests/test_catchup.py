@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Catch-up Mode Test Suite
+========================
+An oversized window (agent offline) is synced as sequential chunks of at
+most CATCHUP_CHUNK_MINUTES, halved while a chunk holds more than
+CATCHUP_MAX_OPS sales (PDV + Loja). Each chunk is committed before the next
+one, so a failed POST stops the catch-up and the next run resumes from the
+failed chunk.
+
+Runs SyncRunner.run() against in-memory stand-ins for the databases and
+the API; the sync state is a real state.json in a temp directory.
+
+Run:
+    python tests/test_catchup.py
+"""
+
+import json
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import odbc_stub  # noqa: F401
+
+from src import BRT
+from src.payload import build_payload
+from src.runner import SyncRunner
+from src.sender import SendResult
+from src.state import StateManager, WindowCalculator
+
+PASS = "✅ PASS"
+FAIL = "❌ FAIL"
+results: list[tuple[str, str, str]] = []
+
+
+def record(test_name: str, passed: bool, detail: str = ""):
+    status = PASS if passed else FAIL
+    results.append((test_name, status, detail))
+    print(f"  [{status}] {test_name}")
+    if detail and not passed:
+        print(f"         → {detail}")
+
+
+class SalesDB:
+    """count_operations / count_loja_operations over in-memory sale times."""
+
+    def __init__(self, pdv: list[datetime], loja: list[datetime]):
+        self.pdv, self.loja = pdv, loja
+        self.loja_fails = False
+
+    @staticmethod
+    def _in(times: list[datetime], dt_from: datetime, dt_to: datetime) -> list[int]:
+        return [n for n, t in enumerate(times) if dt_from <= t < dt_to]
+
+    def count_operations(self, dt_from, dt_to) -> int:
+        return len(self._in(self.pdv, dt_from, dt_to))
+
+    def count_loja_operations(self, dt_from, dt_to, id_filial) -> int:
+        if self.loja_fails:
+            raise RuntimeError("Gestão offline")
+        return len(self._in(self.loja, dt_from, dt_to))
+
+
+class API:
+    """HttpSender stand-in: POSTs listed in fail_posts (1-based) fail."""
+
+    def __init__(self, fail_posts: tuple[int, ...] = ()):
+        self.fail_posts = set(fail_posts)
+        self.posts: list[tuple[str, str]] = []
+        self.stats = SimpleNamespace(model_dump=dict)
+
+    def process_outbox(self) -> int:
+        return 0
+
+    def send(self, data: bytes, sync_id: str) -> SendResult:
+        window = json.loads(data)["window"]
+        self.posts.append((window["from"], window["to"]))
+        if len(self.posts) in self.fail_posts:
+            return SendResult(success=False, status_code=503, saved_to_outbox=True)
+        return SendResult(success=True, status_code=200)
+
+
+def make_runner(tmp: Path, sales: SalesDB, api: API, start: datetime,
+                chunk_minutes: int = 60, max_ops: int = 5) -> SyncRunner:
+    settings = SimpleNamespace(
+        catchup_chunk_minutes=chunk_minutes, catchup_max_ops=max_ops,
+        change_probe=False, resolved_store_id_filial=7,
+    )
+    state_manager = StateManager(tmp / "state.json")
+    state_manager.update_last_sync(start)
+    db = SimpleNamespace(stats=SimpleNamespace(model_dump=dict))
+    runner = SyncRunner(
+        settings, db, sales, db, sales, api, state_manager,
+        WindowCalculator(state_manager, window_minutes=10),
+    )
+
+    def build(dt_from, dt_to):
+        runner.built.append((dt_from, dt_to))
+        return build_payload(
+            store_id=1, store_name="Loja", store_alias="loja",
+            dt_from=dt_from, dt_to=dt_to, window_minutes=int((dt_to - dt_from).total_seconds() // 60),
+            turnos=[], vendas=[], sales_by_vendor=[], payments_by_method=[],
+            ops_ids=SalesDB._in(sales.pdv, dt_from, dt_to),
+            loja_ids=SalesDB._in(sales.loja, dt_from, dt_to),
+        )
+
+    runner.built = []
+    runner._build_payload = build
+    return runner
+
+
+def contiguous(chunks: list[tuple[datetime, datetime]]) -> bool:
+    return all(a[1] == b[0] for a, b in zip(chunks, chunks[1:]))
+
+
+def test_01_chunk_minutes():
+    """Chunks of ≤ CATCHUP_CHUNK_MINUTES cover the whole window"""
+    print("\n─── Test 1: CATCHUP_CHUNK_MINUTES ───")
+    start = datetime.now(BRT) - timedelta(hours=3, minutes=30)
+    runner = make_runner(Path(tempfile.mkdtemp()), SalesDB([], []), API(), start)
+
+    ok = runner.run()
+    chunks = runner.built
+    last_sync = runner.state_manager.load().last_sync_to
+    record("catch-up completed", ok)
+    record("4 chunks (60+60+60+30 min)", [round((b - a).total_seconds() / 60) for a, b in chunks] == [60, 60, 60, 30],
+           f"got: {[(b - a) for a, b in chunks]}")
+    record("contiguous from the last sync to now", chunks[0][0] == start and contiguous(chunks)
+           and chunks[-1][1] == last_sync, f"last sync: {last_sync}")
+
+    quiet = make_runner(Path(tempfile.mkdtemp()), SalesDB([], []), API(), datetime.now(BRT) - timedelta(minutes=50))
+    quiet.run()
+    record("window within the chunk size: single sync", len(quiet.built) == 1)
+
+
+def test_02_max_ops():
+    """Busy chunks are halved until they hold ≤ CATCHUP_MAX_OPS sales"""
+    print("\n─── Test 2: CATCHUP_MAX_OPS ───")
+    start = datetime.now(BRT) - timedelta(hours=2)
+    # 8 PDV + 4 Loja sales in the first 12 minutes, 10 PDV sales within one minute at 1h30
+    pdv = [start + timedelta(minutes=m) for m in range(8)]
+    pdv += [start + timedelta(minutes=90, seconds=s) for s in range(0, 50, 5)]
+    loja = [start + timedelta(minutes=8 + m) for m in range(4)]
+    sales = SalesDB(pdv, loja)
+    api = API()
+    runner = make_runner(Path(tempfile.mkdtemp()), sales, api, start)
+
+    runner.run()
+    chunks = runner.built
+    counts = [runner._count_window_ops(a, b) for a, b in chunks]
+    record("every sale in exactly one chunk", sum(counts) == len(pdv) + len(loja) and contiguous(chunks),
+           f"counts: {counts}")
+    record("chunks over the limit only at the 1-minute floor",
+           all(c <= 5 or b - a <= timedelta(minutes=1) for (a, b), c in zip(chunks, counts)),
+           f"counts: {counts} / {[(b - a) for a, b in chunks]}")
+    record("Loja sales count toward the limit",
+           runner._count_window_ops(start, start + timedelta(minutes=12)) == 12)
+    record("1-minute floor reached for the burst", any(c == 10 for c in counts), f"counts: {counts}")
+    record("quiet stretches stay full-size", max(b - a for a, b in chunks) == timedelta(minutes=60))
+
+    sales.loja_fails = True
+    record("Gestão count failure counts as 0",
+           runner._count_window_ops(start, start + timedelta(minutes=12)) == 8)
+
+
+def test_03_resume_after_failure():
+    """A failed chunk stops the catch-up; the next run resumes from it"""
+    print("\n─── Test 3: resume after a failed chunk ───")
+    start = datetime.now(BRT) - timedelta(hours=3, minutes=30)
+    # One sale per hour so every chunk is POSTed
+    sales = SalesDB([start + timedelta(minutes=5 + 60 * h) for h in range(4)], [])
+    api = API(fail_posts=(2,))
+    runner = make_runner(Path(tempfile.mkdtemp()), sales, api, start)
+
+    ok = runner.run()
+    failed_chunk = runner.built[1]
+    record("run reports failure", ok is False)
+    record("stopped at the failed chunk", len(runner.built) == 2 and len(api.posts) == 2,
+           f"built: {len(runner.built)}, posts: {len(api.posts)}")
+    record("state committed up to the failed chunk",
+           runner.state_manager.load().last_sync_to == failed_chunk[0])
+
+    runner.built.clear()
+    ok = runner.run()
+    record("next run resumes from the failed chunk", runner.built[0][0] == failed_chunk[0],
+           f"got: {runner.built[0][0]} / expected {failed_chunk[0]}")
+    record("and completes", ok and len(api.posts) == 2 + len(runner.built)
+           and runner.state_manager.load().last_sync_to == runner.built[-1][1])
+
+
+def main():
+    print("=" * 64)
+    print("  Catch-up Mode Test Suite")
+    print("=" * 64)
+
+    test_01_chunk_minutes()
+    test_02_max_ops()
+    test_03_resume_after_failure()
+
+    total = len(results)
+    failed = sum(1 for _, s, _ in results if s == FAIL)
+
+    print("\n" + "=" * 64)
+    if failed == 0:
+        print(f"  ✅ ALL {total} TESTS PASSED")
+    else:
+        print(f"  ❌ {failed} FAILED / {total} TOTAL")
+    print("=" * 64)
+
+    return 0 if failed == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
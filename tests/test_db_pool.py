@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+DB Connection Pool Test Suite
+=============================
+DatabaseConnection keeps up to MAX_IDLE idle connections and validates
+(SELECT 1) a connection only when it has been idle longer than
+DB_POOL_IDLE_TTL_SECONDS or after a query on it raised a pyodbc error:
+  - connections are returned to the pool and reused
+  - a connection that fails validation after an error is dropped; the
+    statement of execute_query / execute_scalar runs once more on a new one
+  - a stale idle connection is pinged before reuse
+
+Each pool opens in-memory fake connections instead of calling pyodbc.connect.
+
+Run:
+    python tests/test_db_pool.py
+"""
+
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import odbc_stub  # noqa: F401
+
+import src.db as db_module
+from src.db import DatabaseConnection
+
+pyodbc = db_module.pyodbc
+
+PASS = "✅ PASS"
+FAIL = "❌ FAIL"
+results: list[tuple[str, str, str]] = []
+
+
+def record(test_name: str, passed: bool, detail: str = ""):
+    status = PASS if passed else FAIL
+    results.append((test_name, status, detail))
+    print(f"  [{status}] {test_name}")
+    if detail and not passed:
+        print(f"         → {detail}")
+
+
+class FakeCursor:
+    def __init__(self, conn: "FakeConnection"):
+        self.conn = conn
+        self.description = None
+        self._rows: list[tuple] = []
+
+    def execute(self, query: str, params: tuple = ()):
+        if not self.conn.alive:
+            raise pyodbc.OperationalError("08S01", "Communication link failure")
+        if "fail" in query:
+            raise pyodbc.ProgrammingError("42S02", "Invalid object name")
+        self.conn.queries.append(query)
+        self.description = [("n",)]
+        self._rows = [(1,), (2,), (3,)]
+        return self
+
+    def fetchall(self):
+        rows, self._rows = self._rows, []
+        return rows
+
+    def fetchmany(self, size: int):
+        rows, self._rows = self._rows[:size], self._rows[size:]
+        return rows
+
+    def fetchone(self):
+        return self._rows.pop(0) if self._rows else None
+
+    def nextset(self):
+        return False
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, number: int):
+        self.number = number
+        self.alive = True
+        self.closed = False
+        self.queries: list[str] = []
+
+    def cursor(self):
+        if not self.alive:
+            raise pyodbc.OperationalError("08S01", "Communication link failure")
+        return FakeCursor(self)
+
+    def execute(self, query: str):
+        return self.cursor().execute(query)
+
+    def close(self):
+        self.closed = True
+
+
+class Driver:
+    """_connect_with_retry replacement: hands out numbered FakeConnections."""
+
+    def __init__(self):
+        self.opened: list[FakeConnection] = []
+        self.dead_on_open = False
+
+    def __call__(self, conn_string: str) -> FakeConnection:
+        conn = FakeConnection(len(self.opened) + 1)
+        conn.alive = not self.dead_on_open
+        self.opened.append(conn)
+        return conn
+
+
+def make_pool(idle_ttl: int = 30) -> tuple[DatabaseConnection, Driver]:
+    settings = SimpleNamespace(
+        db_pool_idle_ttl_seconds=idle_ttl, odbc_connection_string="DRIVER={x};DATABASE=HiperPdv",
+        sql_server_full="localhost\\HIPER", sql_database="HiperPdv", sql_driver="x",
+        fetch_batch_size=2,
+    )
+    driver = Driver()
+    pool = DatabaseConnection(settings)
+    pool._connect_with_retry = driver
+    return pool, driver
+
+
+def pings(conn: FakeConnection) -> int:
+    return conn.queries.count("SELECT 1")
+
+
+def test_01_reuse():
+    """Sequential queries share one connection, no validation"""
+    print("\n─── Test 1: return and reuse ───")
+    pool, driver = make_pool()
+    for _ in range(3):
+        pool.execute_query("SELECT n FROM t")
+
+    record("one physical connection", len(driver.opened) == 1 and pool.stats.connects == 1,
+           f"stats: {pool.stats}")
+    record("3 checkouts, no ping", pool.stats.checkouts == 3 and pool.stats.pings == 0,
+           f"stats: {pool.stats}")
+
+    with pool.cursor() as first, pool.cursor() as second:
+        record("concurrent checkouts get separate connections", first.conn is not second.conn)
+    with pool.cursor(), pool.cursor(), pool.cursor():
+        pass
+    record("at most MAX_IDLE kept, the extra one closed",
+           len(pool._idle) == DatabaseConnection.MAX_IDLE and sum(c.closed for c in driver.opened) == 1,
+           f"idle: {len(pool._idle)}, opened: {len(driver.opened)}")
+
+    rows = pool.iter_query("SELECT n FROM t")
+    next(rows)
+    record("streaming query keeps its connection checked out", len(pool._idle) == 1)
+    rows.close()
+    record("closed iterator returns it", len(pool._idle) == 2)
+
+    pool.close()
+    record("close() closes the idle connections", pool._idle == [] and all(c.closed for c in driver.opened))
+
+
+def test_02_errors():
+    """After an error: healthy connection kept, dead one dropped and the statement retried"""
+    print("\n─── Test 2: query errors ───")
+    pool, driver = make_pool()
+    pool.execute_query("SELECT n FROM t")
+    try:
+        pool.execute_query("SELECT fail")
+        raised = False
+    except pyodbc.Error:
+        raised = True
+    record("SQL error: raised, connection validated and kept",
+           raised and pool.stats.pings == 1 and pool.stats.discarded == 0 and len(pool._idle) == 1,
+           f"stats: {pool.stats}")
+
+    driver.opened[0].alive = False
+    record("lost connection: query retried on a new one",
+           pool.execute_query("SELECT n FROM t") == [{"n": 1}, {"n": 2}, {"n": 3}], f"stats: {pool.stats}")
+    record("lost connection: discarded, one reconnect", pool.stats.discarded == 1 and driver.opened[0].closed
+           and len(driver.opened) == 2 and pool.stats.reconnects == 1, f"stats: {pool.stats}")
+
+    driver.opened[1].alive = False
+    record("execute_scalar retried too", pool.execute_scalar("SELECT n FROM t") == 1
+           and pool.stats.discarded == 2 and len(driver.opened) == 3, f"stats: {pool.stats}")
+
+    driver.opened[2].alive = False
+    driver.dead_on_open = True
+    try:
+        pool.execute_query("SELECT n FROM t")
+        raised = False
+    except pyodbc.Error:
+        raised = True
+    record("retried only once: error propagates", raised and len(driver.opened) == 4,
+           f"opened: {len(driver.opened)}")
+    record("both dead connections discarded", pool._idle == [] and all(c.closed for c in driver.opened[2:]),
+           f"stats: {pool.stats}")
+
+    driver.dead_on_open = False
+    pool.execute_query("SELECT n FROM t")
+    driver.opened[-1].alive = False
+    try:
+        with pool.cursor() as cursor:
+            cursor.execute("SELECT n FROM t")
+        raised = False
+    except pyodbc.Error:
+        raised = True
+    record("cursor() on a dead connection: error propagates, connection discarded",
+           raised and driver.opened[-1].closed and pool._idle == [], f"stats: {pool.stats}")
+
+
+def test_03_idle_ttl():
+    """Stale idle connections are pinged before reuse"""
+    print("\n─── Test 3: idle TTL ───")
+    pool, driver = make_pool(idle_ttl=30)
+    pool.execute_query("SELECT n FROM t")
+    conn, last_used = pool._idle[0]
+    pool._idle[0] = (conn, last_used - 31)
+    pool.execute_query("SELECT n FROM t")
+    record("idle past the TTL: pinged, then reused", pings(conn) == 1 and len(driver.opened) == 1,
+           f"pings: {pings(conn)}, opened: {len(driver.opened)}")
+
+    pool.execute_query("SELECT n FROM t")
+    record("recently used: no ping", pings(conn) == 1)
+
+    conn, last_used = pool._idle[0]
+    pool._idle[0] = (conn, last_used - 31)
+    conn.alive = False
+    pool.execute_query("SELECT n FROM t")
+    record("stale and dead: discarded, new connection opened",
+           conn.closed and len(driver.opened) == 2 and pool.stats.discarded == 1, f"stats: {pool.stats}")
+
+
+def main():
+    print("=" * 64)
+    print("  DB Connection Pool Test Suite")
+    print("=" * 64)
+
+    test_01_reuse()
+    test_02_errors()
+    test_03_idle_ttl()
+
+    total = len(results)
+    failed = sum(1 for _, s, _ in results if s == FAIL)
+
+    print("\n" + "=" * 64)
+    if failed == 0:
+        print(f"  ✅ ALL {total} TESTS PASSED")
+    else:
+        print(f"  ❌ {failed} FAILED / {total} TOTAL")
+    print("=" * 64)
+
+    return 0 if failed == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Delta Payload Test Suite
+========================
+With DELTA_PAYLOADS, turnos and snapshot entries whose content the API
+already acknowledged are omitted from the payload. Hashes are recorded
+only after a successful POST: a payload that ends up in the outbox must
+not mark its entries as sent, so the next cycle sends them again. A full
+payload goes out every DELTA_FULL_RESEND_MINUTES.
+
+Runs SyncRunner.run() against an in-memory stand-in for the API; the
+delta state is a real delta_state.json in a temp directory.
+
+Run:
+    python tests/test_delta_payload.py
+"""
+
+import json
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import odbc_stub  # noqa: F401
+
+from src import BRT
+from src.payload import TurnoDetail, TurnoSnapshot, VendaSnapshot, build_payload
+from src.runner import SyncRunner
+from src.sender import SendResult
+from src.state import DeltaState, StateManager, WindowCalculator
+
+PASS = "✅ PASS"
+FAIL = "❌ FAIL"
+results: list[tuple[str, str, str]] = []
+
+
+def record(test_name: str, passed: bool, detail: str = ""):
+    status = PASS if passed else FAIL
+    results.append((test_name, status, detail))
+    print(f"  [{status}] {test_name}")
+    if detail and not passed:
+        print(f"         → {detail}")
+
+
+class API:
+    """HttpSender stand-in: records the posted turnos / snapshots; fails while `down`."""
+
+    def __init__(self):
+        self.down = False
+        self.posts: list[dict] = []
+        self.stats = SimpleNamespace(model_dump=dict)
+
+    def process_outbox(self) -> int:
+        return 0
+
+    def send(self, data: bytes, sync_id: str) -> SendResult:
+        body = json.loads(data)
+        self.posts.append({
+            "delta": body["integrity"]["delta"],
+            "turnos": sorted(t["id_turno"] for t in body["turnos"]),
+            "snapshot_turnos": sorted(t["id_turno"] for t in body["snapshot_turnos"]),
+            "snapshot_vendas": sorted(v["id_operacao"] for v in body["snapshot_vendas"]),
+        })
+        if self.down:
+            return SendResult(success=False, status_code=503, saved_to_outbox=True)
+        return SendResult(success=True, status_code=200)
+
+
+class Store:
+    """The turnos / snapshots the next payload is built from."""
+
+    def __init__(self):
+        self.turnos = {"A": Decimal("10.00"), "B": Decimal("20.00")}
+        self.snapshots = {"S1": Decimal("100.00")}
+        self.vendas = {1: Decimal("5.00"), 2: Decimal("7.50")}
+
+    def payload(self, dt_from: datetime, dt_to: datetime):
+        return build_payload(
+            store_id=1, store_name="Loja", store_alias="loja",
+            dt_from=dt_from, dt_to=dt_to, window_minutes=10,
+            turnos=[TurnoDetail(id_turno=k, fechado=False, total_vendas=v) for k, v in self.turnos.items()],
+            vendas=[], ops_ids=[1], sales_by_vendor=[], payments_by_method=[],
+            snapshot_turnos=[TurnoSnapshot(id_turno=k, total_vendas=v) for k, v in self.snapshots.items()],
+            snapshot_vendas=[VendaSnapshot(id_operacao=k, total_itens=v) for k, v in self.vendas.items()],
+        )
+
+
+def make_runner(tmp: Path, store: Store, api: API, full_resend_minutes: int = 60) -> SyncRunner:
+    settings = SimpleNamespace(catchup_chunk_minutes=60, change_probe=False)
+    state_manager = StateManager(tmp / "state.json")
+    db = SimpleNamespace(stats=SimpleNamespace(model_dump=dict))
+    runner = SyncRunner(
+        settings, db, None, db, None, api, state_manager,
+        WindowCalculator(state_manager, window_minutes=10),
+        delta_state=DeltaState(tmp / "delta_state.json", full_resend_minutes),
+    )
+    runner._build_payload = store.payload
+    return runner
+
+
+def post(api: API) -> dict:
+    return api.posts[-1]
+
+
+def test_01_only_changes_sent():
+    """Full first payload, then only new / changed entries"""
+    print("\n─── Test 1: unchanged entries omitted ───")
+    tmp = Path(tempfile.mkdtemp())
+    store, api = Store(), API()
+    runner = make_runner(tmp, store, api)
+
+    runner.run()
+    record("first payload is full", post(api) == {
+        "delta": False, "turnos": ["A", "B"], "snapshot_turnos": ["S1"], "snapshot_vendas": [1, 2]},
+        f"got: {post(api)}")
+
+    runner.run()
+    record("nothing changed: everything omitted", post(api) == {
+        "delta": True, "turnos": [], "snapshot_turnos": [], "snapshot_vendas": []},
+        f"got: {post(api)}")
+
+    store.turnos["B"] = Decimal("25.00")
+    store.vendas[3] = Decimal("1.00")
+    runner.run()
+    record("changed turno and new sale sent", post(api) == {
+        "delta": True, "turnos": ["B"], "snapshot_turnos": [], "snapshot_vendas": [3]},
+        f"got: {post(api)}")
+
+    restarted = make_runner(tmp, store, api)
+    restarted.run()
+    record("acknowledgements survive a restart", post(api)["delta"] and post(api)["turnos"] == [],
+           f"got: {post(api)}")
+
+
+def test_02_failed_send_not_acknowledged():
+    """Entries of a payload that went to the outbox are sent again"""
+    print("\n─── Test 2: failed send ───")
+    tmp = Path(tempfile.mkdtemp())
+    store, api = Store(), API()
+    runner = make_runner(tmp, store, api)
+    runner.run()
+    saved = (tmp / "delta_state.json").read_bytes()
+
+    store.turnos["A"] = Decimal("11.00")
+    api.down = True
+    ok = runner.run()
+    record("failed POST carried the change", not ok and post(api)["turnos"] == ["A"], f"got: {post(api)}")
+    record("delta state untouched", (tmp / "delta_state.json").read_bytes() == saved)
+
+    api.down = False
+    runner.run()
+    record("next cycle sends the change again", post(api)["turnos"] == ["A"], f"got: {post(api)}")
+    runner.run()
+    record("acknowledged once the POST succeeded", post(api)["turnos"] == [], f"got: {post(api)}")
+
+
+def test_03_full_resend():
+    """A full payload every full_resend_minutes; dropped entries forgotten"""
+    print("\n─── Test 3: full resend ───")
+    tmp = Path(tempfile.mkdtemp())
+    store, api = Store(), API()
+    runner = make_runner(tmp, store, api, full_resend_minutes=60)
+    runner.run()
+
+    runner.delta_state._full_sent_at = (datetime.now(BRT) - timedelta(minutes=61)).isoformat()
+    runner.run()
+    record("full resend due: everything sent", post(api) == {
+        "delta": False, "turnos": ["A", "B"], "snapshot_turnos": ["S1"], "snapshot_vendas": [1, 2]},
+        f"got: {post(api)}")
+    record("full resend time renewed", not runner.delta_state.needs_full_resend())
+
+    del store.turnos["B"]
+    runner.run()
+    store.turnos["B"] = Decimal("20.00")
+    runner.run()
+    record("entry that left the payload is sent again when it returns", post(api)["turnos"] == ["B"],
+           f"got: {post(api)}")
+
+
+def main():
+    print("=" * 64)
+    print("  Delta Payload Test Suite")
+    print("=" * 64)
+
+    test_01_only_changes_sent()
+    test_02_failed_send_not_acknowledged()
+    test_03_full_resend()
+
+    total = len(results)
+    failed = sum(1 for _, s, _ in results if s == FAIL)
+
+    print("\n" + "=" * 64)
+    if failed == 0:
+        print(f"  ✅ ALL {total} TESTS PASSED")
+    else:
+        print(f"  ❌ {failed} FAILED / {total} TOTAL")
+    print("=" * 64)
+
+    return 0 if failed == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
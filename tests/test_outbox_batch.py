@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Outbox Batch Drain Test Suite
+=============================
+Drains the outbox through a local stand-in for the API batch endpoint
+(http.server on 127.0.0.1) and checks that per-item results are mapped
+back to the outbox files: accepted → removed, 4xx → dead_letter,
+5xx → kept with the retry count bumped. A 4xx for the whole batch request
+(e.g. 404 from an endpoint that is not deployed) keeps every item and stops
+the drain, and the circuit breaker gates every batch.
+
+Run:
+    python tests/test_outbox_batch.py
+"""
+
+import gzip
+import json
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.sender import HttpSender
+
+PASS = "✅ PASS"
+FAIL = "❌ FAIL"
+results: list[tuple[str, str, str]] = []
+
+
+def record(test_name: str, passed: bool, detail: str = ""):
+    status = PASS if passed else FAIL
+    results.append((test_name, status, detail))
+    print(f"  [{status}] {test_name}")
+    if detail and not passed:
+        print(f"         → {detail}")
+
+
+class BatchAPI(BaseHTTPRequestHandler):
+    """
+    Stand-in for the API batch endpoint. Per item: sync_id "bad-*" → 422,
+    "err-*" → 500, anything else → 200. Set fail_all to answer 503,
+    reject_all to answer 422 or missing to answer 404 for the whole request.
+    """
+
+    protocol_version = "HTTP/1.1"
+    requests_seen: list[int] = []  # item count per batch request
+    fail_all = False
+    reject_all = False
+    missing = False
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        if self.headers.get("Content-Encoding") == "gzip":
+            body = gzip.decompress(body)
+        items = json.loads(body)["items"]
+        BatchAPI.requests_seen.append(len(items))
+
+        if BatchAPI.fail_all:
+            self._reply(503, {"error": "maintenance"})
+            return
+        if BatchAPI.reject_all:
+            self._reply(422, {"error": "unsupported schema_version"})
+            return
+        if BatchAPI.missing:
+            self._reply(404, {"error": f"no route for {self.path}"})
+            return
+
+        statuses = []
+        for item in items:
+            sync_id = item["integrity"]["sync_id"]
+            statuses.append({"status": 422 if sync_id.startswith("bad") else
+                             500 if sync_id.startswith("err") else 200})
+        self._reply(200, {"results": statuses})
+
+    def _reply(self, code: int, data: dict):
+        raw = json.dumps(data).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(raw)))
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_server() -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), BatchAPI)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def make_sender(server: ThreadingHTTPServer, **kwargs) -> HttpSender:
+    base = f"http://127.0.0.1:{server.server_port}"
+    outbox_dir = Path(tempfile.mkdtemp()) / "outbox"
+    return HttpSender(
+        f"{base}/sync", "token", 5, outbox_dir,
+        batch_endpoint=f"{base}/sync/batch", **kwargs,
+    )
+
+
+def fill_outbox(sender: HttpSender, sync_ids: list[str]) -> None:
+    for sync_id in sync_ids:
+        payload = {"integrity": {"sync_id": sync_id}, "vendas": [{"id_operacao": 1, "total": "9.90"}]}
+        sender.outbox.save(payload, sync_id)
+
+
+def test_01_drain_500_files():
+    """500 files drain in 5 requests of ≤100 items"""
+    print("\n─── Test 1: drain 500 outbox files ───")
+    server = start_server()
+    BatchAPI.requests_seen, BatchAPI.fail_all = [], False
+    sender = make_sender(server, batch_max_items=100, compression="gzip")
+    fill_outbox(sender, [f"ok-{i:04d}-{'x' * 12}" for i in range(500)])
+
+    sent = sender.process_outbox()
+
+    record("500 payloads accepted", sent == 500, f"got: {sent}")
+    record("5 batch requests", BatchAPI.requests_seen == [100] * 5, f"got: {BatchAPI.requests_seen}")
+    record("outbox empty", sender.outbox.list_pending() == [])
+    record("one keep-alive connection", sender.stats.connections == 1, f"got: {sender.stats}")
+    server.shutdown()
+
+
+def test_02_per_item_results():
+    """422 → dead_letter, 500 → kept with retry bumped, 200 → removed"""
+    print("\n─── Test 2: per-item results mapped back to files ───")
+    server = start_server()
+    BatchAPI.requests_seen, BatchAPI.fail_all = [], False
+    sender = make_sender(server, batch_max_items=10)
+    fill_outbox(sender, ["ok-1-xxxxxxxxxxxx", "bad-1-xxxxxxxxxxx", "err-1-xxxxxxxxxxx", "ok-2-xxxxxxxxxxxx"])
+
+    sent = sender.process_outbox()
+    remaining = sender.outbox.list_pending()
+    dead = list(sender.outbox.dead_letter_dir.glob("*.json"))
+    envelope = sender.outbox.load(remaining[0]) if remaining else {}
+
+    record("2 accepted", sent == 2, f"got: {sent}")
+    record("422 item in dead_letter", len(dead) == 1 and "bad-1" in dead[0].name,
+           f"got: {[p.name for p in dead]}")
+    record("500 item kept", len(remaining) == 1 and "err-1" in remaining[0].name,
+           f"got: {[p.name for p in remaining]}")
+    record("retry count bumped", envelope.get("_retry_count") == 1, f"got: {envelope.get('_retry_count')}")
+    server.shutdown()
+
+
+def test_03_byte_bound_and_failed_batch():
+    """Byte limit splits batches; a failed batch keeps its items and stops the drain"""
+    print("\n─── Test 3: byte bound + failed batch request ───")
+    server = start_server()
+    BatchAPI.requests_seen, BatchAPI.fail_all = [], False
+    sender = make_sender(server, batch_max_items=100, batch_max_bytes=1000)
+    fill_outbox(sender, [f"ok-{i:04d}-{'x' * 12}" for i in range(30)])
+    sender.process_outbox()
+    record("batches respect byte limit", len(BatchAPI.requests_seen) > 1 and max(BatchAPI.requests_seen) < 30,
+           f"got: {BatchAPI.requests_seen}")
+
+    BatchAPI.requests_seen, BatchAPI.fail_all = [], True
+    sender = make_sender(server, batch_max_items=10)
+    fill_outbox(sender, [f"ok-{i:04d}-{'x' * 12}" for i in range(25)])
+    sent = sender.process_outbox()
+    remaining = sender.outbox.list_pending()
+    bumped = sum(1 for p in remaining if sender.outbox.load(p)["_retry_count"] == 1)
+
+    record("nothing accepted", sent == 0, f"got: {sent}")
+    record("drain stops after first failed batch", BatchAPI.requests_seen == [10], f"got: {BatchAPI.requests_seen}")
+    record("all 25 files kept, 10 bumped", len(remaining) == 25 and bumped == 10,
+           f"got: {len(remaining)} kept / {bumped} bumped")
+    server.shutdown()
+
+
+def test_04_rejected_batch_and_breaker():
+    """4xx batch → items kept, drain stopped; the breaker gates each batch"""
+    print("\n─── Test 4: rejected batch + circuit breaker ───")
+    server = start_server()
+    BatchAPI.requests_seen, BatchAPI.fail_all, BatchAPI.reject_all = [], False, True
+    sender = make_sender(server, batch_max_items=10)
+    fill_outbox(sender, [f"ok-{i:04d}-{'x' * 12}" for i in range(25)])
+    sent = sender.process_outbox()
+    remaining = sender.outbox.list_pending()
+    untouched = all(sender.outbox.load(p).get("_retry_count", 0) == 0 for p in remaining)
+
+    record("422 batch: nothing dead-lettered, retry counts untouched",
+           sent == 0 and len(remaining) == 25 and untouched
+           and list(sender.outbox.dead_letter_dir.glob("*.json")) == [],
+           f"got: {sent} sent / {len(remaining)} pending")
+    record("drain stops after a rejected batch", BatchAPI.requests_seen == [10],
+           f"got: {BatchAPI.requests_seen}")
+    record("4xx does not open the circuit", sender.breaker.state == "closed")
+
+    BatchAPI.requests_seen, BatchAPI.reject_all, BatchAPI.missing = [], False, True
+    sender = make_sender(server, batch_max_items=10)
+    fill_outbox(sender, [f"ok-{i:04d}-{'x' * 12}" for i in range(25)])
+    sent = sender.process_outbox()
+    record("404 batch URL: all 25 kept, drain stopped",
+           sent == 0 and len(sender.outbox.list_pending()) == 25 and BatchAPI.requests_seen == [10]
+           and list(sender.outbox.dead_letter_dir.glob("*.json")) == [],
+           f"got: {sent} sent / {len(sender.outbox.list_pending())} pending / {BatchAPI.requests_seen}")
+    BatchAPI.missing = False
+    record("endpoint deployed: next drain sends everything", sender.process_outbox() == 25
+           and sender.outbox.list_pending() == [])
+
+    BatchAPI.requests_seen, BatchAPI.reject_all = [], False
+    sender = make_sender(server, batch_max_items=10, breaker_failures=1, breaker_cooldown_seconds=60)
+    fill_outbox(sender, [f"ok-{i:04d}-{'x' * 12}" for i in range(25)])
+    sender.breaker.record_failure()
+    pending = sender.outbox.list_pending()
+    record("open circuit: no batch sent", sender._process_outbox_batched(pending) == 0
+           and sender.process_outbox() == 0 and BatchAPI.requests_seen == [],
+           f"got: {BatchAPI.requests_seen}")
+
+    sender.breaker._opened_at -= 60
+    sent = sender.process_outbox()
+    record("after cooldown: trial batch closes the circuit and the drain completes",
+           sent == 25 and BatchAPI.requests_seen == [10, 10, 5] and sender.breaker.state == "closed",
+           f"got: {sent} sent / {BatchAPI.requests_seen} / {sender.breaker.state}")
+
+    BatchAPI.requests_seen, BatchAPI.fail_all = [], True
+    fill_outbox(sender, [f"ok-{i:04d}-{'y' * 12}" for i in range(25)])
+    sender.process_outbox()
+    record("503 batch opens the circuit; later batches not sent",
+           BatchAPI.requests_seen == [10] and sender.breaker.is_open(),
+           f"got: {BatchAPI.requests_seen} / {sender.breaker.state}")
+    sender.breaker._opened_at -= 60
+    sender.process_outbox()
+    record("failed trial batch re-opens the circuit",
+           BatchAPI.requests_seen == [10, 10] and sender.breaker.is_open(),
+           f"got: {BatchAPI.requests_seen} / {sender.breaker.state}")
+    BatchAPI.fail_all = False
+    server.shutdown()
+
+
+def main():
+    print("=" * 64)
+    print("  Outbox Batch Drain Test Suite")
+    print("=" * 64)
+
+    test_01_drain_500_files()
+    test_02_per_item_results()
+    test_03_byte_bound_and_failed_batch()
+    test_04_rejected_batch_and_breaker()
+
+    total = len(results)
+    failed = sum(1 for _, s, _ in results if s == FAIL)
+
+    print("\n" + "=" * 64)
+    if failed == 0:
+        print(f"  ✅ ALL {total} TESTS PASSED")
+    else:
+        print(f"  ❌ {failed} FAILED / {total} TOTAL")
+    print("=" * 64)
+
+    return 0 if failed == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Outbox Drain Test Suite
+=======================
+Drains the outbox one payload per POST through a local stand-in for the
+API (http.server on 127.0.0.1) under each OUTBOX_ORDERING policy and
+checks the circuit breaker:
+  strict    → creation order, stops at the first retryable failure, reads
+              no payload past it
+  by_window → overlapping windows stay in window order (per chain), a
+              failure stops only its own chain
+  unordered → payloads go out concurrently on the worker threads
+
+Run:
+    python tests/test_outbox_drain.py
+"""
+
+import json
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.sender import CircuitBreaker, HttpSender
+
+PASS = "✅ PASS"
+FAIL = "❌ FAIL"
+results: list[tuple[str, str, str]] = []
+
+
+def record(test_name: str, passed: bool, detail: str = ""):
+    status = PASS if passed else FAIL
+    results.append((test_name, status, detail))
+    print(f"  [{status}] {test_name}")
+    if detail and not passed:
+        print(f"         → {detail}")
+
+
+class SyncAPI(BaseHTTPRequestHandler):
+    """
+    Stand-in for the API sync endpoint: sync_id "*-err" → 503, anything
+    else → 200. Records the arrival order and the peak number of requests
+    in flight; each request takes `delay` seconds.
+    """
+
+    protocol_version = "HTTP/1.1"
+    seen: list[str] = []
+    delay = 0.0
+    in_flight = 0
+    peak = 0
+    lock = threading.Lock()
+
+    @classmethod
+    def reset(cls, delay: float = 0.0):
+        cls.seen, cls.delay, cls.in_flight, cls.peak = [], delay, 0, 0
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        sync_id = body["integrity"]["sync_id"]
+        with SyncAPI.lock:
+            SyncAPI.seen.append(sync_id)
+            SyncAPI.in_flight += 1
+            SyncAPI.peak = max(SyncAPI.peak, SyncAPI.in_flight)
+        time.sleep(SyncAPI.delay)
+        with SyncAPI.lock:
+            SyncAPI.in_flight -= 1
+
+        code = 503 if sync_id.endswith("err") else 200
+        raw = json.dumps({"ok": code == 200}).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(raw)))
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_server() -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SyncAPI)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def make_sender(server: ThreadingHTTPServer, **kwargs) -> HttpSender:
+    outbox_dir = Path(tempfile.mkdtemp()) / "outbox"
+    return HttpSender(f"http://127.0.0.1:{server.server_port}/sync", "token", 5, outbox_dir, **kwargs)
+
+
+def fill_outbox(sender: HttpSender, entries: list[tuple[str, str, str]]) -> None:
+    """entries: (sync_id, window from, window to); sync_ids sort in creation order."""
+    for sync_id, start, end in entries:
+        payload = {
+            "window": {"from": f"2026-03-02T{start}:00-03:00", "to": f"2026-03-02T{end}:00-03:00"},
+            "integrity": {"sync_id": sync_id},
+        }
+        sender.outbox.save(payload, sync_id)
+
+
+def count_loads(sender: HttpSender) -> list[int]:
+    """Wrap outbox.load_raw; returns a one-element list holding the call count."""
+    calls = [0]
+    load_raw = sender.outbox.load_raw
+
+    def counting(key):
+        calls[0] += 1
+        return load_raw(key)
+
+    sender.outbox.load_raw = counting
+    return calls
+
+
+def pending_ids(sender: HttpSender) -> list[str]:
+    return [sender.outbox.load(p)["_sync_id"] for p in sender.outbox.list_pending()]
+
+
+def test_01_strict():
+    """Creation order; stops at the first failure without reading the rest"""
+    print("\n─── Test 1: strict ordering ───")
+    server = start_server()
+    SyncAPI.reset()
+    sender = make_sender(server)
+    fill_outbox(sender, [(f"{i}-{'err' if i == 2 else 'ok'}", "10:00", "10:10") for i in range(6)])
+    loads = count_loads(sender)
+
+    sent = sender.process_outbox()
+    reads = loads[0]
+
+    record("sent in creation order up to the failure", SyncAPI.seen == ["0-ok", "1-ok", "2-err"],
+           f"got: {SyncAPI.seen}")
+    record("2 sent", sent == 2, f"got: {sent}")
+    record("failed + later payloads kept", pending_ids(sender) == ["2-err", "3-ok", "4-ok", "5-ok"],
+           f"got: {pending_ids(sender)}")
+    record("payloads after the failure never read", reads == 3, f"load_raw calls: {reads}")
+    server.shutdown()
+
+
+def test_02_by_window():
+    """Overlapping windows drain in window order; a failure stops only its chain"""
+    print("\n─── Test 2: by_window ordering ───")
+    server = start_server()
+    SyncAPI.reset(delay=0.02)
+    sender = make_sender(server, workers=4, ordering="by_window")
+    # Chain A (overlapping, saved out of window order), chain B (disjoint, fails midway)
+    fill_outbox(sender, [
+        ("a3-ok", "10:20", "10:30"), ("a1-ok", "10:00", "10:12"), ("a2-ok", "10:10", "10:22"),
+        ("b1-ok", "12:00", "12:10"), ("b2-err", "12:05", "12:15"), ("b3-ok", "12:10", "12:20"),
+    ])
+
+    sent = sender.process_outbox()
+    chain_a = [s for s in SyncAPI.seen if s.startswith("a")]
+    chain_b = [s for s in SyncAPI.seen if s.startswith("b")]
+
+    record("chain A sent in window order", chain_a == ["a1-ok", "a2-ok", "a3-ok"], f"got: {chain_a}")
+    record("chain B stops at its failure", chain_b == ["b1-ok", "b2-err"], f"got: {chain_b}")
+    record("4 sent, failed chain tail kept", sent == 4 and sorted(pending_ids(sender)) == ["b2-err", "b3-ok"],
+           f"got: {sent} / {pending_ids(sender)}")
+    record("chains drained concurrently", SyncAPI.peak == 2, f"peak in flight: {SyncAPI.peak}")
+    server.shutdown()
+
+
+def test_03_unordered():
+    """Every payload independently, in parallel on the worker threads"""
+    print("\n─── Test 3: unordered ordering ───")
+    server = start_server()
+    SyncAPI.reset(delay=0.2)
+    sender = make_sender(server, workers=4, ordering="unordered")
+    fill_outbox(sender, [(f"{i}-{'err' if i == 0 else 'ok'}", "10:00", "10:10") for i in range(8)])
+
+    started = time.perf_counter()
+    sent = sender.process_outbox()
+    elapsed = time.perf_counter() - started
+
+    record("failure does not stop the others", sent == 7 and pending_ids(sender) == ["0-err"],
+           f"got: {sent} / {pending_ids(sender)}")
+    record("4 requests in flight at once", SyncAPI.peak == 4, f"peak: {SyncAPI.peak}")
+    record("faster than one at a time", elapsed < 8 * 0.2 * 0.75, f"took {elapsed:.2f}s")
+    server.shutdown()
+
+
+def test_04_circuit_breaker():
+    """closed → open → half-open trial → closed / re-opened"""
+    print("\n─── Test 4: circuit breaker ───")
+    breaker = CircuitBreaker(failure_threshold=2, cooldown_seconds=60)
+    breaker.record_failure()
+    record("below threshold stays closed", breaker.allow() and breaker.state == "closed")
+    breaker.record_failure()
+    record("threshold reached → open, requests refused", breaker.state == "open" and not breaker.allow())
+
+    breaker._opened_at -= 60
+    record("is_open() after cooldown does not start the trial",
+           not breaker.is_open() and breaker.state == "open")
+    record("one trial request in half-open", breaker.allow() and not breaker.allow()
+           and breaker.state == "half-open")
+    breaker.record_failure()
+    record("failed trial re-opens", breaker.state == "open" and breaker.is_open())
+    breaker._opened_at -= 60
+    breaker.allow()
+    breaker.record_success()
+    record("successful trial closes", breaker.state == "closed" and breaker.allow())
+
+    server = start_server()
+    SyncAPI.reset()
+    sender = make_sender(server, breaker_failures=1, breaker_cooldown_seconds=60)
+    fill_outbox(sender, [("0-err", "10:00", "10:10"), ("1-ok", "10:10", "10:20")])
+    sender.process_outbox()
+    result = sender.send({"integrity": {"sync_id": "2-ok"}}, "2-ok")
+    record("open circuit: send() goes straight to the outbox",
+           result.saved_to_outbox and SyncAPI.seen == ["0-err"], f"got: {SyncAPI.seen}")
+    record("open circuit: outbox drain sends nothing",
+           sender.process_outbox() == 0 and SyncAPI.seen == ["0-err"], f"got: {SyncAPI.seen}")
+
+    sender.breaker._opened_at -= 60
+    sender.process_outbox()
+    record("after cooldown the drain sends the trial", SyncAPI.seen == ["0-err", "0-err"],
+           f"got: {SyncAPI.seen}")
+    server.shutdown()
+
+
+def main():
+    print("=" * 64)
+    print("  Outbox Drain Test Suite")
+    print("=" * 64)
+
+    test_01_strict()
+    test_02_by_window()
+    test_03_unordered()
+    test_04_circuit_breaker()
+
+    total = len(results)
+    failed = sum(1 for _, s, _ in results if s == FAIL)
+
+    print("\n" + "=" * 64)
+    if failed == 0:
+        print(f"  ✅ ALL {total} TESTS PASSED")
+    else:
+        print(f"  ❌ {failed} FAILED / {total} TOTAL")
+    print("=" * 64)
+
+    return 0 if failed == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+SQLite Outbox Store Test Suite
+==============================
+SqliteOutboxStore must behave like the file OutboxManager (same envelope,
+retry, dead_letter and TTL semantics) and import an existing outbox
+directory on first open, keeping each imported file (*.migrated) until its
+row is sent so the file store can take the undrained queue back. Dead letters are
+pruned after DEAD_LETTER_RETENTION_DAYS.
+
+Run:
+    python tests/test_outbox_sqlite.py
+"""
+
+import json
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.outbox_sqlite import DEAD_LETTER_RETENTION_DAYS, SqliteOutboxStore
+from src.sender import OUTBOX_TTL_DAYS, OutboxManager, create_outbox_store
+
+PASS = "✅ PASS"
+FAIL = "❌ FAIL"
+results: list[tuple[str, str, str]] = []
+
+
+def record(test_name: str, passed: bool, detail: str = ""):
+    status = PASS if passed else FAIL
+    results.append((test_name, status, detail))
+    print(f"  [{status}] {test_name}")
+    if detail and not passed:
+        print(f"         → {detail}")
+
+
+def payload(n: int) -> dict:
+    return {"integrity": {"sync_id": f"sync-{n:04d}-xxxxxxxx"}, "ops": {"count": n}}
+
+
+def test_01_migration_from_files():
+    """Pending JSON files (new and old format) are imported in order and set aside"""
+    print("\n─── Test 1: migration from the file outbox ───")
+    outbox_dir = Path(tempfile.mkdtemp()) / "outbox"
+    files = OutboxManager(outbox_dir)
+    for n in range(3):
+        files.save(payload(n), payload(n)["integrity"]["sync_id"])
+    retried = sorted(outbox_dir.glob("*.json"))[1]
+    files.increment_retry(retried, files.load(retried))
+    (outbox_dir / "zz_old_format.json").write_text(json.dumps(payload(9)), encoding="utf-8")
+
+    store = SqliteOutboxStore(outbox_dir, ttl_days=OUTBOX_TTL_DAYS)
+    keys = store.list_pending()
+    envelopes = [store.load(k) for k in keys]
+
+    record("4 entries imported", len(keys) == 4, f"got: {len(keys)}")
+    record("JSON files set aside as *.migrated", list(outbox_dir.glob("*.json")) == []
+           and len(list(outbox_dir.glob("*.json.migrated"))) == 4
+           and len(list(outbox_dir.glob("*.retry.migrated"))) == 1)
+    record("file order kept", [e["payload"]["ops"]["count"] for e in envelopes] == [0, 1, 2, 9],
+           f"got: {[e['payload']['ops']['count'] for e in envelopes]}")
+    record("retry count carried over", [e["_retry_count"] for e in envelopes] == [0, 1, 0, 0],
+           f"got: {[e['_retry_count'] for e in envelopes]}")
+
+
+def test_02_retry_dead_letter_ttl():
+    """Retry bump, dead_letter and TTL expiry work on rows"""
+    print("\n─── Test 2: retry / dead_letter / TTL ───")
+    store = SqliteOutboxStore(Path(tempfile.mkdtemp()) / "outbox", ttl_days=OUTBOX_TTL_DAYS)
+    for n in range(4):
+        store.save(payload(n), payload(n)["integrity"]["sync_id"])
+    keys = store.list_pending()
+
+    envelope = store.load(keys[0])
+    record("increment_retry returns new count", store.increment_retry(keys[0], envelope) == 1)
+    record("retry persisted", store.load(keys[0])["_retry_count"] == 1)
+    record("payload intact after retry", store.load(keys[0])["payload"] == payload(0))
+
+    store._move_to_dead_letter(keys[1], reason="http_422")
+    store.remove(keys[2])
+    with store._lock:
+        store._conn.execute("UPDATE outbox SET created_at = 0 WHERE id = ?", (keys[3],))
+
+    remaining = store.list_pending()
+    record("only the retried entry stays pending", remaining == [keys[0]], f"got: {remaining}")
+    record("dead_letter + expired counted as dead", store.count("dead") == 2, f"got: {store.count('dead')}")
+
+
+def test_03_rollback_to_files():
+    """Undrained imported files go back to the file store; sent ones are deleted"""
+    print("\n─── Test 3: *.migrated files ───")
+    outbox_dir = Path(tempfile.mkdtemp()) / "outbox"
+    files = OutboxManager(outbox_dir)
+    for n in range(3):
+        files.save(payload(n), payload(n)["integrity"]["sync_id"])
+    retried = sorted(outbox_dir.glob("*.json"))[0]
+    files.increment_retry(retried, files.load(retried))
+
+    store = SqliteOutboxStore(outbox_dir, ttl_days=OUTBOX_TTL_DAYS)
+    keys = store.list_pending()
+    store.remove(keys[2])
+    record("sent row: its *.migrated file deleted",
+           len(list(outbox_dir.glob("*.json.migrated"))) == 2)
+    store.close()
+
+    restored = create_outbox_store("files", outbox_dir)
+    pending = restored.list_pending()
+    record("file store takes back the undrained queue", len(pending) == 2, f"got: {len(pending)}")
+    record("retry sidecar restored too", restored.load(pending[0])["_retry_count"] == 1)
+
+    store = SqliteOutboxStore(outbox_dir, ttl_days=OUTBOX_TTL_DAYS)
+    keys = store.list_pending()
+    record("re-import does not duplicate pending rows", len(keys) == 2, f"got: {len(keys)}")
+    store.remove(keys[0])
+    store._move_to_dead_letter(keys[1], reason="http_422")
+    store.list_pending()
+    record("sent / dead-lettered: no *.migrated file left", list(outbox_dir.iterdir()) == [],
+           f"left: {[p.name for p in outbox_dir.iterdir()]}")
+
+
+def test_04_prune_dead_letters():
+    """Dead letters are deleted DEAD_LETTER_RETENTION_DAYS after they died"""
+    print("\n─── Test 4: dead letter pruning ───")
+    outbox_dir = Path(tempfile.mkdtemp()) / "outbox"
+    db_path = outbox_dir.parent / "outbox.sqlite3"
+    legacy = sqlite3.connect(db_path)
+    legacy.executescript("""
+        CREATE TABLE outbox (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, sync_id TEXT NOT NULL,
+            created_at REAL NOT NULL, retry_count INTEGER NOT NULL DEFAULT 0,
+            last_retry REAL, status TEXT NOT NULL DEFAULT 'pending', reason TEXT,
+            status_code INTEGER, payload BLOB NOT NULL
+        );
+        INSERT INTO outbox (sync_id, created_at, status, reason, payload)
+        VALUES ('legacy-old', 0, 'dead', 'http_422', '{}');
+    """)
+    legacy.commit()
+    legacy.close()
+
+    store = SqliteOutboxStore(outbox_dir, ttl_days=OUTBOX_TTL_DAYS)
+    record("dead_at column added to an existing database", store.count("dead") == 1)
+
+    store.save_dead_letter(payload(1), "recent-dead", reason="http_422", status_code=422)
+    store.save(payload(2), "expires-now")
+    with store._lock:
+        store._conn.execute("UPDATE outbox SET created_at = 0 WHERE sync_id = 'expires-now'")
+    store.list_pending()
+    with store._lock:
+        dead = [row[0] for row in store._conn.execute(
+            "SELECT sync_id FROM outbox WHERE status = 'dead' ORDER BY id")]
+    record("old dead letter pruned, recent and just-expired kept",
+           dead == ["recent-dead", "expires-now"], f"got: {dead}")
+
+    with store._lock:
+        store._conn.execute(
+            "UPDATE outbox SET dead_at = ? WHERE sync_id = 'expires-now'",
+            (time.time() - DEAD_LETTER_RETENTION_DAYS * 86400 - 1,),
+        )
+    record("prune() returns deleted rows", store.prune() == 1 and store.count("dead") == 1)
+
+
+def main():
+    print("=" * 64)
+    print("  SQLite Outbox Store Test Suite")
+    print("=" * 64)
+
+    test_01_migration_from_files()
+    test_02_retry_dead_letter_ttl()
+    test_03_rollback_to_files()
+    test_04_prune_dead_letters()
+
+    total = len(results)
+    failed = sum(1 for _, s, _ in results if s == FAIL)
+
+    print("\n" + "=" * 64)
+    if failed == 0:
+        print(f"  ✅ ALL {total} TESTS PASSED")
+    else:
+        print(f"  ❌ {failed} FAILED / {total} TOTAL")
+    print("=" * 64)
+
+    return 0 if failed == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
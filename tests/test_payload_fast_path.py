@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Payload Fast Path Test Suite
+============================
+The fast path (plain sale records from SaleDetailsBuilder.build_records,
+serialized by SyncPayload.to_json_bytes) must produce byte-identical JSON to
+the validated pydantic models, and both must match the golden file
+tests/golden/payload_fast_path.json. model_dump / model_dump_json of a
+fast-path payload must carry the same vendas as the validated one.
+
+Run:
+    python tests/test_payload_fast_path.py
+    python tests/test_payload_fast_path.py --update   # rewrite the golden file
+"""
+
+import json
+import sys
+from datetime import datetime, timezone
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.payload import AgentInfo, SaleDetail, SaleDetailsBuilder, SyncPayload, build_payload
+from src import BRT
+
+GOLDEN = Path(__file__).resolve().parent / "golden" / "payload_fast_path.json"
+
+PASS = "✅ PASS"
+FAIL = "❌ FAIL"
+results: list[tuple[str, str, str]] = []
+
+
+def record(test_name: str, passed: bool, detail: str = ""):
+    status = PASS if passed else FAIL
+    results.append((test_name, status, detail))
+    print(f"  [{status}] {test_name}")
+    if detail and not passed:
+        print(f"         → {detail}")
+
+
+TURNO = "656335C4-D6C4-455A-8E3D-FF6B3F570C64"
+
+# Edge cases: naive / UTC / microsecond datetimes, item without vendor,
+# quotes and accents in names, NULL numerics, payment rows before items and
+# a payment for an operation without items (dropped)
+SALE_ITEMS = [
+    {"id_operacao": 101, "id_turno": TURNO, "data_hora_termino": datetime(2026, 3, 2, 9, 15, 0, 250000),
+     "line_id": 10101, "line_no": 1, "id_produto": 42, "codigo_barras": "7891000100103",
+     "nome_produto": 'Café "Especial" 500g', "qtd": Decimal("2.000"), "preco_unit": Decimal("18.45"),
+     "total_item": Decimal("36.90"), "desconto_item": Decimal("0.00"),
+     "id_usuario_vendedor": 92, "nome_vendedor": "Vitória", "login_vendedor": "vitoria"},
+    {"id_operacao": 101, "id_turno": TURNO, "data_hora_termino": datetime(2026, 3, 2, 9, 15, 0, 250000),
+     "line_id": 10102, "line_no": 2, "id_produto": 7, "codigo_barras": None,
+     "nome_produto": "Pão de queijo", "qtd": None, "preco_unit": Decimal("4.5"),
+     "total_item": Decimal("4.5"), "desconto_item": None,
+     "id_usuario_vendedor": None, "nome_vendedor": None, "login_vendedor": None},
+    {"id_operacao": 100, "id_turno": None, "data_hora_termino": datetime(2026, 3, 2, 12, 0, tzinfo=timezone.utc),
+     "line_id": 10001, "line_no": 1, "id_produto": 99, "codigo_barras": "0001",
+     "nome_produto": "Sacola", "qtd": Decimal("1"), "preco_unit": Decimal("0.10"),
+     "total_item": Decimal("0.10"), "desconto_item": Decimal("0.05"),
+     "id_usuario_vendedor": 7, "nome_vendedor": "Ana", "login_vendedor": "ana"},
+    {"id_operacao": 102, "id_turno": TURNO, "data_hora_termino": None,
+     "line_id": 10201, "line_no": 1, "id_produto": 5, "codigo_barras": "5",
+     "nome_produto": "Item\tcom\ncontrole", "qtd": Decimal("1.5"), "preco_unit": Decimal("1E+1"),
+     "total_item": Decimal("15"), "desconto_item": Decimal("0"),
+     "id_usuario_vendedor": 7, "nome_vendedor": "Ana", "login_vendedor": "ana"},
+]
+
+SALE_PAYMENTS = [
+    {"id_operacao": 101, "line_id": 501, "id_finalizador": 1, "meio_pagamento": "Dinheiro",
+     "valor": Decimal("50.00"), "valor_troco": Decimal("8.60"), "parcela": None},
+    {"id_operacao": 100, "line_id": 500, "id_finalizador": 3, "meio_pagamento": "Cartão Crédito",
+     "valor": Decimal("0.05"), "valor_troco": None, "parcela": 1},
+    {"id_operacao": 999, "line_id": 599, "id_finalizador": 1, "meio_pagamento": "Dinheiro",
+     "valor": Decimal("1.00"), "valor_troco": Decimal("0"), "parcela": None},
+]
+
+
+def make_payload(validate: bool, items: list[dict] = SALE_ITEMS) -> SyncPayload:
+    """Payload built through the validated (models) or fast (records) path."""
+    builder = SaleDetailsBuilder("HIPER_CAIXA")
+    builder.add_payments(SALE_PAYMENTS)
+    builder.add_items(items)
+    vendas = builder.build() if validate else builder.build_records()
+
+    dt_from = datetime(2026, 3, 2, 9, 0, tzinfo=BRT)
+    dt_to = datetime(2026, 3, 2, 9, 10, tzinfo=BRT)
+    payload = build_payload(
+        store_id=10, store_name="Loja Centro", store_alias="centro",
+        dt_from=dt_from, dt_to=dt_to, window_minutes=10,
+        turnos=[], vendas=vendas, ops_ids=[100, 101, 102],
+        sales_by_vendor=[], payments_by_method=[],
+    )
+    payload.agent = AgentInfo(version="golden", machine="golden", sent_at=dt_to)
+    return payload
+
+
+def payload_json(validate: bool, items: list[dict] = SALE_ITEMS) -> bytes:
+    """Payload bytes through the validated (models) or fast (records) path."""
+    return make_payload(validate, items).to_json_bytes()
+
+
+def test_01_fast_path_matches_models():
+    """Records path serializes byte-identically to the validated models"""
+    print("\n─── Test 1: records vs validated models ───")
+    fast, validated = payload_json(validate=False), payload_json(validate=True)
+    vendas = json.loads(fast)["vendas"]
+
+    record("byte-identical JSON", fast == validated,
+           f"first difference at byte {next((i for i, (a, b) in enumerate(zip(fast, validated)) if a != b), -1)}")
+    record("3 sales, ordered by id_operacao", [v["id_operacao"] for v in vendas] == [100, 101, 102],
+           f"got: {[v['id_operacao'] for v in vendas]}")
+    record("sales parse back into SaleDetail", all(SaleDetail.model_validate(v) for v in vendas))
+    record("operation without items dropped", b'"id_operacao":999' not in fast)
+
+
+def test_02_golden_file():
+    """Both paths match the committed golden file"""
+    print("\n─── Test 2: golden file ───")
+    golden = GOLDEN.read_bytes()
+    record("fast path == golden", payload_json(validate=False) == golden)
+    record("validated path == golden", payload_json(validate=True) == golden)
+
+
+def test_03_no_sales():
+    """Without sales the payload is the plain model dump"""
+    print("\n─── Test 3: no sales ───")
+    fast, validated = payload_json(validate=False, items=[]), payload_json(validate=True, items=[])
+    record("empty vendas identical", fast == validated and b'"vendas":[]' in fast)
+
+
+def test_04_model_dumps():
+    """model_dump / model_dump_json see the fast-path records as vendas"""
+    print("\n─── Test 4: model_dump consumers ───")
+    fast, validated = make_payload(validate=False), make_payload(validate=True)
+
+    record("model_dump_json identical", fast.model_dump_json(by_alias=True)
+           == validated.model_dump_json(by_alias=True))
+    record("model_dump_json(indent=2) identical", fast.model_dump_json(indent=2)
+           == validated.model_dump_json(indent=2))
+    record("model_dump(mode='json') identical", fast.model_dump(mode="json", by_alias=True)
+           == validated.model_dump(mode="json", by_alias=True))
+    dumped = fast.model_dump()
+    record("model_dump() has the 3 sales", [v["id_operacao"] for v in dumped["vendas"]] == [100, 101, 102],
+           f"got: {dumped['vendas']}")
+    record("exclude={'vendas'} still honoured", "vendas" not in fast.model_dump(exclude={"vendas"}))
+
+
+def main():
+    if "--update" in sys.argv:
+        GOLDEN.parent.mkdir(exist_ok=True)
+        GOLDEN.write_bytes(payload_json(validate=True))
+        print(f"Golden file written: {GOLDEN}")
+        return 0
+
+    print("=" * 64)
+    print("  Payload Fast Path Test Suite")
+    print("=" * 64)
+
+    test_01_fast_path_matches_models()
+    test_02_golden_file()
+    test_03_no_sales()
+    test_04_model_dumps()
+
+    total = len(results)
+    failed = sum(1 for _, s, _ in results if s == FAIL)
+
+    print("\n" + "=" * 64)
+    if failed == 0:
+        print(f"  ✅ ALL {total} TESTS PASSED")
+    else:
+        print(f"  ❌ {failed} FAILED / {total} TOTAL")
+    print("=" * 64)
+
+    return 0 if failed == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
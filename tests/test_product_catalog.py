@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Product Catalog Test Suite
+==========================
+ProductCatalog replaces the JOIN dbo.produto of the sale item queries: sale
+details built from id-only rows plus the catalog must match the ones built
+from joined rows, only unknown / expired ids may reach the database, and
+the SQLite cache must survive a restart.
+
+Run:
+    python tests/test_product_catalog.py
+"""
+
+import sys
+import tempfile
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.catalog import ProductCatalog, create_product_catalog
+from src.payload import SaleDetailsBuilder, dump_records
+
+PASS = "✅ PASS"
+FAIL = "❌ FAIL"
+results: list[tuple[str, str, str]] = []
+
+
+def record(test_name: str, passed: bool, detail: str = ""):
+    status = PASS if passed else FAIL
+    results.append((test_name, status, detail))
+    print(f"  [{status}] {test_name}")
+    if detail and not passed:
+        print(f"         → {detail}")
+
+
+PRODUCTS = {1: "Café 500g", 2: 'Pão "francês"', 3: "Sacola", 4: None}
+
+
+class Loader:
+    """get_product_names stand-in: records the requested ids."""
+
+    def __init__(self, products: dict[int, str]):
+        self.products = products
+        self.requests: list[list[int]] = []
+        self.fail = False
+
+    def __call__(self, ids: list[int]) -> list[dict]:
+        self.requests.append(sorted(ids))
+        if self.fail:
+            raise RuntimeError("connection lost")
+        return [{"id_produto": i, "nome": self.products[i]} for i in ids if i in self.products]
+
+
+def joined_rows() -> list[dict]:
+    """Item rows as the old JOIN dbo.produto returned them."""
+    rows = []
+    for n, id_produto in enumerate([1, 2, 1, 3, 4, 2]):
+        rows.append({
+            "id_operacao": 100 + n // 2, "id_turno": None,
+            "data_hora_termino": datetime(2026, 3, 2, 9, n), "line_id": n, "line_no": n % 2 + 1,
+            "id_produto": id_produto, "codigo_barras": str(id_produto),
+            "nome_produto": PRODUCTS[id_produto], "qtd": Decimal("1"),
+            "preco_unit": Decimal("2.50"), "total_item": Decimal("2.50"),
+            "desconto_item": Decimal("0"), "id_usuario_vendedor": None,
+        })
+    return rows
+
+
+def id_only_rows() -> list[dict]:
+    """The same rows as the item queries return them now."""
+    return [{k: v for k, v in row.items() if k != "nome_produto"} for row in joined_rows()]
+
+
+def build(rows: list[dict], products: ProductCatalog = None, validate: bool = False):
+    builder = SaleDetailsBuilder("HIPER_CAIXA", products=products)
+    builder.add_items(rows)
+    return builder.build() if validate else builder.build_records()
+
+
+def test_01_same_payload_as_join():
+    """Id-only rows + catalog == joined rows"""
+    print("\n─── Test 1: catalog vs JOIN ───")
+    loader = Loader(PRODUCTS)
+    catalog = ProductCatalog(loader)
+
+    record("records JSON identical",
+           dump_records(build(id_only_rows(), catalog)) == dump_records(build(joined_rows())))
+    record("validated models identical",
+           build(id_only_rows(), catalog, validate=True) == build(joined_rows(), validate=True))
+    record("one lookup for the window's distinct ids", loader.requests == [[1, 2, 3, 4]],
+           f"requests: {loader.requests}")
+
+
+def test_02_lazy_fetch():
+    """Only unknown and expired ids are fetched"""
+    print("\n─── Test 2: lazy fetch / TTL ───")
+    loader = Loader({**PRODUCTS, 5: "Novo"})
+    catalog = ProductCatalog(loader, ttl_minutes=60)
+    catalog.names([1, 2])
+    names = catalog.names([1, 2, 5, 99])
+
+    record("known ids not refetched", loader.requests == [[1, 2], [5, 99]],
+           f"requests: {loader.requests}")
+    record("missing product cached as None", names[99] is None and catalog.names([99]) == {99: None}
+           and len(loader.requests) == 2)
+
+    catalog._fetched_at[1] -= 3601
+    loader.products[1] = "Café 1kg"
+    record("expired entry refetched", catalog.names([1, 2]) == {1: "Café 1kg", 2: PRODUCTS[2]}
+           and loader.requests[-1] == [1], f"requests: {loader.requests}")
+
+
+def test_03_sqlite_persistence():
+    """A new catalog on the same file starts warm; sources are separate"""
+    print("\n─── Test 3: SQLite cache ───")
+    state_file = Path(tempfile.mkdtemp()) / "state.json"
+    first = create_product_catalog(Loader(PRODUCTS), state_file=state_file, label="PDV")
+    first.names([1, 2, 3])
+    first.close()
+
+    loader = Loader(PRODUCTS)
+    restarted = create_product_catalog(loader, state_file=state_file, label="PDV")
+    record("names served from products.sqlite3", restarted.names([1, 2, 3]) == {
+        1: PRODUCTS[1], 2: PRODUCTS[2], 3: PRODUCTS[3]} and loader.requests == [],
+        f"requests: {loader.requests}")
+
+    gestao_loader = Loader(PRODUCTS)
+    gestao = create_product_catalog(gestao_loader, state_file=state_file, label="Gestão")
+    gestao.names([1])
+    record("Gestão source not shared with PDV", gestao_loader.requests == [[1]])
+
+    memory = create_product_catalog(Loader(PRODUCTS))
+    memory.names([1])
+    record("no state file: memory only", memory.cache_file is None)
+
+    broken = Path(tempfile.mkdtemp()) / "products.sqlite3"
+    broken.write_bytes(b"not a database" * 100)
+    corrupt = ProductCatalog(Loader(PRODUCTS), cache_file=broken)
+    record("corrupt file: falls back to memory", corrupt.names([3]) == {3: "Sacola"})
+    for catalog in (restarted, gestao):
+        catalog.close()
+
+
+def test_04_failures():
+    """A failed refresh keeps stale names; unknown ids make it raise"""
+    print("\n─── Test 4: failures ───")
+    loader = Loader(PRODUCTS)
+    catalog = ProductCatalog(loader)
+    catalog.names([1])
+    loader.fail = True
+    catalog._fetched_at[1] = 0
+    record("stale name kept", catalog.names([1]) == {1: PRODUCTS[1]})
+
+    try:
+        catalog.names([1, 2])
+        raised = False
+    except RuntimeError:
+        raised = True
+    record("unknown id error propagates", raised)
+
+
+def main():
+    print("=" * 64)
+    print("  Product Catalog Test Suite")
+    print("=" * 64)
+
+    test_01_same_payload_as_join()
+    test_02_lazy_fetch()
+    test_03_sqlite_persistence()
+    test_04_failures()
+
+    total = len(results)
+    failed = sum(1 for _, s, _ in results if s == FAIL)
+
+    print("\n" + "=" * 64)
+    if failed == 0:
+        print(f"  ✅ ALL {total} TESTS PASSED")
+    else:
+        print(f"  ❌ {failed} FAILED / {total} TOTAL")
+    print("=" * 64)
+
+    return 0 if failed == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Resumo Aggregation Test Suite
+=============================
+Checks that ResumoAggregator rebuilds resumo.by_vendor / resumo.by_payment
+from sale detail rows exactly like the SQL aggregate queries, that the
+consistency checker flags divergences, that the streaming
+SaleDetailsBuilder produces the same sales and aggregates, and that
+payments whose finalizador has no finalizador_pdv row are kept.
+
+Run:
+    python tests/test_resumo_aggregation.py
+"""
+
+import re
+import sys
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import odbc_stub  # noqa: F401  (src.queries imports pyodbc)
+from src.payload import (
+    ResumoAggregator,
+    SaleDetailsBuilder,
+    build_payload,
+    build_sale_details,
+    check_resumo_consistency,
+)
+from src.queries import QueryExecutor
+from src import BRT
+
+PASS = "✅ PASS"
+FAIL = "❌ FAIL"
+results: list[tuple[str, str, str]] = []
+
+
+def record(test_name: str, passed: bool, detail: str = ""):
+    status = PASS if passed else FAIL
+    results.append((test_name, status, detail))
+    print(f"  [{status}] {test_name}")
+    if detail and not passed:
+        print(f"         → {detail}")
+
+
+TURNO = "656335C4-D6C4-455A-8E3D-FF6B3F570C64"
+
+# Two sales by vendor 92 (one with two items), one by vendor 7
+SALE_ITEMS = [
+    {"id_operacao": 100, "id_turno": TURNO, "id_usuario_vendedor": 92,
+     "nome_vendedor": "Vitória", "login_vendedor": "vitoria", "total_item": Decimal("10.00")},
+    {"id_operacao": 100, "id_turno": TURNO, "id_usuario_vendedor": 92,
+     "nome_vendedor": "Vitória", "login_vendedor": "vitoria", "total_item": Decimal("5.50")},
+    {"id_operacao": 101, "id_turno": TURNO, "id_usuario_vendedor": 92,
+     "nome_vendedor": "Vitória", "login_vendedor": "vitoria", "total_item": Decimal("20.00")},
+    {"id_operacao": 102, "id_turno": TURNO, "id_usuario_vendedor": 7,
+     "nome_vendedor": "Ana", "login_vendedor": "ana", "total_item": Decimal("99.90")},
+]
+
+SALE_PAYMENTS = [
+    {"id_operacao": 100, "id_turno": TURNO, "id_finalizador": 1,
+     "meio_pagamento": "Dinheiro", "valor": Decimal("15.50")},
+    {"id_operacao": 101, "id_turno": TURNO, "id_finalizador": 1,
+     "meio_pagamento": "Dinheiro", "valor": Decimal("10.00")},
+    {"id_operacao": 101, "id_turno": TURNO, "id_finalizador": 2,
+     "meio_pagamento": "Cartão de crédito", "valor": Decimal("10.00")},
+    {"id_operacao": 102, "id_turno": TURNO, "id_finalizador": 2,
+     "meio_pagamento": "Cartão de crédito", "valor": Decimal("99.90")},
+]
+
+# What get_sales_by_vendor / get_payments_by_method return for the same data
+SQL_BY_VENDOR = [
+    {"id_ponto_venda": 10, "id_turno": TURNO, "id_usuario_vendedor": 7,
+     "vendedor_nome": "Ana", "vendedor_login": "ana", "qtd_cupons": 1, "total_vendido": Decimal("99.90")},
+    {"id_ponto_venda": 10, "id_turno": TURNO, "id_usuario_vendedor": 92,
+     "vendedor_nome": "Vitória", "vendedor_login": "vitoria", "qtd_cupons": 2, "total_vendido": Decimal("35.50")},
+]
+SQL_BY_PAYMENT = [
+    {"id_ponto_venda": 10, "id_turno": TURNO, "id_finalizador": 2,
+     "meio_pagamento": "Cartão de crédito", "qtd_vendas": 2, "total_pago": Decimal("109.90")},
+    {"id_ponto_venda": 10, "id_turno": TURNO, "id_finalizador": 1,
+     "meio_pagamento": "Dinheiro", "qtd_vendas": 2, "total_pago": Decimal("25.50")},
+]
+
+
+def aggregate():
+    aggregator = ResumoAggregator()
+    aggregator.add_items(SALE_ITEMS)
+    aggregator.add_payments(SALE_PAYMENTS)
+    return aggregator.vendor_rows(), aggregator.payment_rows()
+
+
+def test_01_by_vendor():
+    """by_vendor matches get_sales_by_vendor (COUNT DISTINCT op, SUM total)"""
+    print("\n─── Test 1: by_vendor from item rows ───")
+    by_vendor, _ = aggregate()
+
+    record("2 vendor groups", len(by_vendor) == 2, f"got: {len(by_vendor)}")
+    record(
+        "ordered by total DESC (Ana first)",
+        by_vendor[0]["id_usuario_vendedor"] == 7,
+        f"got: {[v['id_usuario_vendedor'] for v in by_vendor]}",
+    )
+    vitoria = by_vendor[1]
+    record("Vitória qtd_cupons = 2", vitoria["qtd_cupons"] == 2, f"got: {vitoria['qtd_cupons']}")
+    record(
+        "Vitória total_vendido = 35.50",
+        vitoria["total_vendido"] == Decimal("35.50"),
+        f"got: {vitoria['total_vendido']}",
+    )
+    record("nome/login carried over", vitoria["vendedor_nome"] == "Vitória" and vitoria["vendedor_login"] == "vitoria")
+
+
+def test_02_by_payment():
+    """by_payment matches get_payments_by_method"""
+    print("\n─── Test 2: by_payment from payment rows ───")
+    _, by_payment = aggregate()
+
+    record("2 payment groups", len(by_payment) == 2, f"got: {len(by_payment)}")
+    cartao = by_payment[0]
+    record(
+        "Cartão total = 109.90, qtd_vendas = 2",
+        cartao["total_pago"] == Decimal("109.90") and cartao["qtd_vendas"] == 2,
+        f"got: {cartao['total_pago']} / {cartao['qtd_vendas']}",
+    )
+
+
+def test_03_consistency_checker():
+    """No warnings when equal to SQL; one warning per diverging section"""
+    print("\n─── Test 3: consistency checker ───")
+    by_vendor, by_payment = aggregate()
+
+    warnings = check_resumo_consistency(by_vendor, by_payment, SQL_BY_VENDOR, SQL_BY_PAYMENT)
+    record("matches SQL → no warnings", warnings == [], f"got: {warnings}")
+
+    tampered = [dict(SQL_BY_PAYMENT[0], total_pago=Decimal("100.00")), SQL_BY_PAYMENT[1]]
+    warnings = check_resumo_consistency(
+        by_vendor, by_payment, SQL_BY_VENDOR, tampered, canal="HIPER_LOJA"
+    )
+    record(
+        "diverging by_payment → 1 warning",
+        len(warnings) == 1 and "HIPER_LOJA by_payment" in warnings[0],
+        f"got: {warnings}",
+    )
+
+
+def test_04_feeds_build_payload():
+    """Aggregated rows are accepted by build_payload as-is"""
+    print("\n─── Test 4: build_payload accepts aggregated rows ───")
+    by_vendor, by_payment = aggregate()
+    now = datetime(2026, 2, 11, 21, 0, 0, tzinfo=BRT)
+
+    payload = build_payload(
+        store_id=10, store_name="MC", store_alias="mc",
+        dt_from=now, dt_to=now, window_minutes=10,
+        turnos=[], vendas=[], ops_ids=[100, 101, 102],
+        sales_by_vendor=by_vendor, payments_by_method=by_payment, warnings=[],
+    )
+    record(
+        "resumo.by_vendor[0] is Ana / 99.90",
+        payload.resumo.by_vendor[0].nome == "Ana"
+        and payload.resumo.by_vendor[0].total_vendido == Decimal("99.90"),
+    )
+    record(
+        "resumo.by_payment totals sum to 135.40",
+        sum(p.total for p in payload.resumo.by_payment) == Decimal("135.40"),
+    )
+
+
+def test_05_streaming_builder():
+    """SaleDetailsBuilder fed row by row matches build_sale_details + ResumoAggregator"""
+    print("\n─── Test 5: streaming SaleDetailsBuilder ───")
+    items = [dict(row, id_produto=1, line_no=i) for i, row in enumerate(SALE_ITEMS)]
+    expected = build_sale_details(items, SALE_PAYMENTS)
+    by_vendor, by_payment = aggregate()
+
+    aggregator = ResumoAggregator()
+    builder = SaleDetailsBuilder("HIPER_CAIXA", aggregator)
+    # Items first and in reverse order: the builder must not depend on row order
+    builder.add_items(iter(reversed(items)))
+    builder.add_payments(iter(SALE_PAYMENTS))
+    streamed = builder.build()
+
+    record(
+        "same sales (ids, totals, payments)",
+        [(s.id_operacao, s.total, len(s.pagamentos)) for s in streamed]
+        == [(s.id_operacao, s.total, len(s.pagamentos)) for s in expected],
+        f"got: {[(s.id_operacao, s.total) for s in streamed]}",
+    )
+    record("aggregator hook fed by_vendor", aggregator.vendor_rows() == by_vendor)
+    record("aggregator hook fed by_payment", aggregator.payment_rows() == by_payment)
+
+
+class CapturingDB:
+    """Records every statement sent; returns no rows."""
+
+    def __init__(self, finalizador_columns: set[str]):
+        self.finalizador_columns = finalizador_columns
+        self.queries: list[str] = []
+
+    def table_has_column(self, table_name: str, column_name: str) -> bool:
+        return table_name == "finalizador_pdv" and column_name in self.finalizador_columns
+
+    def execute_query(self, query: str, params: tuple = ()) -> list[dict]:
+        self.queries.append(query)
+        return []
+
+    def iter_query(self, query: str, params: tuple = ()):
+        self.queries.append(query)
+        return iter(())
+
+    def iter_batch(self, query: str, params: tuple = ()):
+        self.queries.append(query)
+        return iter(())
+
+
+def test_06_orphan_finalizador():
+    """A payment whose finalizador_pdv row is gone still counts (meio NULL)"""
+    print("\n─── Test 6: orphan finalizador ───")
+    orphan = {"id_operacao": 102, "id_turno": TURNO, "id_finalizador": 99,
+              "meio_pagamento": None, "valor": Decimal("5.00")}
+    aggregator = ResumoAggregator()
+    aggregator.add_items(SALE_ITEMS)
+    aggregator.add_payments(SALE_PAYMENTS + [orphan])
+    by_payment = aggregator.payment_rows()
+
+    group = [p for p in by_payment if p["id_finalizador"] == 99]
+    record(
+        "orphan has its own by_payment group with meio NULL",
+        len(group) == 1 and group[0]["meio_pagamento"] is None
+        and group[0]["total_pago"] == Decimal("5.00"),
+        f"got: {group}",
+    )
+
+    now = datetime(2026, 2, 11, 21, 0, 0, tzinfo=BRT)
+    payload = build_payload(
+        store_id=10, store_name="MC", store_alias="mc",
+        dt_from=now, dt_to=now, window_minutes=10,
+        turnos=[], vendas=[], ops_ids=[100, 101, 102],
+        sales_by_vendor=aggregator.vendor_rows(), payments_by_method=by_payment, warnings=[],
+    )
+    record(
+        "orphan included in resumo.by_payment totals (140.40)",
+        sum(p.total for p in payload.resumo.by_payment) == Decimal("140.40"),
+    )
+
+    dt = datetime(2026, 2, 11, 21, 0, 0)
+    for columns, expected in (({"nome", "descricao"}, "nome"), ({"descricao"}, "descricao"),
+                              (set(), "NULL")):
+        db = CapturingDB(columns)
+        queries = QueryExecutor(db)
+        queries.get_payments_by_method(dt, dt)
+        list(queries.iter_sale_payments(dt, dt))
+        queries.get_window_extract(dt, dt)
+        queries.get_payments_by_method_for_turnos([TURNO])
+        queries.get_turno_closure_values_for_turnos([TURNO])
+        queries.get_turno_shortage_values_for_turnos([TURNO])
+        inner = [q for q in db.queries
+                 if re.search(r"(?<!LEFT )JOIN dbo\.finalizador_pdv", q)]
+        named = [q for q in db.queries if f"fpv.{expected} AS meio_pagamento" in q]
+        record(f"finalizador_pdv {sorted(columns)}: all LEFT JOIN", not inner,
+               f"{len(inner)} inner join(s)")
+        record(f"finalizador_pdv {sorted(columns)}: meio from {expected}",
+               len(named) == len(db.queries), f"{len(named)}/{len(db.queries)}")
+
+
+def main():
+    print("=" * 64)
+    print("  Resumo Aggregation Test Suite")
+    print("=" * 64)
+
+    test_01_by_vendor()
+    test_02_by_payment()
+    test_03_consistency_checker()
+    test_04_feeds_build_payload()
+    test_05_streaming_builder()
+    test_06_orphan_finalizador()
+
+    total = len(results)
+    failed = sum(1 for _, s, _ in results if s == FAIL)
+
+    print("\n" + "=" * 64)
+    if failed == 0:
+        print(f"  ✅ ALL {total} TESTS PASSED")
+    else:
+        print(f"  ❌ {failed} FAILED / {total} TOTAL")
+    print("=" * 64)
+
+    return 0 if failed == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
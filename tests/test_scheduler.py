@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Adaptive Schedule Test Suite
+============================
+AdaptiveInterval picks the next interval from recent cycle activity;
+ClosureWatch reports PDV and Loja turno closures, and a closure seen while
+a sync is running makes the sync job run one more cycle instead of being
+lost to APScheduler's max_instances=1.
+
+Run:
+    python tests/test_scheduler.py
+"""
+
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import odbc_stub  # noqa: F401
+
+from agent import _adaptive_sync_job, _closure_watch_job
+from src.scheduler import AdaptiveInterval, ClosureWatch
+
+PASS = "✅ PASS"
+FAIL = "❌ FAIL"
+results: list[tuple[str, str, str]] = []
+
+
+def record(test_name: str, passed: bool, detail: str = ""):
+    status = PASS if passed else FAIL
+    results.append((test_name, status, detail))
+    print(f"  [{status}] {test_name}")
+    if detail and not passed:
+        print(f"         → {detail}")
+
+
+class FakeQueries:
+    """get_current_turno / get_loja_open_turnos stand-in (PDV and Gestão)."""
+
+    def __init__(self):
+        self.pdv = None  # (id_turno, fechado) or None
+        self.loja: list[str] = []
+        self.fail = False
+
+    def get_current_turno(self, id_ponto_venda):
+        if self.fail:
+            raise RuntimeError("connection lost")
+        if self.pdv is None:
+            return None
+        return {"id_turno": self.pdv[0], "fechado": self.pdv[1]}
+
+    def get_loja_open_turnos(self, id_filial):
+        if self.fail:
+            raise RuntimeError("connection lost")
+        return [{"id_turno": t} for t in self.loja]
+
+
+class FakeScheduler:
+    """Records modify_job / reschedule_job calls."""
+
+    timezone = None
+
+    def __init__(self):
+        self.calls: list[str] = []
+
+    def modify_job(self, job_id, **kwargs):
+        self.calls.append(f"modify:{job_id}")
+
+    def reschedule_job(self, job_id, **kwargs):
+        self.calls.append(f"reschedule:{job_id}")
+
+
+def test_01_adaptive_interval():
+    """closed → max, peak → min, otherwise base"""
+    print("\n─── Test 1: AdaptiveInterval ───")
+    interval = AdaptiveInterval(base_minutes=10, min_minutes=2, max_minutes=30, peak_ops_per_minute=1.0)
+    record("no history: base", interval.next_interval(store_open=True) == 10)
+    record("store closed: max", interval.next_interval(store_open=False) == 30 and interval.current == 30)
+
+    interval.record(25, 10)
+    interval.record(5, 10)
+    record("1.5 ops/min over 2 cycles", interval.ops_per_minute() == 1.5, f"got: {interval.ops_per_minute()}")
+    record("peak: min", interval.next_interval(store_open=True) == 2)
+
+    for _ in range(3):
+        interval.record(2, 10)
+    record("only the last 3 cycles count", interval.ops_per_minute() == 0.2, f"got: {interval.ops_per_minute()}")
+    record("quiet: base", interval.next_interval(store_open=True) == 10)
+
+    interval.record(50, 0)
+    record("empty window ignored", interval.ops_per_minute() == 0.2)
+
+
+def test_02_pdv_closure():
+    """fechado flips or a newer turno replaces the open one"""
+    print("\n─── Test 2: PDV closure ───")
+    queries = FakeQueries()
+    watch = ClosureWatch(queries, id_ponto_venda=1)
+    record("store assumed open before the first check", watch.store_open)
+
+    queries.pdv = ("a", False)
+    record("first open turno: no closure", watch.check() is False and watch.store_open)
+    record("still open: no closure", watch.check() is False)
+
+    queries.pdv = ("A", True)
+    record("fechado=1 → closure (id case ignored)", watch.check() is True and not watch.store_open)
+    record("closure reported once", watch.check() is False)
+
+    queries.pdv = ("b", False)
+    watch.check()
+    queries.pdv = ("c", False)
+    record("newer turno replaces the open one → closure", watch.check() is True and watch.store_open)
+
+    queries.fail = True
+    record("query failure: no closure, state kept", watch.check() is False and watch.store_open)
+    queries.fail = False
+    queries.pdv = None
+    record("turno gone → closure", watch.check() is True and not watch.store_open)
+
+
+def test_03_loja_closure():
+    """Open Loja turnos of the filial are watched too"""
+    print("\n─── Test 3: Loja closure ───")
+    pdv, loja = FakeQueries(), FakeQueries()
+    watch = ClosureWatch(pdv, id_ponto_venda=1, gestao_queries=loja, id_filial=7)
+
+    loja.loja = ["l1", "l2"]
+    record("Loja open, PDV closed: store open", watch.check() is False and watch.store_open)
+    loja.loja = ["l2", "l3"]
+    record("one caixa closes, another opens → closure", watch.check() is True and watch.store_open)
+    loja.loja = []
+    record("last Loja turno closed → store closed", watch.check() is True and not watch.store_open)
+
+    pdv.pdv = ("p1", False)
+    loja.fail = True
+    watch.check()
+    pdv.pdv = ("p1", True)
+    record("Loja failure does not hide a PDV closure", watch.check() is True)
+
+    loja.fail = False
+    loja.loja = ["l4"]
+    standalone = ClosureWatch(pdv, id_ponto_venda=1)
+    standalone.check()
+    record("no gestao_queries: PDV only", not standalone.store_open)
+
+
+def test_04_closure_during_sync():
+    """A closure seen while the sync runs triggers one more cycle"""
+    print("\n─── Test 4: closure during a sync ───")
+    queries = FakeQueries()
+    queries.pdv = ("a", False)
+    watch = ClosureWatch(queries, id_ponto_venda=1)
+    interval = AdaptiveInterval(base_minutes=10, min_minutes=2, max_minutes=30, peak_ops_per_minute=1.0)
+    scheduler = FakeScheduler()
+    watch_job = _closure_watch_job(scheduler, interval, watch)
+
+    runs = []
+    close_during_run = [("a", True)]
+
+    def run():
+        runs.append(len(runs))
+        if close_during_run:
+            # The turno closes while this cycle is in flight
+            queries.pdv = close_during_run.pop()
+            watch_job()
+        return True
+
+    runner = SimpleNamespace(run=run, last_cycle_ops=0, last_window_minutes=10.0)
+    _adaptive_sync_job(scheduler, runner, interval, watch)()
+
+    record("sync ran again after the closure", len(runs) == 2, f"runs: {len(runs)}")
+    record("no modify_job while the sync was in flight", "modify:pdv_sync" not in scheduler.calls,
+           f"calls: {scheduler.calls}")
+    record("sync marked finished", not watch.syncing)
+
+    queries.pdv = ("b", False)
+    watch_job()
+    queries.pdv = ("b", True)
+    watch_job()
+    record("closure between syncs pulls the job forward", scheduler.calls[-1] == "modify:pdv_sync",
+           f"calls: {scheduler.calls}")
+
+    runs.clear()
+    _adaptive_sync_job(scheduler, runner, interval, watch)()
+    record("no closure: one cycle", len(runs) == 1, f"runs: {len(runs)}")
+
+
+def main():
+    print("=" * 64)
+    print("  Adaptive Schedule Test Suite")
+    print("=" * 64)
+
+    test_01_adaptive_interval()
+    test_02_pdv_closure()
+    test_03_loja_closure()
+    test_04_closure_during_sync()
+
+    total = len(results)
+    failed = sum(1 for _, s, _ in results if s == FAIL)
+
+    print("\n" + "=" * 64)
+    if failed == 0:
+        print(f"  ✅ ALL {total} TESTS PASSED")
+    else:
+        print(f"  ❌ {failed} FAILED / {total} TOTAL")
+    print("=" * 64)
+
+    return 0 if failed == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Snapshot Cache Test Suite
+=========================
+SnapshotCache / DeltaState persistence and the runner's snapshot merging:
+  - the cache and the delta state survive a restart, and a crash while
+    writing leaves the previous file intact (temp file + os.replace)
+  - _cached_snapshots fetches only rows newer than the cache, lets fresh
+    rows replace cached ones, keeps the newest `limit` and falls back to a
+    full refresh when it is due or the cache no longer validates
+
+Run:
+    python tests/test_snapshot_cache.py
+"""
+
+import json
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import odbc_stub  # noqa: F401
+
+from src import BRT
+from src.payload import VendaSnapshot
+from src.runner import SyncRunner
+from src.state import DeltaState, SnapshotCache
+
+PASS = "✅ PASS"
+FAIL = "❌ FAIL"
+results: list[tuple[str, str, str]] = []
+
+
+def record(test_name: str, passed: bool, detail: str = ""):
+    status = PASS if passed else FAIL
+    results.append((test_name, status, detail))
+    print(f"  [{status}] {test_name}")
+    if detail and not passed:
+        print(f"         → {detail}")
+
+
+T0 = datetime(2026, 3, 2, 10, 0, tzinfo=BRT)
+
+
+def venda(id_operacao: int, minute: int, total: str = "10.00") -> VendaSnapshot:
+    return VendaSnapshot(
+        id_operacao=id_operacao,
+        data_hora_termino=T0 + timedelta(minutes=minute),
+        total_itens=total,
+    )
+
+
+class Source:
+    """Snapshot query stand-in: returns the sales finished after `since`."""
+
+    def __init__(self, sales: list[VendaSnapshot]):
+        self.sales = sales
+        self.calls: list = []
+
+    def __call__(self, since):
+        self.calls.append(since)
+        rows = [s for s in self.sales if since is None or s.data_hora_termino > since]
+        return sorted(rows, key=lambda s: s.data_hora_termino, reverse=True)
+
+
+def cached(cache: SnapshotCache, fetch: Source, limit: int = 3) -> list[VendaSnapshot]:
+    runner = SimpleNamespace(snapshot_cache=cache)
+    return SyncRunner._cached_snapshots(
+        runner, "vendas:HIPER_CAIXA", VendaSnapshot, fetch,
+        id_attr="id_operacao", sort_attr="data_hora_termino", limit=limit,
+    )
+
+
+def ids(snapshots: list[VendaSnapshot]) -> list[int]:
+    return [s.id_operacao for s in snapshots]
+
+
+def test_01_cache_persistence():
+    """put/save/reload, full refresh age, unreadable file"""
+    print("\n─── Test 1: SnapshotCache persistence ───")
+    cache_file = Path(tempfile.mkdtemp()) / "snapshot_cache.json"
+    cache = SnapshotCache(cache_file, full_refresh_minutes=60)
+    record("new key needs a full refresh", cache.needs_full_refresh("k"))
+
+    cache.put("k", [{"id_operacao": 1}], full_refresh=True)
+    cache.save()
+    reloaded = SnapshotCache(cache_file, full_refresh_minutes=60)
+    record("rows survive a restart", reloaded.get("k") == [{"id_operacao": 1}])
+    record("fresh entry: no full refresh", not reloaded.needs_full_refresh("k"))
+
+    reloaded._entries["k"]["refreshed_at"] = (datetime.now(BRT) - timedelta(minutes=61)).isoformat()
+    record("entry older than full_refresh_minutes: full refresh", reloaded.needs_full_refresh("k"))
+    refreshed_at = reloaded._entries["k"]["refreshed_at"]
+    reloaded.put("k", [], full_refresh=False)
+    record("incremental put keeps the refresh time", reloaded._entries["k"]["refreshed_at"] == refreshed_at)
+
+    cache_file.write_text('{"entries": {"k": ', encoding="utf-8")
+    record("truncated file: starts empty", SnapshotCache(cache_file).get("k") == [])
+
+
+def test_02_atomic_writes():
+    """A crash while writing keeps the previous file"""
+    print("\n─── Test 2: atomic writes ───")
+    folder = Path(tempfile.mkdtemp())
+    cache = SnapshotCache(folder / "snapshot_cache.json")
+    cache.put("k", [{"id_operacao": 1}], full_refresh=True)
+    cache.save()
+    before = (folder / "snapshot_cache.json").read_text(encoding="utf-8")
+
+    cache.put("k", [{"id_operacao": 2, "bad": object()}], full_refresh=True)
+    try:
+        cache.save()
+        crashed = False
+    except TypeError:
+        crashed = True
+    record("snapshot cache: failed write leaves the old file",
+           crashed and (folder / "snapshot_cache.json").read_text(encoding="utf-8") == before)
+    record("snapshot cache: previous rows still load",
+           SnapshotCache(folder / "snapshot_cache.json").get("k") == [{"id_operacao": 1}])
+
+    delta = DeltaState(folder / "delta_state.json")
+    delta.acknowledge({"turnos": {"HIPER_CAIXA:A": "h1"}}, full=True)
+    try:
+        delta.acknowledge({"turnos": {"HIPER_CAIXA:A": object()}}, full=False)
+    except TypeError:
+        pass
+    restarted = DeltaState(folder / "delta_state.json")
+    record("delta state: failed write leaves the old file",
+           restarted.is_acknowledged("turnos", "HIPER_CAIXA:A", "h1") and not restarted.needs_full_resend())
+    record("no stray file next to the state",
+           sorted(p.name for p in folder.iterdir())
+           == ["delta_state.json", "snapshot_cache.json"])
+    data = json.loads((folder / "delta_state.json").read_text(encoding="utf-8"))
+    record("delta state file is valid JSON", data["hashes"] == {"turnos": {"HIPER_CAIXA:A": "h1"}})
+
+
+def test_03_merge():
+    """Only newer rows fetched; fresh rows win; newest `limit` kept"""
+    print("\n─── Test 3: _cached_snapshots merging ───")
+    cache = SnapshotCache(Path(tempfile.mkdtemp()) / "snapshot_cache.json")
+    source = Source([venda(1, 1), venda(2, 2), venda(3, 3), venda(4, 4)])
+
+    first = cached(cache, source)
+    record("first call: full read, newest 3", ids(first) == [4, 3, 2] and source.calls == [None],
+           f"got: {ids(first)} / {source.calls}")
+
+    source.sales += [venda(5, 5), venda(6, 6)]
+    second = cached(cache, source)
+    record("next call reads only after the newest cached sale",
+           source.calls[-1] == T0 + timedelta(minutes=4), f"since: {source.calls[-1]}")
+    record("new sales merged, oldest dropped", ids(second) == [6, 5, 4], f"got: {ids(second)}")
+
+    # Sale 6 edited (later termino, new total) and sale 7 finished
+    source.sales = [venda(6, 8, "99.00"), venda(7, 7)]
+    third = cached(cache, source)
+    record("fresh row replaces the cached one", ids(third) == [6, 7, 5]
+           and third[0].total_itens == 99, f"got: {[(s.id_operacao, s.total_itens) for s in third]}")
+    record("cache holds the merged rows", [r["id_operacao"] for r in cache.get("vendas:HIPER_CAIXA")] == [6, 7, 5])
+
+
+def test_04_full_refresh():
+    """Due full refresh or an invalid cache re-reads from scratch"""
+    print("\n─── Test 4: full refresh ───")
+    cache = SnapshotCache(Path(tempfile.mkdtemp()) / "snapshot_cache.json", full_refresh_minutes=60)
+    source = Source([venda(1, 1), venda(2, 2)])
+    cached(cache, source)
+
+    cache._entries["vendas:HIPER_CAIXA"]["refreshed_at"] = (
+        datetime.now(BRT) - timedelta(minutes=61)
+    ).isoformat()
+    source.sales = [venda(2, 2)]  # sale 1 cancelled after it was cached
+    refreshed = cached(cache, source)
+    record("refresh due: full read drops vanished rows", ids(refreshed) == [2] and source.calls[-1] is None,
+           f"got: {ids(refreshed)} / {source.calls}")
+    record("refresh time renewed", not cache.needs_full_refresh("vendas:HIPER_CAIXA"))
+
+    cache.put("vendas:HIPER_CAIXA", [{"id_operacao": "not-a-number"}], full_refresh=False)
+    recovered = cached(cache, source)
+    record("invalid cached rows: discarded, full read", ids(recovered) == [2] and source.calls[-1] is None,
+           f"got: {ids(recovered)} / {source.calls}")
+
+    no_cache = Source([venda(1, 1)])
+    record("SNAPSHOT_CACHE off: plain fetch", ids(cached(None, no_cache)) == [1] and no_cache.calls == [None])
+
+
+def main():
+    print("=" * 64)
+    print("  Snapshot Cache Test Suite")
+    print("=" * 64)
+
+    test_01_cache_persistence()
+    test_02_atomic_writes()
+    test_03_merge()
+    test_04_full_refresh()
+
+    total = len(results)
+    failed = sum(1 for _, s, _ in results if s == FAIL)
+
+    print("\n" + "=" * 64)
+    if failed == 0:
+        print(f"  ✅ ALL {total} TESTS PASSED")
+    else:
+        print(f"  ❌ {failed} FAILED / {total} TOTAL")
+    print("=" * 64)
+
+    return 0 if failed == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
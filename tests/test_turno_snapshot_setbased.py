@@ -0,0 +1,480 @@
+#!/usr/bin/env python3
+"""
+Turno Snapshot Regression Test Suite
+====================================
+The set-based get_turno_snapshot / get_loja_turno_snapshot must return the
+same rows as the correlated-subquery queries they replaced (kept below as
+LEGACY_PDV_SNAPSHOT / LEGACY_LOJA_SNAPSHOT), and name the same responsavel
+as the turnos[] batch queries, ties included. The snapshot, vendas snapshot
+and responsavel queries return user ids only (names come from the user
+directory), so the legacy nome_/login_ columns are not compared.
+
+Both are run on fixture tables in an in-memory SQLite database: FixtureDB
+rewrites the T-SQL constructs the queries use (TOP n, ISNULL, DATEDIFF,
+CONVERT, dbo.) into their SQLite equivalents, so no SQL Server or ODBC
+driver is needed.
+
+Run:
+    python tests/test_turno_snapshot_setbased.py
+"""
+
+import re
+import sqlite3
+import sys
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import odbc_stub  # noqa: F401
+
+from src.queries import QueryExecutor
+from src.queries_gestao import GestaoQueryExecutor
+
+PASS = "✅ PASS"
+FAIL = "❌ FAIL"
+results: list[tuple[str, str, str]] = []
+
+
+def record(test_name: str, passed: bool, detail: str = ""):
+    status = PASS if passed else FAIL
+    results.append((test_name, status, detail))
+    print(f"  [{status}] {test_name}")
+    if detail and not passed:
+        print(f"         → {detail}")
+
+
+# Correlated-subquery snapshot queries (before the set-based rewrite)
+LEGACY_PDV_SNAPSHOT = """
+            SELECT TOP {limit}
+                t.id_turno,
+                t.sequencial,
+                t.fechado,
+                t.data_hora_inicio,
+                t.data_hora_termino,
+                DATEDIFF(MINUTE, t.data_hora_inicio, t.data_hora_termino) AS duracao_minutos,
+                t.id_usuario AS id_operador,
+                u.nome AS nome_operador,
+                u.login AS login_operador,
+                (SELECT COUNT(*) FROM dbo.operacao_pdv op
+                 WHERE op.id_turno = t.id_turno AND op.operacao = 1
+                   AND op.cancelado = 0) AS qtd_vendas,
+                (SELECT ISNULL(SUM(it.valor_total_liquido), 0)
+                 FROM dbo.operacao_pdv op2
+                 JOIN dbo.item_operacao_pdv it ON it.id_operacao = op2.id_operacao
+                 WHERE op2.id_turno = t.id_turno AND op2.operacao = 1
+                   AND op2.cancelado = 0 AND it.cancelado = 0) AS total_vendas,
+                (SELECT TOP 1 uv.id_usuario
+                 FROM dbo.operacao_pdv ov
+                 JOIN dbo.item_operacao_pdv iv ON iv.id_operacao = ov.id_operacao
+                 JOIN dbo.usuario uv ON uv.id_usuario = iv.id_usuario_vendedor
+                 WHERE ov.id_turno = t.id_turno AND ov.operacao = 1
+                   AND ov.cancelado = 0 AND iv.cancelado = 0
+                 GROUP BY uv.id_usuario ORDER BY COUNT(*) DESC
+                ) AS id_responsavel,
+                (SELECT TOP 1 uv.nome
+                 FROM dbo.operacao_pdv ov
+                 JOIN dbo.item_operacao_pdv iv ON iv.id_operacao = ov.id_operacao
+                 JOIN dbo.usuario uv ON uv.id_usuario = iv.id_usuario_vendedor
+                 WHERE ov.id_turno = t.id_turno AND ov.operacao = 1
+                   AND ov.cancelado = 0 AND iv.cancelado = 0
+                 GROUP BY uv.id_usuario, uv.nome ORDER BY COUNT(*) DESC
+                ) AS nome_responsavel,
+                (SELECT TOP 1 uv.login
+                 FROM dbo.operacao_pdv ov
+                 JOIN dbo.item_operacao_pdv iv ON iv.id_operacao = ov.id_operacao
+                 JOIN dbo.usuario uv ON uv.id_usuario = iv.id_usuario_vendedor
+                 WHERE ov.id_turno = t.id_turno AND ov.operacao = 1
+                   AND ov.cancelado = 0 AND iv.cancelado = 0
+                 GROUP BY uv.id_usuario, uv.login ORDER BY COUNT(*) DESC
+                ) AS login_responsavel,
+                (SELECT COUNT(DISTINCT iv2.id_usuario_vendedor)
+                 FROM dbo.operacao_pdv ov2
+                 JOIN dbo.item_operacao_pdv iv2 ON iv2.id_operacao = ov2.id_operacao
+                 WHERE ov2.id_turno = t.id_turno AND ov2.operacao = 1
+                   AND ov2.cancelado = 0 AND iv2.cancelado = 0
+                ) AS qtd_vendedores
+            FROM dbo.turno t
+            LEFT JOIN dbo.usuario u ON u.id_usuario = t.id_usuario
+            WHERE t.id_ponto_venda = ? AND t.fechado = 1
+            ORDER BY t.data_hora_inicio DESC
+        """
+
+LEGACY_LOJA_SNAPSHOT = """
+            SELECT TOP {limit}
+                CONVERT(VARCHAR(36), t.id_turno) AS id_turno,
+                t.sequencial,
+                t.fechado,
+                t.data_hora_inicio,
+                t.data_hora_termino,
+                DATEDIFF(MINUTE, t.data_hora_inicio, t.data_hora_termino)
+                    AS duracao_minutos,
+                t.id_usuario AS id_operador,
+                u.nome AS nome_operador,
+                u.login AS login_operador,
+                (SELECT COUNT(DISTINCT op.id_operacao)
+                 FROM dbo.operacao_pdv op
+                 WHERE op.operacao = 1 AND op.cancelado = 0
+                   AND op.origem = 2
+                   AND op.id_turno = t.id_turno
+                ) AS qtd_vendas,
+                (SELECT ISNULL(SUM(i.valor_total_liquido), 0)
+                 FROM dbo.operacao_pdv op
+                 JOIN dbo.item_operacao_pdv i ON i.id_operacao = op.id_operacao
+                 WHERE op.operacao = 1 AND op.cancelado = 0
+                   AND op.origem = 2
+                   AND i.cancelado = 0
+                   AND op.id_turno = t.id_turno
+                ) AS total_vendas,
+                (SELECT COUNT(DISTINCT i2.id_usuario_vendedor)
+                 FROM dbo.operacao_pdv op2
+                 JOIN dbo.item_operacao_pdv i2 ON i2.id_operacao = op2.id_operacao
+                 WHERE op2.operacao = 1 AND op2.cancelado = 0
+                   AND op2.origem = 2
+                   AND i2.cancelado = 0
+                   AND i2.id_usuario_vendedor IS NOT NULL
+                   AND op2.id_turno = t.id_turno
+                ) AS qtd_vendedores,
+                (SELECT TOP 1 i3.id_usuario_vendedor
+                 FROM dbo.operacao_pdv op3
+                 JOIN dbo.item_operacao_pdv i3 ON i3.id_operacao = op3.id_operacao
+                 WHERE op3.operacao = 1 AND op3.cancelado = 0
+                   AND op3.origem = 2
+                   AND i3.cancelado = 0
+                   AND i3.id_usuario_vendedor IS NOT NULL
+                   AND op3.id_turno = t.id_turno
+                 GROUP BY i3.id_usuario_vendedor
+                 ORDER BY SUM(i3.valor_total_liquido) DESC
+                ) AS id_responsavel,
+                (SELECT TOP 1 u3.nome
+                 FROM dbo.operacao_pdv op3
+                 JOIN dbo.item_operacao_pdv i3 ON i3.id_operacao = op3.id_operacao
+                 LEFT JOIN dbo.usuario u3 ON u3.id_usuario = i3.id_usuario_vendedor
+                 WHERE op3.operacao = 1 AND op3.cancelado = 0
+                   AND op3.origem = 2
+                   AND i3.cancelado = 0
+                   AND i3.id_usuario_vendedor IS NOT NULL
+                   AND op3.id_turno = t.id_turno
+                 GROUP BY i3.id_usuario_vendedor, u3.nome
+                 ORDER BY SUM(i3.valor_total_liquido) DESC
+                ) AS nome_responsavel,
+                (SELECT TOP 1 u3.login
+                 FROM dbo.operacao_pdv op3
+                 JOIN dbo.item_operacao_pdv i3 ON i3.id_operacao = op3.id_operacao
+                 LEFT JOIN dbo.usuario u3 ON u3.id_usuario = i3.id_usuario_vendedor
+                 WHERE op3.operacao = 1 AND op3.cancelado = 0
+                   AND op3.origem = 2
+                   AND i3.cancelado = 0
+                   AND i3.id_usuario_vendedor IS NOT NULL
+                   AND op3.id_turno = t.id_turno
+                 GROUP BY i3.id_usuario_vendedor, u3.login
+                 ORDER BY SUM(i3.valor_total_liquido) DESC
+                ) AS login_responsavel
+            FROM dbo.turno t
+            LEFT JOIN dbo.usuario u ON u.id_usuario = t.id_usuario
+            WHERE t.fechado = 1
+              AND t.id_filial = ?
+            ORDER BY t.data_hora_termino DESC
+        """
+
+
+class FixtureDB:
+    """
+    DatabaseConnection stand-in backed by in-memory SQLite: execute_query
+    rewrites the T-SQL used by the snapshot queries and returns dict rows.
+    """
+
+    def __init__(self, tables: dict[str, list[dict[str, Any]]]):
+        self.conn = sqlite3.connect(":memory:")
+        self.conn.row_factory = sqlite3.Row
+        for table, rows in tables.items():
+            columns = list(rows[0])
+            self.conn.execute(f"CREATE TABLE {table} ({', '.join(columns)})")
+            self.conn.executemany(
+                f"INSERT INTO {table} VALUES ({', '.join('?' for _ in columns)})",
+                [tuple(row.get(c) for c in columns) for row in rows],
+            )
+        self.calls = 0
+
+    @staticmethod
+    def to_sqlite(query: str) -> str:
+        query = query.replace("dbo.", "")
+        query = re.sub(r"CONVERT\(VARCHAR\(36\),\s*([\w.]+)\)", r"\1", query)
+        query = re.sub(r"\bISNULL\(", "IFNULL(", query)
+        query = re.sub(
+            r"DATEDIFF\(MINUTE,\s*([\w.]+),\s*([\w.]+)\)",
+            r"(CAST(strftime('%s', \2) AS INTEGER) / 60 - CAST(strftime('%s', \1) AS INTEGER) / 60)",
+            query,
+        )
+        # SELECT TOP n ... → SELECT ... LIMIT n, at the end of the enclosing (sub)query
+        while match := re.search(r"SELECT\s+TOP\s+(\d+)", query):
+            depth, end = 0, len(query)
+            for pos in range(match.end(), len(query)):
+                if query[pos] == "(":
+                    depth += 1
+                elif query[pos] == ")":
+                    if depth == 0:
+                        end = pos
+                        break
+                    depth -= 1
+            query = (query[:match.start()] + "SELECT" + query[match.end():end]
+                     + f" LIMIT {match.group(1)}" + query[end:])
+        return query
+
+    def execute_query(self, query: str, params: tuple = ()) -> list[dict[str, Any]]:
+        self.calls += 1
+        params = tuple(
+            p.isoformat(sep=" ") if isinstance(p, datetime) else str(p) if isinstance(p, uuid.UUID) else p
+            for p in params
+        )
+        return [dict(row) for row in self.conn.execute(self.to_sqlite(query), params)]
+
+
+class CapturingDB:
+    """Records every statement sent; returns no rows."""
+
+    def __init__(self):
+        self.calls: list[tuple[str, tuple]] = []
+
+    def execute_query(self, query: str, params: tuple = ()) -> list[dict[str, Any]]:
+        self.calls.append((query, params))
+        return []
+
+
+USUARIOS = [
+    {"id_usuario": 1, "nome": "Ana", "login": "ana"},
+    {"id_usuario": 2, "nome": "Bruno", "login": "bruno"},
+    {"id_usuario": 3, "nome": "Carla", "login": "carla"},
+    {"id_usuario": 5, "nome": "Davi", "login": "davi"},
+]
+
+
+def turno(id_turno, store, seq, fechado, inicio, termino, id_usuario):
+    return {"id_turno": id_turno, "id_ponto_venda": store, "id_filial": store, "sequencial": seq,
+            "fechado": fechado, "data_hora_inicio": inicio, "data_hora_termino": termino,
+            "id_usuario": id_usuario}
+
+
+def op(id_operacao, id_turno, operacao=1, cancelado=0, origem=2):
+    return {"id_operacao": id_operacao, "id_turno": id_turno, "operacao": operacao,
+            "cancelado": cancelado, "origem": origem}
+
+
+def item(id_operacao, vendedor, valor, cancelado=0):
+    return {"id_operacao": id_operacao, "id_usuario_vendedor": vendedor,
+            "valor_total_liquido": valor, "cancelado": cancelado}
+
+
+def fixture_tables() -> dict[str, list[dict[str, Any]]]:
+    """
+    Store 10 (PDV id_ponto_venda / Gestão id_filial) with four closed turnos
+    and an open one, plus a closed turno of store 11:
+      T1  vendors 2 (3 items, 7.50) and 3 (2 items, 30.00)
+      T2  cancelled sale and item, item without vendor; vendor 4 (no usuario
+          row) sells the most value, vendor 2 the most items
+      T3  no sales, operator 9 has no usuario row
+      T4  closure (op=9) and one sale; PDV-origin sale (origem=1)
+    No vendor ties: the legacy TOP 1 lookups picked an arbitrary vendor on a tie.
+    """
+    turnos = [
+        turno("T1", 10, 1, 1, "2026-03-01 08:00:00", "2026-03-01 14:00:30", 1),
+        turno("T2", 10, 2, 1, "2026-03-01 14:00:30", "2026-03-01 20:05:00", 2),
+        turno("T3", 10, 3, 1, "2026-03-02 08:00:00", "2026-03-02 13:59:59", 9),
+        turno("T4", 10, 4, 1, "2026-03-02 14:00:00", "2026-03-02 20:00:00", 3),
+        turno("T5", 10, 5, 0, "2026-03-03 08:00:00", None, 1),
+        turno("T6", 11, 1, 1, "2026-03-02 08:00:00", "2026-03-02 18:00:00", 5),
+    ]
+    ops = [
+        op(101, "T1"), op(102, "T1"),
+        op(201, "T2"), op(202, "T2", cancelado=1), op(203, "T2"),
+        op(401, "T4"), op(402, "T4", operacao=9), op(403, "T4", origem=1),
+        op(501, "T5"), op(601, "T6"),
+    ]
+    items = [
+        item(101, 2, 2.50), item(101, 2, 2.50), item(101, 3, 10.00),
+        item(102, 2, 2.50), item(102, 3, 20.00),
+        item(201, 4, 8.00), item(201, 4, 8.00), item(201, 2, 3.25), item(201, 2, 99.00, cancelado=1),
+        item(202, 3, 50.00), item(203, None, 1.75), item(203, 1, 4.00), item(203, 2, 0.50),
+        item(203, 2, 0.25),
+        item(401, 5, 12.00), item(401, 5, 3.00), item(402, 1, 100.00), item(403, 3, 40.00),
+        item(501, 1, 6.00), item(601, 5, 9.00),
+    ]
+    return {"turno": turnos, "usuario": USUARIOS, "operacao_pdv": ops, "item_operacao_pdv": items}
+
+
+def tie_tables() -> dict[str, list[dict[str, Any]]]:
+    """
+    Closed turnos of store 10 whose top vendors tie, and one whose top vendor
+    has no usuario row:
+      U1  vendors 2 and 3 sell 2 items each; vendor 3 sells more value
+      U2  vendors 5 and 3 sell one 4.00 item each
+      U3  vendor 4 (no usuario row) sells 2 items, vendor 1 one
+    """
+    u1, u2, u3 = (f"8f1c0a52-0000-4000-8000-00000000000{n}" for n in (1, 2, 3))
+    turnos = [
+        turno(u1, 10, 1, 1, "2026-03-01 08:00:00", "2026-03-01 14:00:00", 1),
+        turno(u2, 10, 2, 1, "2026-03-01 14:00:00", "2026-03-01 20:00:00", 1),
+        turno(u3, 10, 3, 1, "2026-03-02 08:00:00", "2026-03-02 14:00:00", 1),
+    ]
+    ops = [op(1, u1), op(2, u2), op(3, u3)]
+    items = [
+        item(1, 2, 1.00), item(1, 2, 1.00), item(1, 3, 5.00), item(1, 3, 5.00),
+        item(2, 5, 4.00), item(2, 3, 4.00),
+        item(3, 4, 1.00), item(3, 4, 1.00), item(3, 1, 1.50),
+    ]
+    return {"turno": turnos, "usuario": USUARIOS, "operacao_pdv": ops, "item_operacao_pdv": items}
+
+
+def _compare(label: str, new_rows: list[dict], legacy_rows: list[dict]):
+    record(f"{label}: same turnos in the same order",
+           [r["id_turno"] for r in new_rows] == [r["id_turno"] for r in legacy_rows],
+           f"set-based={[r['id_turno'] for r in new_rows]} legacy={[r['id_turno'] for r in legacy_rows]}")
+    mismatches = [
+        (old["id_turno"], key, row[key], old.get(key))
+        for row, old in zip(new_rows, legacy_rows)
+        for key in row
+        if row[key] != old.get(key)
+    ]
+    record(f"{label}: identical rows (ids, counts, totals)", not mismatches, f"first: {mismatches[:3]}")
+    names = sorted({key for row in new_rows for key in row if key.startswith(("nome_", "login_"))})
+    record(f"{label}: no name columns (user directory)", not names, f"got: {names}")
+
+
+def test_01_single_statement_no_correlated_subqueries():
+    """Both snapshots are one round trip without per-row subqueries"""
+    print("\n─── Test 1: set-based query shape ───")
+    for label, executor, method, arg in (
+        ("PDV", QueryExecutor, "get_turno_snapshot", 10),
+        ("Gestão", GestaoQueryExecutor, "get_loja_turno_snapshot", 1),
+    ):
+        db = CapturingDB()
+        getattr(executor(db), method)(arg, limit=20)
+        query, params = db.calls[0]
+        record(f"{label}: 1 round trip", len(db.calls) == 1, f"got: {len(db.calls)}")
+        record(f"{label}: bound store param", params == (arg,), f"got: {params}")
+        record(f"{label}: TOP 20 applied", "TOP 20" in query)
+        record(
+            f"{label}: no TOP 1 correlated lookups",
+            re.search(r"\(\s*SELECT\s+TOP\s+1", query, re.IGNORECASE) is None,
+        )
+        record(f"{label}: top vendor via ROW_NUMBER", "ROW_NUMBER()" in query)
+
+    for label, executor, method, arg in (
+        ("PDV turno snapshot", QueryExecutor, "get_turno_snapshot", 10),
+        ("PDV vendas snapshot", QueryExecutor, "get_vendas_snapshot", 10),
+        ("PDV responsavel", QueryExecutor, "get_turno_responsavel_for_turnos", ["T1"]),
+        ("Gestão turno snapshot", GestaoQueryExecutor, "get_loja_turno_snapshot", 1),
+        ("Gestão vendas snapshot", GestaoQueryExecutor, "get_loja_vendas_snapshot", 1),
+        ("Gestão responsavel", GestaoQueryExecutor, "get_loja_turno_responsavel_for_turnos",
+         ["8f1c0a52-0000-4000-8000-000000000001"]),
+    ):
+        db = CapturingDB()
+        getattr(executor(db), method)(arg)
+        record(f"{label}: ids only, no usuario join", "usuario " not in db.calls[0][0].replace("id_usuario", ""),
+               db.calls[0][0])
+
+
+def test_02_pdv_matches_legacy():
+    """PDV set-based rows == correlated-subquery rows on the fixtures"""
+    print("\n─── Test 2: PDV vs legacy (fixtures) ───")
+    db = FixtureDB(fixture_tables())
+    queries = QueryExecutor(db)
+    for limit in (20, 2):
+        new_rows = queries.get_turno_snapshot(10, limit=limit)
+        legacy_rows = db.execute_query(LEGACY_PDV_SNAPSHOT.format(limit=limit), (10,))
+        _compare(f"PDV limit={limit}", new_rows, legacy_rows)
+
+    rows = {r["id_turno"]: r for r in queries.get_turno_snapshot(10, limit=20)}
+    record("closed turnos of the store only", sorted(rows) == ["T1", "T2", "T3", "T4"], f"got: {sorted(rows)}")
+    record("T1: responsavel by item count, totals",
+           (rows["T1"]["id_responsavel"], rows["T1"]["qtd_vendas"], rows["T1"]["total_vendas"],
+            rows["T1"]["qtd_vendedores"]) == (2, 2, 37.5, 2), f"got: {rows['T1']}")
+    record("T2: cancelled sale / item excluded, responsavel by item count",
+           (rows["T2"]["qtd_vendas"], rows["T2"]["total_vendas"], rows["T2"]["id_responsavel"])
+           == (2, 25.75, 2), f"got: {rows['T2']}")
+    record("T3: no sales → zeros, no responsavel, operator id kept",
+           (rows["T3"]["qtd_vendas"], rows["T3"]["total_vendas"], rows["T3"]["id_responsavel"],
+            rows["T3"]["id_operador"]) == (0, 0, None, 9), f"got: {rows['T3']}")
+
+
+def test_03_loja_matches_legacy():
+    """Gestão set-based rows == correlated-subquery rows on the fixtures"""
+    print("\n─── Test 3: Gestão vs legacy (fixtures) ───")
+    db = FixtureDB(fixture_tables())
+    queries = GestaoQueryExecutor(db)
+    for limit in (20, 2):
+        new_rows = queries.get_loja_turno_snapshot(10, limit=limit)
+        legacy_rows = db.execute_query(LEGACY_LOJA_SNAPSHOT.format(limit=limit), (10,))
+        _compare(f"Gestão limit={limit}", new_rows, legacy_rows)
+
+    rows = {r["id_turno"]: r for r in queries.get_loja_turno_snapshot(10, limit=20)}
+    record("T1: responsavel by value", rows["T1"]["id_responsavel"] == 3, f"got: {rows['T1']}")
+    record("T2: vendor without usuario row kept", rows["T2"]["id_responsavel"] == 4, f"got: {rows['T2']}")
+    record("T4: only origem=2 sales counted",
+           (rows["T4"]["qtd_vendas"], rows["T4"]["total_vendas"]) == (1, 15.0), f"got: {rows['T4']}")
+
+
+def test_04_since():
+    """since returns the rows of the full snapshot that closed after it"""
+    print("\n─── Test 4: incremental (since) ───")
+    db = FixtureDB(fixture_tables())
+    since = datetime(2026, 3, 1, 20, 0)
+    for label, fetch in (
+        ("PDV", QueryExecutor(db).get_turno_snapshot),
+        ("Gestão", GestaoQueryExecutor(db).get_loja_turno_snapshot),
+    ):
+        full = fetch(10, limit=20)
+        newer = fetch(10, limit=20, since=since)
+        expected = [r for r in full if r["data_hora_termino"] > since.isoformat(sep=" ")]
+        record(f"{label}: since = filtered full snapshot", newer == expected and len(newer) == 3,
+               f"got: {[r['id_turno'] for r in newer]}")
+
+
+def test_05_responsavel_matches_batch():
+    """snapshot_turnos and turnos[] pick the same responsavel on ties and for unknown users"""
+    print("\n─── Test 5: snapshot vs batch responsavel (ties) ───")
+    db = FixtureDB(tie_tables())
+    for label, snapshot, batch, expected in (
+        ("PDV", QueryExecutor(db).get_turno_snapshot,
+         QueryExecutor(db).get_turno_responsavel_for_turnos, [3, 3, 4]),
+        ("Gestão", GestaoQueryExecutor(db).get_loja_turno_snapshot,
+         GestaoQueryExecutor(db).get_loja_turno_responsavel_for_turnos, [3, 3, 4]),
+    ):
+        rows = sorted(snapshot(10, limit=20), key=lambda r: r["sequencial"])
+        ranked = batch([r["id_turno"] for r in rows])
+        from_snapshot = [r["id_responsavel"] for r in rows]
+        from_batch = [ranked[r["id_turno"]]["id_usuario"] for r in rows]
+        record(f"{label}: same responsavel in both queries", from_snapshot == from_batch,
+               f"snapshot={from_snapshot} batch={from_batch}")
+        record(f"{label}: ties and unknown users resolved as documented", from_snapshot == expected,
+               f"got: {from_snapshot}")
+
+
+def main():
+    print("=" * 64)
+    print("  Turno Snapshot Regression Test Suite")
+    print("=" * 64)
+
+    test_01_single_statement_no_correlated_subqueries()
+    test_02_pdv_matches_legacy()
+    test_03_loja_matches_legacy()
+    test_04_since()
+    test_05_responsavel_matches_batch()
+
+    total = len(results)
+    failed = sum(1 for _, s, _ in results if s == FAIL)
+
+    print("\n" + "=" * 64)
+    if failed == 0:
+        print(f"  ✅ ALL {total} TESTS PASSED")
+    else:
+        print(f"  ❌ {failed} FAILED / {total} TOTAL")
+    print("=" * 64)
+
+    return 0 if failed == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+User Directory Test Suite
+=========================
+UserDirectory replaces the LEFT JOIN dbo.usuario of the sale item queries:
+sale details and resumo built from id-only rows plus the directory must
+match the ones built from joined rows, every user must be one shared
+object, and the table must reload on TTL or on an unknown id (throttled).
+Snapshot operators keep the names their rows carry when the directory
+has none or cannot be loaded.
+
+Run:
+    python tests/test_user_directory.py
+"""
+
+import sys
+import time
+from types import SimpleNamespace
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import odbc_stub  # noqa: F401  (src.runner imports pyodbc)
+from src.directory import UNKNOWN_ID_RELOAD_SECONDS, UserDirectory
+from src.payload import ResumoAggregator, SaleDetailsBuilder, dump_records
+from src.runner import SyncRunner
+
+PASS = "✅ PASS"
+FAIL = "❌ FAIL"
+results: list[tuple[str, str, str]] = []
+
+
+def record(test_name: str, passed: bool, detail: str = ""):
+    status = PASS if passed else FAIL
+    results.append((test_name, status, detail))
+    print(f"  [{status}] {test_name}")
+    if detail and not passed:
+        print(f"         → {detail}")
+
+
+USERS = [
+    {"id_usuario": 7, "nome": "Ana", "login": "ana"},
+    {"id_usuario": 92, "nome": "Vitória", "login": "vitoria"},
+]
+
+
+class Loader:
+    """get_users stand-in: returns self.rows and counts the calls."""
+
+    def __init__(self, rows: list[dict]):
+        self.rows = rows
+        self.calls = 0
+        self.fail = False
+
+    def __call__(self) -> list[dict]:
+        self.calls += 1
+        if self.fail:
+            raise RuntimeError("connection lost")
+        return list(self.rows)
+
+
+def joined_rows() -> list[dict]:
+    """Item rows as the old LEFT JOIN dbo.usuario returned them (55 is not in the table)."""
+    rows = []
+    for op, (id_vendedor, nome, login) in enumerate(
+        [(7, "Ana", "ana"), (92, "Vitória", "vitoria"), (None, None, None),
+         (7, "Ana", "ana"), (55, None, None)], start=100,
+    ):
+        rows.append({
+            "id_operacao": op, "id_turno": "656335C4-D6C4-455A-8E3D-FF6B3F570C64",
+            "data_hora_termino": datetime(2026, 3, 2, 9, op - 100), "line_id": op * 10,
+            "line_no": 1, "id_produto": 1, "codigo_barras": "1", "nome_produto": "Café",
+            "qtd": Decimal("1"), "preco_unit": Decimal("9.90"), "total_item": Decimal("9.90"),
+            "desconto_item": Decimal("0"), "id_usuario_vendedor": id_vendedor,
+            "nome_vendedor": nome, "login_vendedor": login,
+        })
+    return rows
+
+
+def id_only_rows() -> list[dict]:
+    """The same rows as the item queries return them now."""
+    return [
+        {k: v for k, v in row.items() if k not in ("nome_vendedor", "login_vendedor")}
+        for row in joined_rows()
+    ]
+
+
+def build(rows: list[dict], users: UserDirectory = None) -> tuple[list[dict], list[dict]]:
+    aggregator = ResumoAggregator(users)
+    builder = SaleDetailsBuilder("HIPER_CAIXA", aggregator, users)
+    builder.add_items(rows)
+    return builder.build_records(), aggregator.vendor_rows()
+
+
+def test_01_same_payload_as_join():
+    """Id-only rows + directory == joined rows (sales and resumo)"""
+    print("\n─── Test 1: directory vs LEFT JOIN ───")
+    users = UserDirectory(Loader(USERS))
+    vendas, vendors = build(id_only_rows(), users)
+    expected_vendas, expected_vendors = build(joined_rows())
+
+    record("vendas JSON identical", dump_records(vendas) == dump_records(expected_vendas))
+    record("resumo by_vendor identical", vendors == expected_vendors,
+           f"got: {vendors}")
+    record("validated models identical",
+           validated(id_only_rows(), users) == validated(joined_rows()))
+
+
+def validated(rows: list[dict], users: UserDirectory = None) -> list:
+    builder = SaleDetailsBuilder("HIPER_CAIXA", users=users)
+    builder.add_items(rows)
+    return builder.build()
+
+
+def test_02_interned():
+    """Each user is one shared OperatorInfo / record"""
+    print("\n─── Test 2: interned entries ───")
+    users = UserDirectory(Loader(USERS))
+    vendas, _ = build(id_only_rows(), users)
+    ana = [v["itens"][0]["vendedor"] for v in vendas if v["id_operacao"] in (100, 103)]
+
+    record("same record for every item of a vendor", ana[0] is ana[1])
+    record("same OperatorInfo per id", users.get(7) is users.get(7))
+    record("NULL id has no vendor", users.get(None) is None and users.record(0) is None)
+
+
+def test_03_reloads():
+    """Lazy first load, TTL reload, unknown-id reload with cooldown"""
+    print("\n─── Test 3: reloads ───")
+    loader = Loader(USERS)
+    users = UserDirectory(loader, ttl_minutes=60)
+    record("nothing loaded before the first lookup", loader.calls == 0)
+
+    users.get(7)
+    users.get(92)
+    record("one load for known ids", loader.calls == 1, f"calls: {loader.calls}")
+
+    loader.rows = USERS + [{"id_usuario": 120, "nome": "Novo", "login": "novo"}]
+    users._loaded_at -= UNKNOWN_ID_RELOAD_SECONDS
+    record("unknown id triggers a reload", users.get(120).nome == "Novo" and loader.calls == 2,
+           f"calls: {loader.calls}")
+
+    for _ in range(1000):
+        users.record(555)
+    record("missing id: no reload within the cooldown", loader.calls == 2,
+           f"calls: {loader.calls}")
+    record("missing id resolves to id only", users.get(555).model_dump() == {
+        "id_usuario": 555, "nome": None, "login": None})
+
+    loader.rows = [{"id_usuario": 7, "nome": "Ana Paula", "login": "ana"}]
+    users._loaded_at -= 3600
+    record("TTL expiry reloads the table", users.get(7).nome == "Ana Paula" and loader.calls == 3,
+           f"calls: {loader.calls}")
+
+
+def test_04_failed_reload():
+    """A failed reload keeps the previous table; a failed first load raises"""
+    print("\n─── Test 4: failures ───")
+    loader = Loader(USERS)
+    users = UserDirectory(loader)
+    users.get(7)
+    loader.fail = True
+    users._loaded_at = time.monotonic() - 3600
+    record("stale table kept", users.get(92).nome == "Vitória")
+
+    broken = Loader(USERS)
+    broken.fail = True
+    try:
+        UserDirectory(broken).get(7)
+        raised = False
+    except RuntimeError:
+        raised = True
+    record("first load error propagates", raised)
+
+
+def test_05_snapshot_operator():
+    """Snapshot / responsavel user ids are named through the directory only"""
+    print("\n─── Test 5: snapshot operators ───")
+
+    def runner_for(users):
+        runner = SimpleNamespace(users_pdv=users, users_loja=None)
+        runner._operator = lambda canal, id_usuario: SyncRunner._operator(runner, canal, id_usuario)
+        return runner
+
+    users = UserDirectory(Loader(USERS))
+    runner = runner_for(users)
+    record("known user: shared directory entry",
+           SyncRunner._operator(runner, "HIPER_CAIXA", 7) is users.get(7))
+    record("id missing from the directory: id only",
+           SyncRunner._operator(runner, "HIPER_CAIXA", 55).model_dump() == {
+               "id_usuario": 55, "nome": None, "login": None})
+    record("turnos[] responsavel named from the directory",
+           SyncRunner._responsavel(runner, "HIPER_CAIXA", {"id_turno": "T1", "id_usuario": 92})
+           == {"id_usuario": 92, "nome": "Vitória", "login": "vitoria"}
+           and SyncRunner._responsavel(runner, "HIPER_CAIXA", None) is None)
+
+    broken = Loader(USERS)
+    broken.fail = True
+    runner = runner_for(UserDirectory(broken))
+    record("directory load fails: id only, no error",
+           SyncRunner._operator(runner, "HIPER_CAIXA", 7).model_dump() == {
+               "id_usuario": 7, "nome": None, "login": None})
+    runner = runner_for(None)
+    record("no directory for the channel: id only",
+           SyncRunner._operator(runner, "HIPER_LOJA", 7).nome is None)
+
+
+def main():
+    print("=" * 64)
+    print("  User Directory Test Suite")
+    print("=" * 64)
+
+    test_01_same_payload_as_join()
+    test_02_interned()
+    test_03_reloads()
+    test_04_failed_reload()
+    test_05_snapshot_operator()
+
+    total = len(results)
+    failed = sum(1 for _, s, _ in results if s == FAIL)
+
+    print("\n" + "=" * 64)
+    if failed == 0:
+        print(f"  ✅ ALL {total} TESTS PASSED")
+    else:
+        print(f"  ❌ {failed} FAILED / {total} TOTAL")
+    print("=" * 64)
+
+    return 0 if failed == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())